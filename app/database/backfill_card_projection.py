@@ -0,0 +1,51 @@
+"""
+Fills the card_last4 / expiry_display projection and the card_fingerprint column
+for cards created before they existed.
+Decrypts in batches on the card decrypt thread pool and writes each batch with one bulk UPDATE.
+Run `python -m app.database.migrate_schema` first to add the columns.
+"""
+
+# Imports
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.database.create_database import SessionLocal
+from app.models import Card
+from app.utils.card_crypto import decrypt_many
+from app.utils.card_issuance import card_fingerprint
+
+BATCH_SIZE = 5000
+
+def backfill_card_projection(db: Session, batch_size: int = BATCH_SIZE) -> int:
+    filled, last_id = 0, 0
+    while True:
+        rows = db.execute(
+            select(Card.id, Card.card_number, Card.expiry_date)
+            .where(
+                Card.id > last_id,
+                Card.card_last4.is_(None) | Card.expiry_display.is_(None) | Card.card_fingerprint.is_(None)
+            )
+            .order_by(Card.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return filled
+        plain = decrypt_many([r.card_number for r in rows] + [r.expiry_date for r in rows])
+        db.execute(update(Card), [
+            {
+                "id": r.id,
+                "card_last4": plain[i][-4:],
+                "expiry_display": plain[len(rows) + i],
+                "card_fingerprint": card_fingerprint(plain[i]),
+            }
+            for i, r in enumerate(rows)
+        ])
+        db.commit()
+        filled += len(rows)
+        last_id = rows[-1].id
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print(f"Backfilled {backfill_card_projection(db)} card(s).")
+    finally:
+        db.close()
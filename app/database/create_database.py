@@ -1,28 +1,176 @@
 """
 Sets up SQLAlchemy engine, session, and base for models.
-Configures database connection from .env.
+Configures database connection and connection pool from app.settings, read when the engines are built.
+Provides both a sync session (scripts, auth) and an async session (API routes).
+SQLITE_PROFILE=production opts SQLite into WAL, PRAGMA tuning, and a separate read-only pool.
 """
 
-import os
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from app.settings import get_settings, lazy
 
-# Load environment variables
-load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./bank.db")
+# Async drivers per backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
 
-# Engine and session
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# -------------------------
+# Helpers
+# -------------------------
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def to_async_url(url: str) -> str:
+    """
+    Maps a sync DATABASE_URL onto its async driver (aiosqlite or asyncpg).
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def engine_options(url: str) -> dict:
+    """
+    Returns the keyword arguments shared by the sync and async engines.
+    """
+    if is_sqlite(url):
+        return {"connect_args": {"check_same_thread": False}}
+    # Connection pool settings (SQLite manages its own pool)
+    settings = get_settings()
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+def sqlite_profile_enabled(url: str) -> bool:
+    """
+    SQLite production profile (opt-in): WAL, tuned PRAGMAs, group-committed writes, read-only pool.
+    """
+    return get_settings().sqlite_profile == "production" and is_sqlite(url)
+
+def sqlite_pragmas(read_only: bool = False) -> list[str]:
+    settings = get_settings()
+    pragmas = [
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size}",
+        f"PRAGMA cache_size = {settings.sqlite_cache_size}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    return pragmas
+
+def apply_sqlite_profile(target, read_only: bool = False):
+    """
+    Runs the production PRAGMAs on every new pooled connection of a sync or async engine.
+    """
+    @event.listens_for(getattr(target, "sync_engine", target), "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in sqlite_pragmas(read_only):
+            cursor.execute(pragma)
+        cursor.close()
+
+# -------------------------
+# Engines and sessions (built on first use, or at app startup; see main.lifespan)
+# -------------------------
+def database_urls() -> tuple[str, str]:
+    """
+    The sync DATABASE_URL and its async counterpart (ASYNC_DATABASE_URL, or derived from it).
+    """
+    settings = get_settings()
+    return settings.database_url, settings.async_database_url or to_async_url(settings.database_url)
+
+@lazy
+def get_engine():
+    from app.utils.metrics import instrument_engine
+    url, _ = database_urls()
+    engine = create_engine(url, **engine_options(url))
+    if sqlite_profile_enabled(url):
+        apply_sqlite_profile(engine)
+    instrument_engine(engine, "primary_sync")
+    return engine
+
+@lazy
+def get_async_engine():
+    from app.utils.metrics import instrument_engine
+    url, async_url = database_urls()
+    async_engine = create_async_engine(async_url, **engine_options(async_url))
+    if sqlite_profile_enabled(url):
+        apply_sqlite_profile(async_engine)
+    instrument_engine(async_engine, "primary")
+    return async_engine
+
+@lazy
+def get_async_read_engine():
+    """
+    Read-only pool for read routes (see read_routing); only separate under the SQLite production profile.
+    """
+    from app.utils.metrics import instrument_engine
+    url, async_url = database_urls()
+    if not sqlite_profile_enabled(url):
+        return get_async_engine()
+    async_read_engine = create_async_engine(
+        async_url, pool_size=get_settings().sqlite_read_pool_size, max_overflow=0, **engine_options(async_url)
+    )
+    apply_sqlite_profile(async_read_engine, read_only=True)
+    instrument_engine(async_read_engine, "read_pool")
+    return async_read_engine
+
+@lazy
+def get_session_factory():
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+@lazy
+def get_async_session_factory():
+    return async_sessionmaker(get_async_engine(), class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def dispose_engines():
+    """
+    Closes the pools of whichever engines were built; they reconnect if used again.
+    """
+    if get_async_read_engine.built and get_async_read_engine() is not get_async_engine.value:
+        await get_async_read_engine().dispose()
+    if get_async_engine.built:
+        await get_async_engine().dispose()
+    if get_engine.built:
+        get_engine().dispose()
+
+# Module-level names kept for scripts: `from create_database import engine` builds it on demand
+LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "async_engine": get_async_engine,
+    "async_read_engine": get_async_read_engine,
+    "SessionLocal": get_session_factory,
+    "AsyncSessionLocal": get_async_session_factory,
+}
+
+def __getattr__(name: str):
+    if name in LAZY_ATTRIBUTES:
+        return LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Base for models
 Base = declarative_base()
 
 # Dependency for FastAPI
 def get_db():
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Async dependency for FastAPI
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+One-off migration of money columns from floating point to integer cents.
+Converts accounts.balance and transactions.amount to BIGINT cents; safe to re-run.
+"""
+
+# Imports
+import re
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from app.database.create_database import get_engine
+
+# Files converted by the first version of this script hold cents in FLOAT columns, marked via PRAGMA user_version
+MONEY_SCHEMA_VERSION = 1
+MONEY_COLUMNS = [("accounts", "balance"), ("transactions", "amount")]
+FLOAT_TYPES = ("FLOAT", "REAL", "DOUBLE", "DOUBLE_PRECISION", "NUMERIC")
+DECLARED_FLOAT = r"(?:DOUBLE PRECISION|FLOAT|REAL|DOUBLE|NUMERIC)\b(?:\s*\([^)]*\))?"
+
+def float_columns(bind: Engine) -> list[tuple[str, str]]:
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+    columns = []
+    for table, column in MONEY_COLUMNS:
+        if table not in tables:
+            continue
+        declared = next(c["type"] for c in inspector.get_columns(table) if c["name"] == column)
+        if type(declared).__name__.upper() in FLOAT_TYPES:
+            columns.append((table, column))
+    return columns
+
+def needs_migration(bind: Engine) -> bool:
+    return bool(float_columns(bind))
+
+def rebuild_sqlite_table(cursor, table: str, column: str, scale: int):
+    """
+    SQLite cannot change a column type in place: create a copy of the table with the column
+    declared BIGINT, copy the rows across as cents, swap it in and recreate its indexes and triggers.
+    """
+    create_sql, = cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    extras = [sql for sql, in cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL", (table,)
+    )]
+    names = [row[1] for row in cursor.execute(f'PRAGMA table_info("{table}")')]
+
+    declaration = re.compile(rf'(["`\[]?{column}["`\]]?\s+){DECLARED_FLOAT}', re.IGNORECASE)
+    body, found = declaration.subn(r"\1BIGINT", create_sql[create_sql.index("("):], count=1)
+    if not found:
+        raise RuntimeError(f"Could not find the declaration of {table}.{column} in: {create_sql}")
+    cursor.execute(f'CREATE TABLE "{table}__cents" {body}')
+
+    selected = ", ".join(
+        f'CAST(ROUND(COALESCE("{name}", 0) * {scale}) AS INTEGER)' if name == column else f'"{name}"'
+        for name in names
+    )
+    quoted = ", ".join(f'"{name}"' for name in names)
+    cursor.execute(f'INSERT INTO "{table}__cents" ({quoted}) SELECT {selected} FROM "{table}"')
+    cursor.execute(f'DROP TABLE "{table}"')
+    cursor.execute(f'ALTER TABLE "{table}__cents" RENAME TO "{table}"')
+    for sql in extras:
+        cursor.execute(sql)
+
+def migrate_sqlite(bind: Engine, columns: list[tuple[str, str]]):
+    # Table rebuilds need foreign keys off, and that pragma is ignored inside a transaction,
+    # so drive the transaction on the raw connection
+    raw = bind.raw_connection()
+    try:
+        connection = raw.driver_connection
+        isolation_level, connection.isolation_level = connection.isolation_level, None
+        cursor = connection.cursor()
+        foreign_keys = cursor.execute("PRAGMA foreign_keys").fetchone()[0]
+        cursor.execute("PRAGMA foreign_keys = OFF")
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            already_cents = cursor.execute("PRAGMA user_version").fetchone()[0] >= MONEY_SCHEMA_VERSION
+            for table, column in columns:
+                rebuild_sqlite_table(cursor, table, column, 1 if already_cents else 100)
+                print(f"Converted {table}.{column} to integer cents")
+            if cursor.execute("PRAGMA foreign_key_check").fetchone() is not None:
+                raise RuntimeError("Foreign key check failed after rebuilding the money tables")
+            cursor.execute(f"PRAGMA user_version = {MONEY_SCHEMA_VERSION}")
+            cursor.execute("COMMIT")
+        except BaseException:
+            if connection.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.execute(f"PRAGMA foreign_keys = {foreign_keys}")
+            connection.isolation_level = isolation_level
+    finally:
+        raw.close()
+
+def migrate_money(bind: Engine | None = None):
+    bind = bind or get_engine()
+    columns = float_columns(bind)
+    if not columns:
+        print("Money columns already stored as integer cents.")
+        return
+
+    if bind.dialect.name == "sqlite":
+        migrate_sqlite(bind, columns)
+    else:
+        with bind.begin() as conn:
+            for table, column in columns:
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE BIGINT "
+                    f"USING ROUND(COALESCE({column}, 0) * 100)::BIGINT"
+                )
+                print(f"Converted {table}.{column} to integer cents")
+
+    print("Money migration complete.")
+
+if __name__ == "__main__":
+    migrate_money()
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+One-off migration from the legacy transactions table (a signed row per leg, transfers written
+twice) to journal entries and postings:
+    python -m app.database.migrate_schema      # creates the new tables and accounts.posting_seq
+    python -m app.database.migrate_postings [--drop-legacy]
+Each transfer's credit leg is paired with its debit leg (the same accounts and amount, matched
+in id order), and the pair becomes one journal entry that keeps the debit leg's id. Balances
+that never went through the ledger (initial balances, older deposits) get an "Opening balance"
+entry one second before the account's first leg, so running balances end at accounts.balance.
+Postings are numbered and given running balances per account in (timestamp, id) order by window
+functions, so the database does the sorting whatever the ledger size. Safe to re-run.
+"""
+
+# Imports
+import argparse
+import time
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from app.database.create_database import get_engine
+from app.database.migrate_schema import migrate_schema
+
+# Legs staged as (leg_id, journal_id, account_id, amount, timestamp); legs sharing a journal_id are one movement
+STAGE_LEGACY_LEGS = text("""
+    CREATE TEMP TABLE ledger_legs AS
+    WITH legs AS (
+        SELECT id, transaction_type, from_account_id, to_account_id, amount, timestamp,
+               ROW_NUMBER() OVER (
+                   PARTITION BY transaction_type, from_account_id, to_account_id, ABS(amount), amount < 0
+                   ORDER BY id
+               ) AS pair
+        FROM transactions
+    )
+    SELECT c.id AS leg_id,
+           COALESCE(d.id, c.id) AS journal_id,
+           CASE WHEN c.amount < 0 THEN c.from_account_id ELSE c.to_account_id END AS account_id,
+           c.amount AS amount,
+           c.timestamp AS timestamp
+    FROM legs c
+    LEFT JOIN legs d
+      ON c.transaction_type = 'transfer' AND c.amount > 0
+     AND d.transaction_type = 'transfer' AND d.amount = -c.amount
+     AND d.from_account_id = c.from_account_id AND d.to_account_id = c.to_account_id
+     AND d.pair = c.pair
+""")
+
+# Default transfer descriptions are dropped; statements render them from the account's side
+INSERT_LEGACY_ENTRIES = text("""
+    INSERT INTO journal_entries (id, transaction_type, from_account_id, to_account_id, amount, description, timestamp)
+    SELECT t.id, t.transaction_type, t.from_account_id, t.to_account_id, ABS(t.amount),
+           CASE WHEN t.transaction_type = 'transfer' AND t.description IN (
+                    'Transfer to account ' || CAST(t.to_account_id AS VARCHAR),
+                    'Transfer from account ' || CAST(t.from_account_id AS VARCHAR)
+                ) THEN NULL ELSE t.description END,
+           t.timestamp
+    FROM transactions t
+    WHERE t.id IN (SELECT journal_id FROM ledger_legs)
+""")
+
+# The part of each balance its legacy legs do not explain, numbered after every existing id
+STAGE_OPENING_BALANCES = """
+    CREATE TEMP TABLE opening_balances AS
+    SELECT a.id AS account_id,
+           a.balance - COALESCE(l.total, 0) AS amount,
+           CASE WHEN l.first_at IS NULL THEN COALESCE(a.created_at, {now}) ELSE {before_first} END AS timestamp,
+           (SELECT COALESCE(MAX(id), 0) FROM (SELECT id FROM transactions UNION ALL SELECT id FROM journal_entries) ids)
+               + ROW_NUMBER() OVER (ORDER BY a.id) AS journal_id
+    FROM accounts a
+    LEFT JOIN (
+        SELECT account_id, SUM(amount) AS total, MIN(timestamp) AS first_at FROM ledger_legs GROUP BY account_id
+    ) l ON l.account_id = a.id
+    WHERE a.balance <> COALESCE(l.total, 0)
+"""
+OPENING_TIMES = {
+    "sqlite": {"now": "CURRENT_TIMESTAMP", "before_first": "datetime(l.first_at, '-1 second')"},
+    "postgresql": {"now": "LOCALTIMESTAMP", "before_first": "l.first_at - INTERVAL '1 second'"},
+}
+
+INSERT_OPENING_ENTRIES = text("""
+    INSERT INTO journal_entries (id, transaction_type, from_account_id, to_account_id, amount, description, timestamp)
+    SELECT journal_id,
+           CASE WHEN amount > 0 THEN 'deposit' ELSE 'withdrawal' END,
+           CASE WHEN amount < 0 THEN account_id END,
+           CASE WHEN amount > 0 THEN account_id END,
+           ABS(amount), 'Opening balance', timestamp
+    FROM opening_balances
+""")
+
+STAGE_OPENING_LEGS = text("""
+    INSERT INTO ledger_legs (leg_id, journal_id, account_id, amount, timestamp)
+    SELECT journal_id, journal_id, account_id, amount, timestamp FROM opening_balances
+""")
+
+INSERT_POSTINGS = text("""
+    INSERT INTO postings (account_id, seq, journal_id, amount, balance, timestamp)
+    SELECT account_id,
+           ROW_NUMBER() OVER w,
+           journal_id,
+           amount,
+           SUM(amount) OVER (w ROWS UNBOUNDED PRECEDING),
+           timestamp
+    FROM ledger_legs
+    WHERE account_id IS NOT NULL
+    WINDOW w AS (PARTITION BY account_id ORDER BY timestamp, journal_id)
+""")
+
+UPDATE_POSTING_SEQ = text("""
+    UPDATE accounts SET posting_seq = COALESCE((SELECT MAX(p.seq) FROM postings p WHERE p.account_id = accounts.id), 0)
+""")
+
+def build_postings(conn: Connection) -> int:
+    """
+    Numbers the staged ledger_legs into postings with running balances, sets every
+    account's posting_seq, and drops the staging table. Returns the number of postings.
+    """
+    postings = conn.execute(INSERT_POSTINGS).rowcount
+    conn.execute(UPDATE_POSTING_SEQ)
+    conn.execute(text("DROP TABLE ledger_legs"))
+    return postings
+
+def stage_opening_balances(conn: Connection) -> int:
+    """
+    Adds an opening entry and leg for every account whose balance differs from the sum
+    of its staged legs. Returns the number of opening entries.
+    """
+    conn.execute(text(STAGE_OPENING_BALANCES.format(**OPENING_TIMES[conn.dialect.name])))
+    openings = conn.execute(INSERT_OPENING_ENTRIES).rowcount
+    conn.execute(STAGE_OPENING_LEGS)
+    conn.execute(text("DROP TABLE opening_balances"))
+    return openings
+
+def migrate_postings(bind: Engine | None = None, drop_legacy: bool = False) -> dict:
+    bind = bind or get_engine()
+    if "transactions" not in inspect(bind).get_table_names():
+        print("No legacy transactions table; nothing to migrate.")
+        return {}
+    migrate_schema(bind)
+
+    with bind.begin() as conn:
+        if conn.execute(text("SELECT 1 FROM postings LIMIT 1")).first() is not None:
+            print("Postings already present; skipping.")
+            return {}
+        conn.execute(STAGE_LEGACY_LEGS)
+        counts = {"journal_entries": conn.execute(INSERT_LEGACY_ENTRIES).rowcount}
+        counts["opening_balances"] = stage_opening_balances(conn)
+        counts["postings"] = build_postings(conn)
+        # Explicit ids bypass the Postgres sequence; move it past the migrated rows
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('journal_entries', 'id'), "
+                "COALESCE((SELECT MAX(id) FROM journal_entries), 1))"
+            ))
+        if drop_legacy:
+            conn.execute(text("DROP TABLE transactions"))
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move the legacy transactions table into journal entries and postings.")
+    parser.add_argument("--drop-legacy", action="store_true", help="Drop the transactions table afterwards")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts = migrate_postings(get_engine(), args.drop_legacy)
+    elapsed = time.perf_counter() - start
+    for table, rows in counts.items():
+        print(f"{table:>16}: {rows:,} rows")
+    print(f"Postings migration complete in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
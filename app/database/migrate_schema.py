@@ -0,0 +1,44 @@
+"""
+Brings an existing database up to the current models without dropping data.
+Creates missing tables, adds missing nullable columns, and builds missing indexes.
+"""
+
+# Imports
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+from app.database.create_database import Base, get_engine
+from app import models  # registers the tables on Base.metadata
+
+def migrate_schema(bind: Engine | None = None):
+    bind = bind or get_engine()
+    Base.metadata.create_all(bind=bind)  # new tables (with their indexes)
+    inspector = inspect(bind)
+
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    print(f"Skipping {table.name}.{column.name}: NOT NULL without a server default")
+                    continue
+                column_spec = column.type.compile(dialect=bind.dialect)
+                if column.server_default is not None:
+                    # Existing rows take the default, so NOT NULL can be kept
+                    default = bind.dialect.ddl_compiler(bind.dialect, None).get_column_default_string(column)
+                    column_spec += f" DEFAULT {default}" + ("" if column.nullable else " NOT NULL")
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_spec}")
+                print(f"Added column {table.name}.{column.name}")
+
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    conn.execute(CreateIndex(index))
+                    print(f"Created index {index.name}")
+
+    print("Schema migration complete.")
+
+if __name__ == "__main__":
+    migrate_schema()
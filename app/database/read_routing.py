@@ -0,0 +1,115 @@
+"""
+Routes read-only sessions to replica databases, with read-your-writes pinning.
+Set DATABASE_REPLICA_URLS (comma-separated) to spread list and history reads across replicas;
+after a user's own write, that user's reads stay on the primary for READ_YOUR_WRITES_SECONDS.
+"""
+
+# Imports
+import itertools
+import threading
+import time
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from app.database.create_database import engine_options, get_async_read_engine, to_async_url
+from app.settings import get_settings, lazy
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# -------------------------
+# Helpers
+# -------------------------
+def replica_engine(url: str) -> AsyncEngine:
+    async_url = to_async_url(url)
+    return create_async_engine(async_url, **engine_options(async_url))
+
+def pin_key(request: Request) -> str:
+    """
+    Identifies the user behind a request without verifying the token or touching the DB.
+    Only used to pick a database, so a forged subject can at most send its reads to the primary.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        from jose import jwt
+        from jose.exceptions import JOSEError
+        try:
+            return str(jwt.get_unverified_claims(token).get("sub") or "anonymous")
+        except JOSEError:
+            pass
+    return "anonymous"
+
+# -------------------------
+# Router
+# -------------------------
+class ReplicaRouter:
+    """
+    Round-robins reads over the replicas; pinned users and deployments without replicas read from the primary.
+    Pins are per process, so multi-worker deployments should keep the window above replica lag.
+    """
+    def __init__(self, primary: AsyncEngine, replicas: list[AsyncEngine], pin_seconds: float | None = None):
+        self.primary = primary
+        self.replicas = replicas
+        self.pin_seconds = get_settings().read_your_writes_seconds if pin_seconds is None else pin_seconds
+        self.pinned: dict[str, float] = {}
+        self.cycle = itertools.cycle(replicas)
+        self.lock = threading.Lock()
+
+    def pin(self, key: str):
+        if not self.replicas or self.pin_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self.lock:
+            self.pinned[key] = now + self.pin_seconds
+            if len(self.pinned) > 10000:
+                self.pinned = {k: until for k, until in self.pinned.items() if until > now}
+
+    def is_pinned(self, key: str) -> bool:
+        with self.lock:
+            until = self.pinned.get(key)
+        return until is not None and until > time.monotonic()
+
+    def engine_for(self, key: str) -> AsyncEngine:
+        if not self.replicas or self.is_pinned(key):
+            return self.primary
+        with self.lock:
+            return next(self.cycle)
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.dispose()
+
+@lazy
+def get_read_router() -> ReplicaRouter:
+    from app.utils.metrics import instrument_engine
+    replicas = [replica_engine(url) for url in get_settings().database_replica_urls]
+    for i, replica in enumerate(replicas):
+        instrument_engine(replica, f"replica_{i}")
+    return ReplicaRouter(get_async_read_engine(), replicas)
+
+# -------------------------
+# FastAPI integration
+# -------------------------
+async def get_async_read_db(request: Request):
+    """
+    Async read-only dependency for list and history routes.
+    """
+    async with AsyncSession(get_read_router().engine_for(pin_key(request)), autoflush=False, expire_on_commit=False) as db:
+        yield db
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware: a successful write pins its user to the primary for the next reads,
+    before the response goes out. Passes everything through when there are no replicas.
+    """
+    def __init__(self, app, enabled: bool | None = None):
+        self.app = app
+        self.enabled = bool(get_settings().database_replica_urls) if enabled is None else enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled or scope["method"] in SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def pin_on_success(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                get_read_router().pin(pin_key(Request(scope)))
+            await send(message)
+        await self.app(scope, receive, pin_on_success)
\ No newline at end of file
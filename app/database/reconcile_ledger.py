@@ -0,0 +1,90 @@
+"""
+Nightly ledger reconciliation.
+Streams the postings table in chunks into NumPy int64 arrays, recomputes
+every account balance from the ledger, and diffs it against accounts.balance.
+All arithmetic is exact integer cents, so no tolerance is needed.
+"""
+
+# Imports
+import argparse
+import sys
+import time
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.database.create_database import get_engine
+from app.utils.money import from_cents
+
+CHUNK_SIZE = 500_000
+
+# Each posting belongs to exactly one account
+LEDGER_QUERY = text("SELECT account_id, amount FROM postings")
+BALANCE_QUERY = text("SELECT id, balance FROM accounts")
+
+# -------------------------
+# Helpers
+# -------------------------
+def stream_columns(conn, query, chunk_size: int):
+    """
+    Yields (ids, values) int64 arrays per chunk using a server-side cursor where supported.
+    """
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+    for rows in result.partitions():
+        block = np.array(rows, dtype=np.int64).reshape(-1, 2)
+        yield block[:, 0], block[:, 1]
+
+def ledger_balances(conn, chunk_size: int = CHUNK_SIZE) -> tuple[np.ndarray, int]:
+    """
+    Returns per-account ledger sums in cents (indexed by account id) and the row count.
+    """
+    totals = np.zeros(0, dtype=np.int64)
+    rows = 0
+    for ids, amounts in stream_columns(conn, LEDGER_QUERY, chunk_size):
+        if ids.size and ids.max() >= totals.size:
+            totals = np.concatenate([totals, np.zeros(ids.max() + 1 - totals.size, dtype=np.int64)])
+        np.add.at(totals, ids, amounts)
+        rows += ids.size
+    return totals, rows
+
+def reconcile(bind: Engine | None = None, chunk_size: int = CHUNK_SIZE) -> tuple[list[tuple[int, int, int]], int]:
+    """
+    Returns (account_id, stored_cents, ledger_cents) for every account that does not reconcile,
+    plus the number of ledger rows scanned.
+    """
+    bind = bind or get_engine()
+    with bind.connect() as conn:
+        totals, rows = ledger_balances(conn, chunk_size)
+        mismatches = []
+        for ids, stored in stream_columns(conn, BALANCE_QUERY, chunk_size):
+            expected = np.zeros(ids.size, dtype=np.int64)
+            known = ids < totals.size
+            expected[known] = totals[ids[known]]
+            for i in np.nonzero(stored != expected)[0]:
+                mismatches.append((int(ids[i]), int(stored[i]), int(expected[i])))
+    return mismatches, rows
+
+# -------------------------
+# CLI
+# -------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recompute account balances from the ledger and report differences.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows fetched per chunk")
+    parser.add_argument("--show", type=int, default=20, help="Mismatched accounts to print")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    mismatches, rows = reconcile(chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"Reconciled {rows} ledger rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    if not mismatches:
+        print("All account balances match the ledger.")
+        return 0
+
+    print(f"{len(mismatches)} account(s) do not reconcile:")
+    for account_id, stored, expected in mismatches[:args.show]:
+        print(f"  account {account_id}: stored {from_cents(stored)} ledger {from_cents(expected)}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
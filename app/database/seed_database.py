@@ -1,81 +1,290 @@
 """
-Populates the database with sample data for testing.
-Creates users, accounts, transactions, and cards.
-Encrypted card numbers, expiry dates, and CVVs for Fernet decryption compatibility.
+Populates the database with synthetic data for development and load testing.
+Creates users, accounts, a reconciled ledger (journal entries and postings), and cards at any scale, e.g.
+    python -m app.database.seed_database --users 1e6 --accounts-per-user 3 --tx-per-account 200
+Rows are generated in columnar NumPy chunks and written with driver-level executemany;
+card fields are Fernet-encrypted in parallel worker processes.
+Every generated user's password is "password".
 """
 
 # Imports
-import os
-from dotenv import load_dotenv
-from sqlalchemy.orm import Session
-from app.database.create_database import SessionLocal, Base, engine
-from app.models import User, Account, Card
-from cryptography.fernet import Fernet
-from werkzeug.security import generate_password_hash
-
-# Load environment variables
-load_dotenv()
-CARD_ENCRYPTION_KEY = os.getenv("CARD_ENCRYPTION_KEY")
-fernet = Fernet(CARD_ENCRYPTION_KEY.encode())
-
-# Utility functions
-def encrypt(value: str) -> str:
-    return fernet.encrypt(value.encode()).decode()
-
-# Reset DB (drop all tables and recreate)
-Base.metadata.drop_all(bind=engine)
-Base.metadata.create_all(bind=engine)
-
-# Start session
-db: Session = SessionLocal()
-
-try:
-    # --- Users ---
-    alice = User(
-        id=1,
-        name="Alice Johnson",
-        email="alice@example.com",
-        hashed_password=generate_password_hash("alicepassword")
-    )
-    bob = User(
-        id=2,
-        name="Bob Smith",
-        email="bob@example.com",
-        hashed_password=generate_password_hash("bobpassword")
-    )
-    db.add_all([alice, bob])
-    db.commit()
-
-    # --- Accounts ---
-    acc1 = Account(id=1, user_id=1, account_type="checking", balance=2500.0)
-    acc2 = Account(id=2, user_id=1, account_type="savings", balance=4000.0)
-    acc3 = Account(id=3, user_id=2, account_type="checking", balance=1800.0)
-    db.add_all([acc1, acc2, acc3])
-    db.commit()
-
-    # --- Cards ---
-    card1 = Card(
-        id=1,
-        account_id=1,
-        user_id=1,
-        card_number=encrypt("1111222233334444"),
-        expiry_date=encrypt("12/30"),
-        cvv=encrypt("123"),
-        is_active=True
-    )
-    card2 = Card(
-        id=2,
-        account_id=2,
-        user_id=1,
-        card_number=encrypt("5555666677778888"),
-        expiry_date=encrypt("01/31"),
-        cvv=encrypt("456"),
-        is_active=True
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from sqlalchemy import table, text
+from sqlalchemy.engine import Connection, Engine
+from app.database.create_database import Base, get_engine
+from app.database.migrate_postings import build_postings
+from app.models import User, Account, JournalEntry, Posting, Card
+from app.utils.card_crypto import encrypt_value
+from app.utils.card_issuance import CARD_BIN, card_fingerprint, luhn_check_digit
+from app.utils.password_hashing import get_pwd_context
+
+MAX_AMOUNT_CENTS = 50_000
+HISTORY_SECONDS = 365 * 24 * 3600
+EPOCH = np.datetime64("2025-01-01T00:00:00", "us")
+
+# Loading profile: the file is rebuilt from scratch, so durability is traded for speed
+SQLITE_LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = MEMORY",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -262144",  # 256 MB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA locking_mode = EXCLUSIVE",
+]
+
+# -------------------------
+# Helpers
+# -------------------------
+def insert_rows(conn: Connection, table, columns: list[str], rows: list[tuple]) -> int:
+    """
+    executemany straight on the DBAPI cursor, skipping per-row ORM/Core processing.
+    Values must already be in storage form (e.g. money in cents).
+    """
+    if not rows:
+        return 0
+    marker = {"qmark": "?", "numeric": ":1", "named": ":p"}.get(conn.dialect.paramstyle, "%s")
+    if marker == ":1":
+        params = ", ".join(f":{i + 1}" for i in range(len(columns)))
+    elif marker == ":p":
+        params = ", ".join(f":p{i}" for i in range(len(columns)))
+        rows = [{f"p{i}": v for i, v in enumerate(row)} for row in rows]
+    else:
+        params = ", ".join([marker] * len(columns))
+    conn.exec_driver_sql(f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({params})", rows)
+    return len(rows)
+
+def timestamps(conn: Connection, seconds: np.ndarray) -> list:
+    """
+    Converts second offsets to what the DateTime column stores for this dialect.
+    """
+    values = EPOCH + seconds.astype("timedelta64[s]")
+    if conn.dialect.name == "sqlite":
+        return np.char.replace(np.datetime_as_string(values, unit="us"), "T", " ").tolist()
+    return values.tolist()
+
+def nullable(ids: np.ndarray) -> list:
+    return [i or None for i in ids.tolist()]
+
+def card_number_for(card_id: int) -> str:
+    """
+    Deterministic, unique, Luhn-valid synthetic PAN (no collision checks needed).
+    """
+    body = f"{CARD_BIN}{card_id:09d}"
+    return body + luhn_check_digit(body)
+
+def encrypt_cards(card_ids: list[int]) -> list[tuple]:
+    """
+    Runs in a worker process: builds and encrypts the sensitive fields for a block of cards.
+    """
+    rows = []
+    for card_id in card_ids:
+        number = card_number_for(card_id)
+        expiry = f"{card_id % 12 + 1:02d}/{30 + card_id % 5}"
+        cvv = f"{card_id * 7919 % 1000:03d}"
+        rows.append((
+            encrypt_value(number), encrypt_value(expiry), encrypt_value(cvv),
+            number[-4:], expiry, card_fingerprint(number)
+        ))
+    return rows
+
+# -------------------------
+# Ledger generation
+# -------------------------
+def generate_ledger(first_account: int, last_account: int, total_accounts: int, tx_per_account: int, seed: int):
+    """
+    Builds the journal entries originated by accounts [first_account, last_account) as columns.
+    Each account gets an opening deposit large enough that its debits can never overdraw it,
+    then random deposits, withdrawals, and transfers. Amounts are positive cents; an account id
+    of 0 means no account on that side. Deterministic per seed.
+    """
+    rng = np.random.default_rng([seed, first_account])
+    origin = np.arange(first_account, last_account, dtype=np.int64)
+    opening = np.full(origin.size, tx_per_account * MAX_AMOUNT_CENTS, dtype=np.int64)
+
+    events = np.repeat(origin, max(tx_per_account - 1, 0))
+    kind = rng.choice(3, size=events.size, p=[0.3, 0.2, 0.5])  # deposit, withdrawal, transfer
+    amount = rng.integers(100, MAX_AMOUNT_CENTS + 1, size=events.size, dtype=np.int64)
+    other = rng.integers(1, total_accounts + 1, size=events.size, dtype=np.int64)
+    other = np.where(other == events, other % total_accounts + 1, other)
+    deposit, withdrawal, transfer = kind == 0, kind == 1, kind == 2
+    if total_accounts == 1:  # nobody to transfer to
+        deposit, transfer = deposit | transfer, np.zeros(events.size, dtype=bool)
+
+    zeros = lambda n: np.zeros(n, dtype=np.int64)
+    from_ids = np.concatenate([zeros(origin.size), zeros(deposit.sum()), events[withdrawal], events[transfer]])
+    to_ids = np.concatenate([origin, events[deposit], zeros(withdrawal.sum()), other[transfer]])
+    amounts = np.concatenate([opening, amount[deposit], amount[withdrawal], amount[transfer]])
+    types = (
+        ["deposit"] * int(origin.size + deposit.sum())
+        + ["withdrawal"] * int(withdrawal.sum())
+        + ["transfer"] * int(transfer.sum())
     )
-    db.add_all([card1, card2])
-    db.commit()
+    seconds = rng.integers(0, HISTORY_SECONDS, size=amounts.size, dtype=np.int64)
+    seconds[:origin.size] = 0  # opening balances come first
+    descriptions = ["Opening balance"] * int(origin.size) + [None] * int(amounts.size - origin.size)
+    return from_ids, to_ids, amounts, types, descriptions, seconds
+
+def ledger_legs(from_ids: np.ndarray, to_ids: np.ndarray, amounts: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Each entry's postings as (entry index, account id, signed amount): a debit on the source, a credit on the destination.
+    """
+    index = np.arange(amounts.size)
+    debit, credit = from_ids != 0, to_ids != 0
+    entries = np.concatenate([index[debit], index[credit]])
+    accounts = np.concatenate([from_ids[debit], to_ids[credit]])
+    signed = np.concatenate([-amounts[debit], amounts[credit]])
+    return entries, accounts, signed
 
-    print("Database seeded successfully!")
+# -------------------------
+# Loader
+# -------------------------
+def seed_database(
+    bind: Engine | None = None,
+    users: int = 100,
+    accounts_per_user: int = 2,
+    tx_per_account: int = 20,
+    cards_per_user: int = 1,
+    chunk_size: int = 50_000,
+    workers: int = 4,
+    seed: int = 42
+) -> dict:
+    bind = bind or get_engine()
+    total_accounts = users * accounts_per_user
+    total_cards = users * min(cards_per_user, accounts_per_user)
+    counts = {}
+    start = time.perf_counter()
+
+    # Reset DB (drop all tables and recreate); ledger indexes are rebuilt after the load
+    Base.metadata.drop_all(bind=bind)
+    Base.metadata.create_all(bind=bind)
+    ledger_indexes = list(Posting.__table__.indexes)
+    for index in ledger_indexes:
+        index.drop(bind)
+
+    with bind.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            for pragma in SQLITE_LOAD_PRAGMAS:
+                conn.exec_driver_sql(pragma)
+            conn.commit()
+        with conn.begin():
+            # --- Users ---
+            hashed = get_pwd_context().hash("password")
+            counts["users"] = 0
+            for first in range(1, users + 1, chunk_size):
+                ids = np.arange(first, min(first + chunk_size, users + 1))
+                created = timestamps(conn, np.zeros(ids.size, dtype=np.int64))
+                counts["users"] += insert_rows(conn, User.__table__, ["id", "name", "email", "hashed_password", "created_at"], [
+                    (i, f"User {i}", f"user{i}@example.com", hashed, c) for i, c in zip(ids.tolist(), created)
+                ])
+
+            # --- Balances: a first, DB-free pass over the ledger generator ---
+            accounts_per_chunk = max(1, chunk_size // max(1, 2 * tx_per_account))
+            balances = np.zeros(total_accounts + 1, dtype=np.int64)
+            for first in range(1, total_accounts + 1, accounts_per_chunk):
+                last = min(first + accounts_per_chunk, total_accounts + 1)
+                from_ids, to_ids, amounts, _, _, _ = generate_ledger(first, last, total_accounts, tx_per_account, seed)
+                _, accounts, signed = ledger_legs(from_ids, to_ids, amounts)
+                np.add.at(balances, accounts, signed)
+
+            # --- Accounts ---
+            counts["accounts"] = 0
+            for first in range(1, total_accounts + 1, chunk_size):
+                ids = np.arange(first, min(first + chunk_size, total_accounts + 1))
+                owners = (ids - 1) // accounts_per_user + 1
+                kinds = np.where((ids - 1) % accounts_per_user == 0, "checking", "savings")
+                created = timestamps(conn, np.zeros(ids.size, dtype=np.int64))
+                counts["accounts"] += insert_rows(conn, Account.__table__, ["id", "user_id", "account_type", "balance", "created_at"], list(
+                    zip(ids.tolist(), owners.tolist(), kinds.tolist(), balances[ids].tolist(), created)
+                ))
+
+            # --- Journal entries (same generator, same seed); their legs are staged for numbering ---
+            conn.execute(text(
+                "CREATE TEMP TABLE ledger_legs (journal_id INTEGER, account_id INTEGER, amount BIGINT, timestamp TIMESTAMP)"
+            ))
+            counts["journal_entries"] = 0
+            next_id = 1
+            for first in range(1, total_accounts + 1, accounts_per_chunk):
+                last = min(first + accounts_per_chunk, total_accounts + 1)
+                from_ids, to_ids, amounts, types, descriptions, seconds = generate_ledger(first, last, total_accounts, tx_per_account, seed)
+                ids = np.arange(next_id, next_id + amounts.size)
+                next_id += amounts.size
+                counts["journal_entries"] += insert_rows(conn, JournalEntry.__table__, [
+                    "id", "transaction_type", "from_account_id", "to_account_id", "amount", "description", "timestamp"
+                ], list(zip(ids.tolist(), types, nullable(from_ids), nullable(to_ids), amounts.tolist(), descriptions, timestamps(conn, seconds))
+                ))
+                entries, accounts, signed = ledger_legs(from_ids, to_ids, amounts)
+                insert_rows(conn, table("ledger_legs"), ["journal_id", "account_id", "amount", "timestamp"], list(
+                    zip(ids[entries].tolist(), accounts.tolist(), signed.tolist(), timestamps(conn, seconds[entries]))
+                ))
+
+            # --- Postings: numbered with running balances per account by the database ---
+            counts["postings"] = build_postings(conn)
+
+            # --- Cards (encrypted in worker processes) ---
+            counts["cards"] = 0
+            card_ids = list(range(1, total_cards + 1))
+            per_user = min(cards_per_user, accounts_per_user)
+            block = max(1, min(chunk_size, -(-len(card_ids) // max(1, workers * 4))))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                blocks = [card_ids[i:i + block] for i in range(0, len(card_ids), block)]
+                for ids, encrypted in zip(blocks, pool.map(encrypt_cards, blocks)):
+                    rows = []
+                    for card_id, (number, expiry, cvv, last4, expiry_plain, fingerprint) in zip(ids, encrypted):
+                        user_id = (card_id - 1) // per_user + 1
+                        account_id = (user_id - 1) * accounts_per_user + (card_id - 1) % per_user + 1
+                        rows.append((card_id, account_id, user_id, number, expiry, cvv, last4, expiry_plain, fingerprint, True))
+                    counts["cards"] += insert_rows(conn, Card.__table__, [
+                        "id", "account_id", "user_id", "card_number", "expiry_date", "cvv",
+                        "card_last4", "expiry_display", "card_fingerprint", "is_active"
+                    ], rows)
+
+            # Explicit ids bypass Postgres sequences; move them past the loaded rows
+            if conn.dialect.name == "postgresql":
+                for name in ("users", "accounts", "journal_entries", "cards"):
+                    conn.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), COALESCE((SELECT MAX(id) FROM {name}), 1))"
+                    ))
+
+        # The loading PRAGMAs (exclusive lock, no fsync) must not leak into the pool
+        conn.invalidate()
+
+    for index in ledger_indexes:
+        index.create(bind)
+
+    counts["seconds"] = time.perf_counter() - start
+    return counts
+
+# -------------------------
+# CLI
+# -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drop and regenerate the database with synthetic data.")
+    parser.add_argument("--users", type=float, default=100, help="Number of users (accepts 1e6)")
+    parser.add_argument("--accounts-per-user", type=int, default=2)
+    parser.add_argument("--tx-per-account", type=int, default=20, help="Ledger events originated per account")
+    parser.add_argument("--cards-per-user", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per insert batch")
+    parser.add_argument("--workers", type=int, default=4, help="Processes used to encrypt card fields")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    counts = seed_database(
+        get_engine(),
+        users=int(args.users),
+        accounts_per_user=args.accounts_per_user,
+        tx_per_account=args.tx_per_account,
+        cards_per_user=args.cards_per_user,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        seed=args.seed
+    )
+    elapsed = counts.pop("seconds")
+    total = sum(counts.values())
+    for name, rows in counts.items():
+        print(f"{name:>12}: {rows:,} rows")
+    print(f"Database seeded successfully! {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/sec)")
 
-finally:
-    db.close()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
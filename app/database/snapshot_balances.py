@@ -0,0 +1,45 @@
+"""
+Catches the daily_balances snapshots up with the postings, e.g. after seeding or a migration:
+    python -m app.database.snapshot_balances
+The API keeps them current in the background; this is safe to run at the same time.
+"""
+
+# Imports
+import argparse
+import time
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.database.create_database import get_engine
+from app.utils.balance_snapshots import SNAPSHOT_BATCH_SIZE, SNAPSHOT_SETTLE_SECONDS, refresh_daily_balances
+
+def snapshot_balances(
+    bind: Engine,
+    batch_size: int = SNAPSHOT_BATCH_SIZE,
+    settle_seconds: float = SNAPSHOT_SETTLE_SECONDS
+) -> int:
+    """
+    Folds every journal entry past the watermark into the snapshots, one commit per batch.
+    """
+    total = 0
+    with Session(bind) as db:
+        while True:
+            folded = refresh_daily_balances(db, batch_size, settle_seconds)
+            db.commit()
+            total += folded
+            if folded < batch_size:
+                return total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fold new journal entries into the daily balance snapshots.")
+    parser.add_argument("--batch-size", type=int, default=SNAPSHOT_BATCH_SIZE, help="Journal entries per transaction")
+    parser.add_argument("--settle-seconds", type=float, default=SNAPSHOT_SETTLE_SECONDS,
+                        help="Leave entries younger than this for a later run")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    entries = snapshot_balances(get_engine(), args.batch_size, args.settle_seconds)
+    elapsed = time.perf_counter() - start
+    print(f"Folded {entries:,} journal entries into daily balances in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
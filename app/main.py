@@ -4,30 +4,98 @@ Ties all the routes files together so now they are accessible via API.
 """
 
 # Imports
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.routes.auth import router as auth_router
 from app.routes.accounts import router as accounts_router
 from app.routes.transactions import router as transactions_router
 from app.routes.cards import router as cards_router
-from app.database.create_database import SessionLocal
+from app.routes.events import router as events_router
+from app.database.create_database import dispose_engines, get_async_engine, get_async_read_engine, get_engine
+from app.database.read_routing import ReadYourWritesMiddleware, get_read_router
+from app.settings import get_settings
+from app.utils.card_crypto import get_decrypt_pool, get_fernet
+from app.utils.background import run_periodically
+from app.utils.balance_snapshots import SNAPSHOT_INTERVAL, refresh_snapshots
+from app.utils.idempotency import IDEMPOTENCY_COMPACT_INTERVAL, compact_idempotency_keys
+from app.utils.outbox import outbox_written
+from app.utils.outbox_relay import OUTBOX_RELAY_INTERVAL, relay_outbox
+from app.utils.password_hashing import hashing_pool
+from app.utils.sqlite_writer import get_sqlite_writer
+from app.utils.metrics import MetricsMiddleware, registry
+from app.utils.serializers import FastJSONResponse
+from app.utils.rate_limit import RateLimitMiddleware
+
+# -------------------------
+# Lifespan
+# -------------------------
+def warm_up():
+    """
+    Builds the engines, read router, SQLite writer and Fernet up front so the first
+    request doesn't pay for them; everything is also built on first use without lifespan.
+    """
+    get_engine()
+    get_async_engine()
+    get_async_read_engine()
+    get_read_router()
+    writer = get_sqlite_writer()
+    if writer is not None:
+        writer.start()
+    if get_settings().card_encryption_key:
+        get_fernet()
+    from jose import jwt  # noqa: F401 (import cost paid here rather than on the first login)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up()
+    jobs = [
+        asyncio.create_task(run_periodically(compact_idempotency_keys, IDEMPOTENCY_COMPACT_INTERVAL, "Idempotency key compaction")),
+        asyncio.create_task(run_periodically(refresh_snapshots, SNAPSHOT_INTERVAL, "Daily balance snapshot refresh")),
+        # Woken by every commit that writes outbox rows; the interval covers other workers' commits
+        asyncio.create_task(run_periodically(relay_outbox, OUTBOX_RELAY_INTERVAL, "Outbox relay", wake=outbox_written)),
+    ]
+    yield
+    for job in jobs:
+        job.cancel()
+    await asyncio.gather(*jobs, return_exceptions=True)
+    # Stop the password hashing worker processes and drain the SQLite writer queue
+    hashing_pool.shutdown()
+    if get_sqlite_writer.built and get_sqlite_writer() is not None:
+        get_sqlite_writer().stop()
+    if get_decrypt_pool.built:
+        get_decrypt_pool().shutdown(wait=False)
+        get_decrypt_pool.reset()
+    if get_read_router.built:
+        await get_read_router().dispose()
+    await dispose_engines()
 
 # Create FastAPI app instance
-app = FastAPI(title="Banking API", version="1.0.0")
+app = FastAPI(title="Banking API", version="1.0.0", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Include routers
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(accounts_router, prefix="/accounts", tags=["Accounts"])
 app.include_router(transactions_router, prefix="/transactions", tags=["Transactions"])
 app.include_router(cards_router, prefix="/cards", tags=["Cards"])
+app.include_router(events_router, prefix="/events", tags=["Events"])
+
+# Keep a user's reads on the primary right after their own writes (a pass-through without replicas)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Admission control sheds excess load before routing; inside metrics so rejections are counted.
+# Both read their settings when the middleware stack is built, on the first request or at startup
+app.add_middleware(RateLimitMiddleware)
+
+# Metrics: request latency/in-flight middleware; engines instrument themselves when built
+app.add_middleware(MetricsMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 # Root endpoint
 @app.get("/")
 def root():
-    return {"message": "Welcome to the Banking API"}
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    return {"message": "Welcome to the Banking API"}
\ No newline at end of file
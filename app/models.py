@@ -1,14 +1,20 @@
 """
-Generates SQLAlchemy models for a banking service including Users, Accounts, Transactions, Cards.
+Generates SQLAlchemy models for a banking service including Users, Accounts, Cards, the
+double-entry ledger (journal entries and their per-account postings), the stored responses
+behind Idempotency-Key replays, daily balance snapshots, and the transactional outbox behind
+the event feed.
 Includes foreign keys, timestamps, and basic constraints.
 Maps to tables in SQLite.
+Relationships never lazy-load: queries opt in with selectinload(), and walking an
+unloaded relationship raises instead of silently issuing one query per row.
 """
 
 # Imports
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database.create_database import Base
+from .utils.money import Money
 
 # Define the entities and attributes
 class User(Base):
@@ -18,10 +24,11 @@ class User(Base):
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")  # bumped by account/card changes (ETags)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    accounts = relationship("Account", back_populates="owner")
-    cards = relationship("Card", back_populates="owner")
+    accounts = relationship("Account", back_populates="owner", lazy="raise_on_sql")
+    cards = relationship("Card", back_populates="owner", lazy="raise_on_sql")
 
 class Account(Base):
     __tablename__ = "accounts"
@@ -29,26 +36,46 @@ class Account(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     account_type = Column(String, nullable=False)  # "checking", "savings"
-    balance = Column(Float, default=0.0)
+    balance = Column(Money, default=0)  # stored as integer cents
+    posting_seq = Column(Integer, nullable=False, default=0, server_default="0")  # seq of the latest posting
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    owner = relationship("User", back_populates="accounts")
-    cards = relationship("Card", back_populates="account")
+    owner = relationship("User", back_populates="accounts", lazy="raise_on_sql")
+    cards = relationship("Card", back_populates="account", lazy="raise_on_sql")
 
-class Transaction(Base):
-    __tablename__ = "transactions"
+class JournalEntry(Base):
+    __tablename__ = "journal_entries"
 
+    # One row per money movement; the per-account effects are its postings
     id = Column(Integer, primary_key=True, index=True)
+    transaction_type = Column(String, nullable=False)  # "deposit", "withdrawal", "transfer"
     from_account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)
     to_account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)
-    amount = Column(Float, nullable=False)
-    transaction_type = Column(String, nullable=False)  # "deposit", "withdrawal", "transfer"
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    amount = Column(Money, nullable=False)  # positive; stored as integer cents
     description = Column(String, nullable=True)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+
+    postings = relationship("Posting", back_populates="entry", lazy="raise_on_sql")
+
+class Posting(Base):
+    __tablename__ = "postings"
 
-    # Relationships - Two-way account transfers
-    from_account = relationship("Account", foreign_keys=[from_account_id], backref="outgoing_transactions")
-    to_account = relationship("Account", foreign_keys=[to_account_id], backref="incoming_transactions")
+    # Append-only; seq counts 1, 2, ... per account (from accounts.posting_seq) under the account row lock
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    journal_id = Column(Integer, ForeignKey("journal_entries.id"), nullable=False)
+    amount = Column(Money, nullable=False)  # signed: debits negative; stored as integer cents
+    balance = Column(Money, nullable=False)  # the account's balance right after this posting
+    timestamp = Column(DateTime, nullable=False)
+
+    # Statements and balances are range scans on the clustered (account_id, seq) key;
+    # date bounds and as-of lookups seek this index first
+    __table_args__ = (
+        Index("ix_postings_account_timestamp", "account_id", "timestamp", "seq"),
+        {"sqlite_with_rowid": False},
+    )
+
+    entry = relationship("JournalEntry", back_populates="postings", lazy="raise_on_sql")
 
 class Card(Base):
     __tablename__ = "cards"
@@ -59,8 +86,67 @@ class Card(Base):
     card_number = Column(String, unique=True, nullable=False) # encryption = needs str type
     expiry_date = Column(String, nullable=False)  # format: MM/YY, encrypted
     cvv = Column(String, nullable=False) # encrypted
+    # Non-sensitive projection for listings (no decryption needed)
+    card_last4 = Column(String(4), nullable=True)
+    expiry_display = Column(String(5), nullable=True)  # MM/YY
+    # Keyed HMAC of the card number: unique lookups without decrypting
+    card_fingerprint = Column(String(64), unique=True, index=True, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    account = relationship("Account", back_populates="cards")
-    owner = relationship("User", back_populates="cards")
\ No newline at end of file
+    __table_args__ = (
+        Index("ix_cards_user_last4", "user_id", "card_last4"),
+    )
+
+    account = relationship("Account", back_populates="cards", lazy="raise_on_sql")
+    owner = relationship("User", back_populates="cards", lazy="raise_on_sql")
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # sha256 of method, path, query and body
+    status_code = Column(Integer, nullable=False, default=200)
+    response_body = Column(String, nullable=True)  # JSON; written in the same commit as the money movement
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)  # compaction range scans
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+    )
+
+class DailyBalance(Base):
+    __tablename__ = "daily_balances"
+
+    # One row per account per day with postings; days without a row kept the previous balance
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC
+    closing_balance = Column(Money, nullable=False)  # stored as integer cents
+
+class SnapshotWatermark(Base):
+    __tablename__ = "snapshot_watermarks"
+
+    name = Column(String, primary_key=True)
+    journal_id = Column(Integer, nullable=False, default=0)  # last journal entry folded into the snapshots
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    # Written in the same commit as the ledger rows it describes
+    id = Column(Integer, primary_key=True)
+    # Feed position, assigned by the relay in commit order (NULL until then); gap-free
+    seq = Column(Integer, unique=True, nullable=True)
+    event_type = Column(String(32), nullable=False)
+    payload = Column(String, nullable=False)  # JSON
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class OutboxCursor(Base):
+    __tablename__ = "outbox_cursors"
+
+    # "sequence" holds the last seq assigned; "sink:<spec>" the last seq a sink acknowledged
+    name = Column(String, primary_key=True)
+    seq = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
@@ -4,75 +4,268 @@ withdrawals, transfers, and fetching account statements for the authorized user.
 """
 
 # Imports
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from typing import List
-from app.models import Account, User
-from app.database.create_database import get_db
+from app.models import Account, Posting
+from app.database.create_database import get_async_db
+from app.database.read_routing import get_async_read_db
 from app.routes.auth_helpers import get_current_user
-from app.schemas import AccountCreate, AccountOut, BalanceUpdateOut, TransferRequest
+from app.utils.token_cache import UserSnapshot
+from app.schemas import (
+    AccountCreate, AccountOut, AccountOverviewOut, BalanceAsOfOut, BalanceUpdateOut, DailyBalancesOut, TransferRequest,
+    TransactionPage
+)
+from app.routes.cards import cards_to_schema
+from app.routes.transactions import transfer_out
+from app.utils.balance_snapshots import closing_balance_before, closing_balances
+from app.utils.etags import VersionedList
+from app.utils.idempotency import IdempotentRequest, idempotency_store, idempotent_request
+from app.utils.ledger import balance_at, post_entry
+from app.utils.metrics import query_budget
+from app.utils.outbox import record_event
+from app.utils.serializers import FastJSONResponse, account_serializer, transaction_serializer
+from app.utils.transfer_engine import apply_balance_change, run_in_transaction_async, validate_transfer
+from app.utils.statements import (
+    account_postings, decode_cursor, encode_cursor, stream_statement, to_utc_naive, STATEMENT_FORMATS
+)
 
 router = APIRouter()
 
+account_list = VersionedList("accounts", account_serializer)
+
+# -------------------------
+# Helpers
+# -------------------------
+def open_account(db: Session, user_id: int, account_type: str, initial_balance: Decimal) -> Account:
+    """
+    Creates the account and its opening journal entry, posting and outbox event. Does not commit.
+    """
+    opening = initial_balance > 0
+    new_account = Account(user_id=user_id, account_type=account_type, balance=initial_balance, posting_seq=int(opening))
+    db.add(new_account)
+    db.flush()
+
+    # Opening balance goes through the ledger so it reconciles
+    if opening:
+        journal_id = post_entry(
+            db, [(new_account.id, 1, initial_balance, initial_balance)], transaction_type="deposit",
+            to_account_id=new_account.id, amount=initial_balance, description="Opening balance"
+        )
+        record_event(
+            db, "deposit", journal_id=journal_id, user_id=user_id, account_id=new_account.id,
+            amount=initial_balance, description="Opening balance"
+        )
+    return new_account
+
+def balance_change_out(db: Session, user_id: int, account_id: int, delta: Decimal, transaction_type: str) -> BalanceUpdateOut:
+    new_balance = apply_balance_change(db, user_id, account_id, delta, transaction_type)
+    return BalanceUpdateOut(account_id=account_id, new_balance=new_balance)
+
 # -------------------------
 # Routes
 # -------------------------
 
 @router.post("/", response_model=AccountOut)
-def create_account(
+async def create_account(
     account: AccountCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    new_account = Account(
-        user_id=current_user.id,
-        account_type=account.account_type,
-        balance=account.initial_balance
+    if account.initial_balance < 0:
+        raise HTTPException(status_code=400, detail="Initial balance cannot be negative")
+    return await run_in_transaction_async(
+        db, open_account, current_user.id, account.account_type, account.initial_balance
     )
-    db.add(new_account)
-    db.commit()
-    db.refresh(new_account)
-    return new_account
 
 
-@router.get("/", response_model=List[AccountOut])
-def list_accounts(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/", response_model=List[AccountOut], dependencies=[Depends(query_budget(3))])
+async def list_accounts(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    accounts = db.query(Account).filter(Account.user_id == current_user.id).all()
-    return accounts
+    # Unchanged since the client's copy (or since the cached body): no list query
+    etag, response = await account_list.lookup(request, db, current_user.id)
+    if response is not None:
+        return response
+    result = await db.execute(select(Account).where(Account.user_id == current_user.id))
+    return account_list.render(current_user.id, etag, result.scalars().all())
 
 
-@router.post("/{account_id}/deposit", response_model=BalanceUpdateOut)
-def deposit(
+@router.get("/overview", response_model=AccountOverviewOut, dependencies=[Depends(query_budget(4))])
+async def account_overview(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserSnapshot = Depends(get_current_user)
+):
+    """
+    Accounts with their cards and latest activity in three queries, whatever the account count.
+    """
+    accounts = (await db.execute(
+        select(Account)
+        .where(Account.user_id == current_user.id)
+        .options(selectinload(Account.cards))
+        .order_by(Account.id)
+    )).scalars().all()
+
+    # Latest posting per account
+    last_activity = {}
+    if accounts:
+        rows = await db.execute(
+            select(Posting.account_id, func.max(Posting.timestamp))
+            .where(Posting.account_id.in_([a.id for a in accounts]))
+            .group_by(Posting.account_id)
+        )
+        last_activity = dict(rows.all())
+
+    return {
+        "total_balance": sum((a.balance for a in accounts), Decimal("0")),
+        "accounts": [
+            {
+                "id": a.id,
+                "user_id": a.user_id,
+                "account_type": a.account_type,
+                "balance": a.balance,
+                "created_at": a.created_at,
+                "last_activity": last_activity.get(a.id),
+                "cards": cards_to_schema(a.cards),
+            }
+            for a in accounts
+        ],
+    }
+
+
+@router.get("/{account_id}/balance", response_model=BalanceAsOfOut, dependencies=[Depends(query_budget(2))])
+async def account_balance(
     account_id: int,
-    amount: float,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    as_of: datetime | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    account = db.query(Account).filter(Account.id == account_id, Account.user_id == current_user.id).first()
-    if not account:
+    balance = await db.scalar(select(Account.balance).where(Account.id == account_id, Account.user_id == current_user.id))
+    if balance is None:
         raise HTTPException(status_code=404, detail="Account not found")
-    account.balance += amount
-    db.commit()
-    db.refresh(account)
-    return BalanceUpdateOut(account_id=account.id, new_balance=account.balance)
+    if as_of is None:
+        return {"account_id": account_id, "as_of": datetime.utcnow(), "balance": balance}
 
+    # Running balance on the last posting at or before as_of, however long the history
+    as_of = to_utc_naive(as_of)
+    return {"account_id": account_id, "as_of": as_of, "balance": await balance_at(db, account_id, as_of)}
 
-@router.post("/{account_id}/withdraw", response_model=BalanceUpdateOut)
-def withdraw(
+
+@router.get("/{account_id}/balances/daily", response_model=DailyBalancesOut, dependencies=[Depends(query_budget(3))])
+async def account_daily_balances(
+    account_id: int,
+    start: date | None = None,
+    end: date | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserSnapshot = Depends(get_current_user)
+):
+    owned = await db.scalar(select(Account.id).where(Account.id == account_id, Account.user_id == current_user.id))
+    if owned is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    end = end or datetime.utcnow().date() + timedelta(days=1)
+    start = start or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    # Read from the daily_balances snapshots: one range scan on the primary key, however many postings
+    opening = await db.scalar(closing_balance_before(account_id, start))
+    result = await db.execute(closing_balances(account_id, start, end))
+    return {
+        "account_id": account_id,
+        "opening_balance": opening if opening is not None else Decimal("0"),
+        "days": [{"day": day, "closing_balance": closing} for day, closing in result.all()]
+    }
+
+
+@router.get("/{account_id}/transactions", response_model=TransactionPage, dependencies=[Depends(query_budget(3))])
+async def list_account_transactions(
+    account_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserSnapshot = Depends(get_current_user)
+):
+    owned = await db.scalar(select(Account.id).where(Account.id == account_id, Account.user_id == current_user.id))
+    if owned is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    # Fetch one extra row to learn whether another page exists
+    after = decode_cursor(cursor) if cursor else None
+    result = await db.execute(account_postings(account_id, start, end, after, limit + 1))
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].seq)
+    return FastJSONResponse({"items": transaction_serializer.items(rows), "next_cursor": next_cursor})
+
+
+@router.get("/{account_id}/statement.{fmt}")
+async def export_statement(
     account_id: int,
-    amount: float,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    fmt: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    account = db.query(Account).filter(Account.id == account_id, Account.user_id == current_user.id).first()
-    if not account:
+    if fmt not in STATEMENT_FORMATS:
+        raise HTTPException(status_code=404, detail="Unsupported statement format")
+    owned = await db.scalar(select(Account.id).where(Account.id == account_id, Account.user_id == current_user.id))
+    if owned is None:
         raise HTTPException(status_code=404, detail="Account not found")
-    if amount > account.balance:
-        raise HTTPException(status_code=400, detail="Insufficient funds")
-    account.balance -= amount
-    db.commit()
-    db.refresh(account)
-    return BalanceUpdateOut(account_id=account.id, new_balance=account.balance)
\ No newline at end of file
+
+    media_type, _ = STATEMENT_FORMATS[fmt]
+    return StreamingResponse(
+        stream_statement(db.bind, account_id, fmt, start, end),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="statement-{account_id}.{fmt}"'}
+    )
+
+
+@router.post("/{account_id}/deposit", response_model=BalanceUpdateOut)
+async def deposit(
+    account_id: int,
+    amount: Decimal = Query(..., max_digits=18, decimal_places=2),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+    idempotency: IdempotentRequest = Depends(idempotent_request)
+):
+    if amount <= 0:
+        raise HTTPException(status_code=400, detail="Amount must be positive")
+    return await idempotency_store.run(db, idempotency, balance_change_out, current_user.id, account_id, amount, "deposit")
+
+
+@router.post("/{account_id}/withdraw", response_model=BalanceUpdateOut)
+async def withdraw(
+    account_id: int,
+    amount: Decimal = Query(..., max_digits=18, decimal_places=2),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+    idempotency: IdempotentRequest = Depends(idempotent_request)
+):
+    if amount <= 0:
+        raise HTTPException(status_code=400, detail="Amount must be positive")
+    return await idempotency_store.run(
+        db, idempotency, balance_change_out, current_user.id, account_id, -amount, "withdrawal"
+    )
+
+
+@router.post("/transfer", response_model=BalanceUpdateOut)
+async def transfer(
+    tx: TransferRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+    idempotency: IdempotentRequest = Depends(idempotent_request)
+):
+    validate_transfer(tx.from_account_id, tx.to_account_id, tx.amount)
+    return await idempotency_store.run(db, idempotency, transfer_out, current_user.id, tx)
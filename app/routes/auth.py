@@ -1,69 +1,69 @@
 """
 Handles authentication endpoints such as signing up and logging in.
 Includes password hashing and verification, token creation, and validating users.
+Hashing runs on a separate process pool (see app.utils.password_hashing).
 """
 
 # Imports
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database.create_database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.create_database import get_async_db
 from app.models import User
+from app.routes.auth_helpers import ALGORITHM, get_secret_key
 from app.schemas import UserCreate, UserLogin, Token
-from passlib.context import CryptContext
-from jose import jwt
+from app.utils.password_hashing import hash_password, verify_password
+from app.settings import get_settings
 from datetime import datetime, timedelta
-import os
-from dotenv import load_dotenv
 
-# Load the environment variables
-load_dotenv()
-SECRET_KEY = os.getenv("JWT_SECRET_KEY")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE"))
+# Token settings
+ACCESS_TOKEN_EXPIRE_MINUTES = get_settings().access_token_expire_minutes
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 router = APIRouter(tags=["Authentication"])
 
 # ----------------------
 # Utilities
 # ----------------------
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: timedelta = None):
+    from jose import jwt  # deferred: python-jose pulls in cryptography, which startup doesn't need
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm="HS256")
+    return jwt.encode(to_encode, get_secret_key(), algorithm=ALGORITHM)
 
 # ----------------------
 # Routes
 # ----------------------
 @router.post("/signup", response_model=Token)
-def signup(user: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user.email).first()
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = await db.scalar(select(User.id).where(User.email == user.email))
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     if len(user.password.encode("utf-8")) > 72:
         raise HTTPException(status_code=400, detail="Password too long — must be under 72 bytes.")
 
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password(user.password)
     db_user = User(name=user.name, email=user.email, hashed_password=hashed_password)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
 
     access_token = create_access_token(data={"sub": db_user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login", response_model=Token)
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.scalar(select(User).where(User.email == user.email))
+    if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_password(user.password, db_user.hashed_password)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # Transparently upgrade hashes made with outdated rounds
+    if new_hash:
+        db_user.hashed_password = new_hash
+        await db.commit()
 
     access_token = create_access_token(data={"sub": db_user.email})
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
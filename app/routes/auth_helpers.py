@@ -1,34 +1,61 @@
 """
-Returns the current user's ID for endpoints such as transfer function. 
+Returns the current user's ID for endpoints such as transfer function.
+Verified tokens are cached until they expire, so repeat requests skip the user lookup.
 """
 
 # Imports
 from fastapi import Depends, HTTPException
-from jose import jwt
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import User
-from app.database.create_database import get_db
-import os
+from app.database.create_database import get_async_db
+from app.settings import get_settings
+from app.utils.token_cache import UserSnapshot, token_cache
 
-# Load environment variables
-SECRET_KEY = os.getenv("JWT_SECRET_KEY", "testsecret")
+# Token settings
 ALGORITHM = "HS256"
 
-def get_current_user(token: str = Depends(lambda: None), db: Session = Depends(get_db)) -> User:
+bearer_scheme = HTTPBearer(auto_error=False)
+
+def get_secret_key() -> str:
+    """
+    The JWT signing key. Read on first use, so importing the app needs no secret.
+    """
+    key = get_settings().jwt_secret_key
+    if not key:
+        raise RuntimeError("JWT_SECRET_KEY is not set")
+    return key
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserSnapshot:
     """
-    Returns the current User object for authenticated endpoints.
+    Returns the current user (id and email) for authenticated endpoints.
     """
-    if token is None:
-        return db.query(User).filter(User.id == 1).first()  # test user
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    token = credentials.credentials
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
 
+    from jose import jwt  # deferred until the first token cache miss
+    secret_key = get_secret_key()
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, secret_key, algorithms=[ALGORITHM])
         email = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid token")
-        user = db.query(User).filter(User.email == email).first()
-        if user is None:
+        row = (await db.execute(select(User.id, User.email).where(User.email == email))).first()
+        if row is None:
             raise HTTPException(status_code=401, detail="User not found")
-        return user
     except Exception:
-        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+    user = UserSnapshot(id=row.id, email=row.email)
+    if "exp" in payload:
+        token_cache.put(token, user, float(payload["exp"]))
+    return user
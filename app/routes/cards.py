@@ -1,95 +1,135 @@
 """
 Handles card-related endpoints such as card creation,
 activation, and deactivation.
+Listings read the plaintext last-4/expiry projection, so they need no decryption.
 """
 
 # Imports
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database.create_database import get_db
-from app.models import Card, Account, User
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.create_database import get_async_db
+from app.database.read_routing import get_async_read_db
+from app.models import Card, Account
 from app.routes.auth_helpers import get_current_user  # <- shared
-from app.schemas import CardCreate, CardOut
-from cryptography.fernet import Fernet
-import os
-from dotenv import load_dotenv
-import random
-
-# Load secrets
-load_dotenv()
-CARD_ENCRYPTION_KEY = os.getenv("CARD_ENCRYPTION_KEY")
-fernet = Fernet(CARD_ENCRYPTION_KEY.encode())
+from app.utils.token_cache import UserSnapshot
+from app.schemas import CardCreate, CardOut, CardLookup
+from app.utils.card_crypto import encrypt_value, decrypt_many
+from app.utils.card_issuance import card_numbers, card_fingerprint
+from app.utils.etags import VersionedList
+from app.utils.metrics import query_budget
+from app.utils.serializers import card_serializer
 
 router = APIRouter()
 
+CARD_ISSUE_ATTEMPTS = 5
+
+card_list = VersionedList("cards", card_serializer)
+
 # ------------------
 # Helpers
 # ------------------
-def encrypt_value(value: str) -> str:
-    return fernet.encrypt(value.encode()).decode()
-
-def decrypt_value(value: str) -> str:
-    return fernet.decrypt(value.encode()).decode()
-
 def mask_card_number(card_number: str) -> str:
     return f"**** **** **** {card_number[-4:]}"
 
+def cards_to_schema(cards: list[Card]) -> list[CardOut]:
+    """
+    Builds the masked view from the projection columns. Rows created before the
+    projection existed fall back to one batch decrypt. The values come from our own
+    rows, so the models are constructed without validation.
+    """
+    legacy = [c for c in cards if c.card_last4 is None or c.expiry_display is None]
+    fallback = {}
+    if legacy:
+        plain = decrypt_many([c.card_number for c in legacy] + [c.expiry_date for c in legacy])
+        for i, c in enumerate(legacy):
+            fallback[c.id] = (plain[i][-4:], plain[len(legacy) + i])
+
+    out = []
+    for c in cards:
+        last4, expiry = fallback.get(c.id, (c.card_last4, c.expiry_display))
+        out.append(CardOut.model_construct(
+            id=c.id,
+            account_id=c.account_id,
+            card_number=mask_card_number(last4),
+            expiry_date=expiry,
+            is_active=c.is_active
+        ))
+    return out
+
 def card_to_schema(card: Card) -> CardOut:
-    card_number_plain = decrypt_value(card.card_number)
-    expiry_plain = decrypt_value(card.expiry_date)
-    return CardOut(
-        id=card.id,
-        account_id=card.account_id,
-        card_number=mask_card_number(card_number_plain),
-        expiry_date=expiry_plain,
-        is_active=card.is_active
-    )
+    return cards_to_schema([card])[0]
 
 # ------------------
 # Routes
 # ------------------
 @router.post("/", response_model=CardOut)
-def create_card(card: CardCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    account = db.query(Account).filter(Account.id == card.account_id, Account.user_id == user.id).first()
+async def create_card(card: CardCreate, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
+    account = await db.scalar(select(Account).where(Account.id == card.account_id, Account.user_id == user.id))
     if not account:
         raise HTTPException(status_code=404, detail="Account not found or not owned by user")
 
-    # Generate card info
-    card_number_plain = "".join([str(random.randint(0, 9)) for _ in range(16)])
-    db_card = Card(
-        account_id=account.id,
-        user_id=user.id,
-        card_number=encrypt_value(card_number_plain),
-        expiry_date=encrypt_value(card.expiry_date),
-        cvv=encrypt_value(card.cvv),
-        is_active=True
-    )
-    db.add(db_card)
-    db.commit()
-    db.refresh(db_card)
+    # Issue a card number; the unique fingerprint index rejects any number issued concurrently
+    account_id = account.id
+    for _ in range(CARD_ISSUE_ATTEMPTS):
+        card_number_plain = await card_numbers.next(db)
+        db_card = Card(
+            account_id=account_id,
+            user_id=user.id,
+            card_number=encrypt_value(card_number_plain),
+            expiry_date=encrypt_value(card.expiry_date),
+            cvv=encrypt_value(card.cvv),
+            card_last4=card_number_plain[-4:],
+            expiry_display=card.expiry_date,
+            card_fingerprint=card_fingerprint(card_number_plain),
+            is_active=True
+        )
+        db.add(db_card)
+        try:
+            await db.commit()
+            break
+        except IntegrityError:
+            await db.rollback()
+    else:
+        raise HTTPException(status_code=503, detail="Could not issue a card number, please retry")
     return card_to_schema(db_card)
 
-@router.get("/", response_model=list[CardOut])
-def list_cards(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    cards = db.query(Card).filter(Card.user_id == user.id).all()
-    return [card_to_schema(c) for c in cards]
+@router.post("/lookup", response_model=CardOut)
+async def lookup_card(lookup: CardLookup, db: AsyncSession = Depends(get_async_read_db), user: UserSnapshot = Depends(get_current_user)):
+    card = await db.scalar(select(Card).where(
+        Card.card_fingerprint == card_fingerprint(lookup.card_number),
+        Card.user_id == user.id
+    ))
+    if not card:
+        raise HTTPException(status_code=404, detail="Card not found")
+    return card_to_schema(card)
+
+@router.get("/", response_model=list[CardOut], dependencies=[Depends(query_budget(3))])
+async def list_cards(request: Request, db: AsyncSession = Depends(get_async_read_db), user: UserSnapshot = Depends(get_current_user)):
+    etag, response = await card_list.lookup(request, db, user.id)
+    if response is not None:
+        return response
+    result = await db.execute(select(Card).where(Card.user_id == user.id))
+    cards = result.scalars().all()
+    return card_list.render(user.id, etag, cards_to_schema(cards))
 
 @router.patch("/{card_id}/activate", response_model=CardOut)
-def activate_card(card_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    card = db.query(Card).filter(Card.id == card_id, Card.user_id == user.id).first()
+async def activate_card(card_id: int, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
+    card = await db.scalar(select(Card).where(Card.id == card_id, Card.user_id == user.id))
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
     card.is_active = True
-    db.commit()
-    db.refresh(card)
+    await db.commit()
+    await db.refresh(card)
     return card_to_schema(card)
 
 @router.patch("/{card_id}/deactivate", response_model=CardOut)
-def deactivate_card(card_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    card = db.query(Card).filter(Card.id == card_id, Card.user_id == user.id).first()
+async def deactivate_card(card_id: int, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
+    card = await db.scalar(select(Card).where(Card.id == card_id, Card.user_id == user.id))
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
     card.is_active = False
-    db.commit()
-    db.refresh(card)
+    await db.commit()
+    await db.refresh(card)
     return card_to_schema(card)
\ No newline at end of file
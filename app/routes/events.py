@@ -0,0 +1,56 @@
+"""
+Change feed of committed money movements for downstream systems (notifications, risk,
+the warehouse), read from the transactional outbox by sequence number.
+GET /events?after=<seq> long-polls: it answers as soon as events past seq exist, or with
+an empty page after ?wait= seconds. Guarded by EVENTS_FEED_TOKEN (X-Feed-Token header).
+"""
+
+# Imports
+import hmac
+import time
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.read_routing import get_async_read_db
+from app.schemas import EventPage
+from app.settings import get_settings
+from app.utils.outbox import events_sequenced, fetch_events
+from app.utils.outbox_relay import OUTBOX_RELAY_INTERVAL
+
+router = APIRouter(tags=["Events"])
+
+# Feed settings
+EVENTS_FEED_TOKEN = get_settings().events_feed_token
+EVENTS_FEED_MAX_WAIT = get_settings().events_feed_max_wait
+
+# ------------------
+# Helpers
+# ------------------
+def require_feed_token(x_feed_token: str | None = Header(None)):
+    if EVENTS_FEED_TOKEN is None:
+        raise HTTPException(status_code=404, detail="Event feed is disabled")
+    if x_feed_token is None or not hmac.compare_digest(x_feed_token, EVENTS_FEED_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid feed token")
+
+# ------------------
+# Routes
+# ------------------
+@router.get("", response_model=EventPage, dependencies=[Depends(require_feed_token)])
+async def read_events(
+    after: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    wait: float = Query(0, ge=0, le=EVENTS_FEED_MAX_WAIT),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    deadline = time.monotonic() + wait
+    while True:
+        # Note the version before querying so a relay run in between still wakes us
+        seen = events_sequenced.version
+        events = await fetch_events(db, after, limit)
+        remaining = deadline - time.monotonic()
+        if events or remaining <= 0:
+            break
+        # Release the connection (and its read snapshot) while waiting; another worker's
+        # relay doesn't wake this one, hence the poll interval cap
+        await db.close()
+        await events_sequenced.wait(seen, min(remaining, OUTBOX_RELAY_INTERVAL))
+    return {"items": events, "last_seq": events[-1]["seq"] if events else after}
\ No newline at end of file
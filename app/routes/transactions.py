@@ -1,64 +1,74 @@
 """
 Handles monetary transfers and validates the balances.
+Transfers accept an Idempotency-Key header so clients can retry them safely.
 """
 
 # Imports
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database.create_database import get_db
-from app.models import Account, Transaction, User
-from app.schemas import TransferRequest, BalanceUpdateOut
+from app.database.create_database import get_async_db
+from app.schemas import TransferRequest, BalanceUpdateOut, BatchTransferOut
 from app.routes.auth_helpers import get_current_user
+from app.utils.idempotency import IdempotentRequest, idempotency_store, idempotent_request
+from app.utils.token_cache import UserSnapshot
+from app.utils.transfer_engine import apply_transfer, run_in_transaction_async, validate_transfer
+from app.utils.batch_transfers import settle_batch, BATCH_MAX_ITEMS, BATCH_MODES
 
-router = APIRouter(prefix="/transactions", tags=["Transactions"])
+router = APIRouter(tags=["Transactions"])
 
+# ------------------
+# Helpers
+# ------------------
+def transfer_out(db: Session, user_id: int, tx: TransferRequest) -> BalanceUpdateOut:
+    new_balance = apply_transfer(db, user_id, tx.from_account_id, tx.to_account_id, tx.amount, tx.description)
+    return BalanceUpdateOut(account_id=tx.from_account_id, new_balance=new_balance)
+
+async def parse_batch_body(request: Request) -> list[TransferRequest]:
+    """
+    Accepts a JSON array of transfers, or one transfer per line for application/x-ndjson.
+    """
+    body = await request.body()
+    try:
+        if "ndjson" in request.headers.get("content-type", ""):
+            raw_items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            raw_items = json.loads(body)
+    except ValueError:  # JSONDecodeError, or a body that is not valid UTF-8
+        raise HTTPException(status_code=400, detail="Malformed batch body")
+    if not isinstance(raw_items, list):
+        raise HTTPException(status_code=400, detail="Batch body must be a list of transfers")
+    if len(raw_items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_ITEMS} transfers")
+    try:
+        return [TransferRequest.model_validate(item) for item in raw_items]
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+# ------------------
+# Routes
+# ------------------
 @router.post("/transfer", response_model=BalanceUpdateOut)
-def transfer(
+async def transfer(
     tx: TransferRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+    idempotency: IdempotentRequest = Depends(idempotent_request)
 ):
-    if tx.amount <= 0:
-        raise HTTPException(status_code=400, detail="Transfer amount must be positive")
-
-    # Source account must belong to current user
-    from_account = db.query(Account).filter(
-        Account.id == tx.from_account_id,
-        Account.user_id == current_user.id
-    ).first()
-    if not from_account:
-        raise HTTPException(status_code=404, detail="Source account not found")
-
-    # Destination account can belong to anyone
-    to_account = db.query(Account).filter(Account.id == tx.to_account_id).first()
-    if not to_account:
-        raise HTTPException(status_code=404, detail="Destination account not found")
-
-    if from_account.balance < tx.amount:
-        raise HTTPException(status_code=400, detail="Insufficient balance")
+    # Source account must belong to current user; destination can belong to anyone
+    validate_transfer(tx.from_account_id, tx.to_account_id, tx.amount)
+    return await idempotency_store.run(db, idempotency, transfer_out, current_user.id, tx)
 
-    # Perform transfer
-    from_account.balance -= tx.amount
-    to_account.balance += tx.amount
-
-    # Record transactions using correct column names
-    debit = Transaction(
-        from_account_id=from_account.id,
-        to_account_id=to_account.id,
-        amount=-tx.amount,
-        transaction_type="transfer",
-        description=f"Transfer to account {to_account.id}"
-    )
-    credit = Transaction(
-        from_account_id=from_account.id,
-        to_account_id=to_account.id,
-        amount=tx.amount,
-        transaction_type="transfer",
-        description=f"Transfer from account {from_account.id}"
-    )
-
-    db.add_all([debit, credit])
-    db.commit()
-    db.refresh(from_account)
-
-    return BalanceUpdateOut(account_id=from_account.id, new_balance=from_account.balance)
\ No newline at end of file
+@router.post("/batch", response_model=BatchTransferOut)
+async def batch_transfer(
+    request: Request,
+    mode: str = Query("atomic", description="atomic (all-or-nothing) or per_item"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
+):
+    if mode not in BATCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Mode must be one of {', '.join(BATCH_MODES)}")
+    items = await parse_batch_body(request)
+    return await run_in_transaction_async(db, settle_batch, current_user.id, items, mode)
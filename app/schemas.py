@@ -5,9 +5,17 @@ This structure gets fed into the models.py file.
 '''
 
 # Imports
-from pydantic import BaseModel, EmailStr, field_validator # data validation Python library
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, PlainSerializer, field_validator # data validation Python library
+from typing import Annotated, Optional
+from datetime import date, datetime
+from decimal import Decimal
+
+# Money: exact to the cent in Python, plain JSON number on the wire
+Amount = Annotated[
+    Decimal,
+    Field(max_digits=18, decimal_places=2),
+    PlainSerializer(float, return_type=float, when_used="json")
+]
 
 # Build classes to inherit the BaseModel
 class UserCreate(BaseModel):
@@ -25,13 +33,13 @@ class Token(BaseModel):
 
 class AccountCreate(BaseModel):
     account_type: str  # "checking" or "savings"
-    initial_balance: float = 0.0
+    initial_balance: Amount = Decimal("0")
 
 class AccountOut(BaseModel):
     id: int
     user_id: int
     account_type: str
-    balance: float
+    balance: Amount
     created_at: datetime
 
     model_config = {
@@ -41,22 +49,27 @@ class AccountOut(BaseModel):
 class TransactionCreate(BaseModel):
     from_account_id: int
     to_account_id: int
-    amount: float
+    amount: Amount
     description: Optional[str] = None
 
 class TransactionOut(BaseModel):
     id: int
     from_account_id: int | None
     to_account_id: int | None
-    amount: float
+    amount: Amount
     transaction_type: str
     timestamp: datetime
     description: Optional[str]
+    balance: Optional[Amount] = None  # the account's balance right after this entry
 
     model_config = {
         "from_attributes": True
     }
 
+class TransactionPage(BaseModel):
+    items: list[TransactionOut]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
 class CardCreate(BaseModel):
     account_id: int
     expiry_date: str # MM/YY format
@@ -76,6 +89,16 @@ class CardCreate(BaseModel):
             raise ValueError("CVV must be 3 or 4 digits")
         return v
 
+class CardLookup(BaseModel):
+    card_number: str
+
+    @field_validator("card_number")
+    def validate_card_number(cls, v):
+        v = v.replace(" ", "")
+        if not v.isdigit() or not 12 <= len(v) <= 19:
+            raise ValueError("Card number must be 12 to 19 digits")
+        return v
+
 class CardOut(BaseModel): # CVV excluded for encryption purposes
     id: int
     account_id: int
@@ -87,9 +110,23 @@ class CardOut(BaseModel): # CVV excluded for encryption purposes
         "from_attributes": True
     }
 
+class BalanceAsOfOut(BaseModel):
+    account_id: int
+    as_of: datetime
+    balance: Amount
+
+class DailyBalanceOut(BaseModel):
+    day: date
+    closing_balance: Amount
+
+class DailyBalancesOut(BaseModel):
+    account_id: int
+    opening_balance: Amount  # closing balance of the last snapshot day before start
+    days: list[DailyBalanceOut]  # only days with postings; the others kept the previous balance
+
 class BalanceUpdateOut(BaseModel):
     account_id: int
-    new_balance: float
+    new_balance: Amount
 
     model_config = {
         "from_attributes": True
@@ -98,5 +135,36 @@ class BalanceUpdateOut(BaseModel):
 class TransferRequest(BaseModel):
     from_account_id: int
     to_account_id: int
-    amount: float
-    description: str | None = None
\ No newline at end of file
+    amount: Amount
+    description: str | None = None
+
+class BatchTransferResult(BaseModel):
+    index: int
+    status: str  # "ok" or "rejected"
+    new_balance: Optional[Amount] = None
+    detail: Optional[str] = None
+
+class BatchTransferOut(BaseModel):
+    mode: str  # "atomic" or "per_item"
+    accepted: int
+    rejected: int
+    results: list[BatchTransferResult]
+
+class AccountOverviewItem(AccountOut):
+    last_activity: Optional[datetime] = None  # latest ledger entry
+    cards: list[CardOut]
+
+class AccountOverviewOut(BaseModel):
+    total_balance: Amount
+    accounts: list[AccountOverviewItem]
+
+class EventOut(BaseModel):
+    seq: int  # feed position; resume with ?after=<seq>
+    id: int
+    type: str  # "transfer", "deposit" or "withdrawal"
+    created_at: datetime
+    payload: dict
+
+class EventPage(BaseModel):
+    items: list[EventOut]
+    last_seq: int  # pass as ?after= on the next poll
\ No newline at end of file
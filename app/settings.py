@@ -0,0 +1,189 @@
+"""
+Application settings, read once from the environment (and .env) on first use.
+Also provides the lazy() helper used to build engines, crypto and hashing contexts
+on first use or at lifespan startup instead of at import time.
+"""
+
+# Imports
+import os
+import threading
+from dataclasses import dataclass, field
+from functools import update_wrapper
+
+UNSET = object()
+
+def env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+def env_list(name: str) -> list[str]:
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+@dataclass(frozen=True)
+class Settings:
+    # Database and connection pool (pool settings are ignored for SQLite)
+    database_url: str = "sqlite:///./bank.db"
+    async_database_url: str | None = None  # derived from database_url when unset
+    db_pool_size: int = 20
+    db_max_overflow: int = 30
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # SQLite production profile (opt-in)
+    sqlite_profile: str = "default"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -65536  # negative = KiB, i.e. 64 MB
+    sqlite_read_pool_size: int = 8
+    sqlite_writer_batch: int = 128
+    sqlite_writer_window: float = 0.002
+    # Read replicas
+    database_replica_urls: list[str] = field(default_factory=list)
+    read_your_writes_seconds: float = 5
+    # Auth
+    jwt_secret_key: str | None = None  # required to issue or verify tokens
+    access_token_expire_minutes: int = 30
+    token_cache_size: int = 10000
+    token_cache_url: str | None = None
+    token_cache_local_ttl: float = 5
+    password_hash_rounds: int = 29000
+    password_hash_workers: int = max(1, (os.cpu_count() or 2) // 2)
+    password_hash_max_queue: int = 64
+    password_hash_retry_after: str = "1"
+    # Cards
+    card_encryption_key: str | None = None
+    card_fingerprint_key: str | None = None  # derived from card_encryption_key when unset
+    card_bin: str = "400000"
+    card_number_length: int = 16
+    card_block_size: int = 256
+    card_decrypt_workers: int = 4
+    # Money movement
+    transfer_max_retries: int = 5
+    transfer_retry_base_delay: float = 0.01
+    batch_max_items: int = 50000
+    batch_chunk_size: int = 1000
+    idempotency_ttl_seconds: int = 24 * 3600
+    idempotency_cache_size: int = 10000
+    idempotency_compact_interval: float = 300
+    snapshot_interval: float = 60
+    snapshot_batch_size: int = 10000
+    snapshot_settle_seconds: float = 10
+    # Outbox and event feed
+    outbox_sink: str = "none"  # none, queue, file:<path> or an http(s):// URL
+    outbox_relay_interval: float = 1
+    outbox_batch_size: int = 500
+    outbox_http_timeout: float = 5
+    events_feed_token: str | None = None  # the feed is disabled when unset
+    events_feed_max_wait: float = 30
+    # Conditional GET
+    etag_cache_size: int = 10000
+    # Admission control: "<tokens per second>/<burst>" per user, or "off"
+    rate_limit_enabled: bool = True
+    rate_limit_auth: str = "2/20"
+    rate_limit_write: str = "20/50"
+    rate_limit_read: str = "50/200"
+    rate_limit_ip_factor: float = 4
+    rate_limit_max_writes: int = 64  # in-flight write requests per worker; 0 = no cap
+    rate_limit_size: int = 100000
+    rate_limit_url: str | None = None
+    # Observability
+    query_budget_mode: str = "log"
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        from dotenv import load_dotenv
+        load_dotenv()
+        d = cls()
+        return cls(
+            database_url=os.getenv("DATABASE_URL", d.database_url),
+            async_database_url=os.getenv("ASYNC_DATABASE_URL") or None,
+            db_pool_size=int(os.getenv("DB_POOL_SIZE", d.db_pool_size)),
+            db_max_overflow=int(os.getenv("DB_MAX_OVERFLOW", d.db_max_overflow)),
+            db_pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", d.db_pool_timeout)),
+            db_pool_recycle=int(os.getenv("DB_POOL_RECYCLE", d.db_pool_recycle)),
+            db_pool_pre_ping=env_bool("DB_POOL_PRE_PING", "true"),
+            sqlite_profile=os.getenv("SQLITE_PROFILE", d.sqlite_profile).lower(),
+            sqlite_busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", d.sqlite_busy_timeout_ms)),
+            sqlite_mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", d.sqlite_mmap_size)),
+            sqlite_cache_size=int(os.getenv("SQLITE_CACHE_SIZE", d.sqlite_cache_size)),
+            sqlite_read_pool_size=int(os.getenv("SQLITE_READ_POOL_SIZE", d.sqlite_read_pool_size)),
+            sqlite_writer_batch=int(os.getenv("SQLITE_WRITER_BATCH", d.sqlite_writer_batch)),
+            sqlite_writer_window=float(os.getenv("SQLITE_WRITER_WINDOW", d.sqlite_writer_window)),
+            database_replica_urls=env_list("DATABASE_REPLICA_URLS"),
+            read_your_writes_seconds=float(os.getenv("READ_YOUR_WRITES_SECONDS", d.read_your_writes_seconds)),
+            jwt_secret_key=os.getenv("JWT_SECRET_KEY") or None,
+            access_token_expire_minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE", d.access_token_expire_minutes)),
+            token_cache_size=int(os.getenv("TOKEN_CACHE_SIZE", d.token_cache_size)),
+            token_cache_url=os.getenv("TOKEN_CACHE_URL") or None,
+            token_cache_local_ttl=float(os.getenv("TOKEN_CACHE_LOCAL_TTL", d.token_cache_local_ttl)),
+            password_hash_rounds=int(os.getenv("PASSWORD_HASH_ROUNDS", d.password_hash_rounds)),
+            password_hash_workers=int(os.getenv("PASSWORD_HASH_WORKERS", d.password_hash_workers)),
+            password_hash_max_queue=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", d.password_hash_max_queue)),
+            password_hash_retry_after=os.getenv("PASSWORD_HASH_RETRY_AFTER", d.password_hash_retry_after),
+            card_encryption_key=os.getenv("CARD_ENCRYPTION_KEY") or None,
+            card_fingerprint_key=os.getenv("CARD_FINGERPRINT_KEY") or None,
+            card_bin=os.getenv("CARD_BIN", d.card_bin),
+            card_number_length=int(os.getenv("CARD_NUMBER_LENGTH", d.card_number_length)),
+            card_block_size=int(os.getenv("CARD_BLOCK_SIZE", d.card_block_size)),
+            card_decrypt_workers=int(os.getenv("CARD_DECRYPT_WORKERS", d.card_decrypt_workers)),
+            transfer_max_retries=int(os.getenv("TRANSFER_MAX_RETRIES", d.transfer_max_retries)),
+            transfer_retry_base_delay=float(os.getenv("TRANSFER_RETRY_BASE_DELAY", d.transfer_retry_base_delay)),
+            batch_max_items=int(os.getenv("BATCH_MAX_ITEMS", d.batch_max_items)),
+            batch_chunk_size=int(os.getenv("BATCH_CHUNK_SIZE", d.batch_chunk_size)),
+            idempotency_ttl_seconds=int(os.getenv("IDEMPOTENCY_TTL_SECONDS", d.idempotency_ttl_seconds)),
+            idempotency_cache_size=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", d.idempotency_cache_size)),
+            idempotency_compact_interval=float(os.getenv("IDEMPOTENCY_COMPACT_INTERVAL", d.idempotency_compact_interval)),
+            snapshot_interval=float(os.getenv("SNAPSHOT_INTERVAL", d.snapshot_interval)),
+            snapshot_batch_size=int(os.getenv("SNAPSHOT_BATCH_SIZE", d.snapshot_batch_size)),
+            snapshot_settle_seconds=float(os.getenv("SNAPSHOT_SETTLE_SECONDS", d.snapshot_settle_seconds)),
+            outbox_sink=os.getenv("OUTBOX_SINK", d.outbox_sink),
+            outbox_relay_interval=float(os.getenv("OUTBOX_RELAY_INTERVAL", d.outbox_relay_interval)),
+            outbox_batch_size=int(os.getenv("OUTBOX_BATCH_SIZE", d.outbox_batch_size)),
+            outbox_http_timeout=float(os.getenv("OUTBOX_HTTP_TIMEOUT", d.outbox_http_timeout)),
+            events_feed_token=os.getenv("EVENTS_FEED_TOKEN") or None,
+            events_feed_max_wait=float(os.getenv("EVENTS_FEED_MAX_WAIT", d.events_feed_max_wait)),
+            etag_cache_size=int(os.getenv("ETAG_CACHE_SIZE", d.etag_cache_size)),
+            rate_limit_enabled=env_bool("RATE_LIMIT_ENABLED", "true"),
+            rate_limit_auth=os.getenv("RATE_LIMIT_AUTH", d.rate_limit_auth),
+            rate_limit_write=os.getenv("RATE_LIMIT_WRITE", d.rate_limit_write),
+            rate_limit_read=os.getenv("RATE_LIMIT_READ", d.rate_limit_read),
+            rate_limit_ip_factor=float(os.getenv("RATE_LIMIT_IP_FACTOR", d.rate_limit_ip_factor)),
+            rate_limit_max_writes=int(os.getenv("RATE_LIMIT_MAX_WRITES", d.rate_limit_max_writes)),
+            rate_limit_size=int(os.getenv("RATE_LIMIT_SIZE", d.rate_limit_size)),
+            rate_limit_url=os.getenv("RATE_LIMIT_URL") or None,
+            query_budget_mode=os.getenv("QUERY_BUDGET_MODE", d.query_budget_mode).lower(),
+        )
+
+# -------------------------
+# Lazy resources
+# -------------------------
+class lazy:
+    """
+    Decorator for a zero-argument builder: the first call builds and caches the
+    resource (thread-safe), later calls return it. .built tells whether it exists yet;
+    tests can swap it by setting .value.
+    """
+    def __init__(self, build):
+        self.build = build
+        self.value = UNSET
+        self.lock = threading.Lock()
+        update_wrapper(self, build)
+
+    def __call__(self):
+        value = self.value
+        if value is UNSET:
+            with self.lock:
+                if self.value is UNSET:
+                    self.value = self.build()
+                value = self.value
+        return value
+
+    @property
+    def built(self) -> bool:
+        return self.value is not UNSET
+
+    def reset(self):
+        self.value = UNSET
+
+@lazy
+def get_settings() -> Settings:
+    return Settings.from_env()
\ No newline at end of file
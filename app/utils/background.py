@@ -0,0 +1,25 @@
+"""
+Periodic maintenance jobs started by the app's lifespan (see main.lifespan).
+"""
+
+# Imports
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def run_periodically(job, interval: float, name: str, wake=None):
+    """
+    Awaits job() every interval seconds until cancelled; a failed run is logged and tried again next time.
+    With a wake Signal (see utils.outbox), a notification runs the job early.
+    """
+    seen = wake.version if wake is not None else 0
+    while True:
+        if wake is None:
+            await asyncio.sleep(interval)
+        else:
+            seen = await wake.wait(seen, interval)
+        try:
+            await job()
+        except Exception:
+            logger.exception("%s failed", name)
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+Daily closing-balance snapshots per account, for daily balance charts and reports that would
+otherwise read every posting. A catch-up job follows journal entries past a watermark, in id
+order and in batches: each entry names the accounts it touched, and each (account, day) it
+touched gets its closing balance from the running balance on that day's last posting (one seek
+on ix_postings_account_timestamp). Later days keep their own postings' balances, so a back-dated
+entry needs no replay. Entries younger than SNAPSHOT_SETTLE_SECONDS are left for the next run,
+so an entry that commits after a higher id (possible on Postgres) is never skipped by the watermark.
+Served by GET /accounts/{account_id}/balances/daily; balance-as-of queries read the postings
+directly (see utils.ledger.balance_at).
+"""
+
+# Imports
+import logging
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import Select, insert, select, update
+from sqlalchemy.orm import Session
+from app.database.create_database import get_async_session_factory
+from app.models import DailyBalance, JournalEntry, SnapshotWatermark
+from app.settings import get_settings
+from app.utils.ledger import posting_at
+from app.utils.transfer_engine import run_in_transaction_async
+
+logger = logging.getLogger(__name__)
+
+# Snapshot settings
+SNAPSHOT_INTERVAL = get_settings().snapshot_interval
+SNAPSHOT_BATCH_SIZE = get_settings().snapshot_batch_size
+SNAPSHOT_SETTLE_SECONDS = get_settings().snapshot_settle_seconds
+WATERMARK_NAME = "daily_balances"
+
+# -------------------------
+# Catch-up job
+# -------------------------
+def refresh_daily_balances(
+    db: Session,
+    batch_size: int = SNAPSHOT_BATCH_SIZE,
+    settle_seconds: float = SNAPSHOT_SETTLE_SECONDS
+) -> int:
+    """
+    Folds the next batch of journal entries past the watermark into daily_balances and advances
+    the watermark in the same transaction. Returns the number of entries folded. Does not commit.
+    """
+    watermark = db.scalar(select(SnapshotWatermark).where(SnapshotWatermark.name == WATERMARK_NAME).with_for_update())
+    if watermark is None:
+        watermark = SnapshotWatermark(name=WATERMARK_NAME, journal_id=0)
+        db.add(watermark)
+        db.flush()
+
+    rows = db.execute(
+        select(JournalEntry.id, JournalEntry.from_account_id, JournalEntry.to_account_id, JournalEntry.timestamp)
+        .where(JournalEntry.id > watermark.journal_id)
+        .order_by(JournalEntry.id)
+        .limit(batch_size)
+    ).all()
+    # Stop at the first unsettled entry: everything after it waits, so ids are folded strictly in order
+    cutoff = datetime.utcnow() - timedelta(seconds=settle_seconds)
+    settled = []
+    for row in rows:
+        if row.timestamp >= cutoff:
+            break
+        settled.append(row)
+    if not settled:
+        return 0
+
+    touched = {
+        (account_id, timestamp.date())
+        for _, from_account_id, to_account_id, timestamp in settled
+        for account_id in (from_account_id, to_account_id)
+        if account_id is not None
+    }
+    for account_id, day in sorted(touched):
+        closing = db.scalar(posting_at(account_id, datetime.combine(day, time.max)))
+        if closing is None:
+            continue
+        changed = db.execute(
+            update(DailyBalance).where(DailyBalance.account_id == account_id, DailyBalance.day == day)
+            .values(closing_balance=closing)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not changed:
+            db.execute(insert(DailyBalance).values(account_id=account_id, day=day, closing_balance=closing))
+
+    watermark.journal_id = settled[-1].id
+    return len(settled)
+
+async def refresh_snapshots():
+    """
+    Background job (see main.lifespan): catches the snapshots up, one transaction per batch.
+    """
+    total = 0
+    async with get_async_session_factory()() as db:
+        while True:
+            folded = await run_in_transaction_async(db, refresh_daily_balances)
+            total += folded
+            if folded < SNAPSHOT_BATCH_SIZE:
+                break
+    if total:
+        logger.info("Folded %d journal entries into daily balance snapshots", total)
+
+# -------------------------
+# Reads
+# -------------------------
+def closing_balances(account_id: int, start: date, end: date) -> Select:
+    """
+    (day, closing_balance) for the days in [start, end) with postings, oldest first; a day
+    without a row closed at the previous row's balance. One range scan on the primary key.
+    """
+    return (
+        select(DailyBalance.day, DailyBalance.closing_balance)
+        .where(DailyBalance.account_id == account_id, DailyBalance.day >= start, DailyBalance.day < end)
+        .order_by(DailyBalance.day)
+    )
+
+def closing_balance_before(account_id: int, day: date) -> Select:
+    """
+    Closing balance of the last snapshot day before day, where a window from closing_balances opens.
+    """
+    return (
+        select(DailyBalance.closing_balance)
+        .where(DailyBalance.account_id == account_id, DailyBalance.day < day)
+        .order_by(DailyBalance.day.desc())
+        .limit(1)
+    )
\ No newline at end of file
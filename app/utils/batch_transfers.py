@@ -0,0 +1,154 @@
+"""
+Settles many transfers in one database transaction.
+Balance deltas and posting seqs are netted per account in memory and written with one
+bulk UPDATE, and the journal entries and postings with one bulk INSERT each per chunk,
+instead of a round trip per transfer.
+"""
+
+# Imports
+from collections import defaultdict
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+from app.models import Account
+from app.schemas import TransferRequest
+from app.settings import get_settings
+from app.utils.etags import bump_versions
+from app.utils.ledger import post_entries
+from app.utils.money import to_cents
+from app.utils.outbox import record_events
+
+# Batch settings
+BATCH_MAX_ITEMS = get_settings().batch_max_items
+BATCH_CHUNK_SIZE = get_settings().batch_chunk_size
+
+BATCH_MODES = ("atomic", "per_item")
+
+# -------------------------
+# Helpers
+# -------------------------
+def check_item(item: TransferRequest, user_id: int, balances: dict, owners: dict) -> str | None:
+    """
+    Returns the rejection reason for one transfer against the running balances, or None.
+    """
+    if item.amount <= 0:
+        return "Transfer amount must be positive"
+    if item.from_account_id == item.to_account_id:
+        return "Cannot transfer to the same account"
+    if owners.get(item.from_account_id) != user_id:
+        return "Source account not found"
+    if item.to_account_id not in balances:
+        return "Destination account not found"
+    if balances[item.from_account_id] < item.amount:
+        return "Insufficient balance"
+    return None
+
+def lock_balances(db: Session, account_ids: list[int]) -> tuple[dict, dict, dict]:
+    """
+    Row-locks the chunk's accounts in ascending id order, then loads them.
+    Returns balances, owners and the latest posting seq per account.
+    """
+    stmt = (
+        select(Account.id, Account.user_id, Account.balance, Account.posting_seq)
+        .where(Account.id.in_(account_ids))
+        .order_by(Account.id)
+    )
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite has no FOR UPDATE, and pysqlite only opens the transaction at the first write:
+        # a no-op UPDATE takes the database write lock first, so the reads below cannot go stale
+        # (a concurrent batch waits, or gets "database is locked", which run_in_transaction retries)
+        db.execute(
+            update(Account)
+            .where(Account.id.in_(account_ids))
+            .values(posting_seq=Account.posting_seq)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        stmt = stmt.with_for_update()
+    balances, owners, seqs = {}, {}, {}
+    for account_id, owner_id, balance, seq in db.execute(stmt):
+        balances[account_id] = balance
+        owners[account_id] = owner_id
+        seqs[account_id] = seq
+    return balances, owners, seqs
+
+# -------------------------
+# Engine
+# -------------------------
+def settle_chunk(db: Session, user_id: int, items: list[TransferRequest], offset: int, atomic: bool) -> list[dict]:
+    account_ids = sorted({i.from_account_id for i in items} | {i.to_account_id for i in items})
+    balances, owners, seqs = lock_balances(db, account_ids)
+
+    deltas = defaultdict(Decimal)
+    postings = defaultdict(int)
+    entries, legs, results = [], [], []
+    for index, item in enumerate(items, start=offset):
+        reason = check_item(item, user_id, balances, owners)
+        if reason is not None:
+            if atomic:
+                status_code = 404 if reason.endswith("not found") else 400
+                raise HTTPException(status_code=status_code, detail=f"Item {index}: {reason}")
+            results.append({"index": index, "status": "rejected", "detail": reason})
+            continue
+
+        balances[item.from_account_id] -= item.amount
+        balances[item.to_account_id] += item.amount
+        deltas[item.from_account_id] -= item.amount
+        deltas[item.to_account_id] += item.amount
+        item_legs = []
+        for account_id, amount in ((item.from_account_id, -item.amount), (item.to_account_id, item.amount)):
+            seqs[account_id] += 1
+            postings[account_id] += 1
+            item_legs.append((account_id, seqs[account_id], amount, balances[account_id]))
+        entries.append({
+            "transaction_type": "transfer",
+            "from_account_id": item.from_account_id,
+            "to_account_id": item.to_account_id,
+            "amount": item.amount,
+            "description": item.description,
+        })
+        legs.append(item_legs)
+        results.append({"index": index, "status": "ok", "new_balance": balances[item.from_account_id]})
+
+    # One UPDATE for every touched account, one INSERT each for journal entries, postings and outbox events
+    # (CASE values bypass the Money type, so they are passed as raw cents)
+    changed = {account_id: to_cents(delta) for account_id, delta in deltas.items()}
+    if changed:
+        db.execute(
+            update(Account)
+            .where(Account.id.in_(changed))
+            .values(
+                balance=Account.balance + case(changed, value=Account.id, else_=0),
+                posting_seq=Account.posting_seq + case(dict(postings), value=Account.id, else_=0),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    journal_ids = post_entries(db, entries, legs)
+    record_events(db, "transfer", [
+        {
+            "journal_id": journal_id,
+            "user_id": user_id,
+            "from_account_id": entry["from_account_id"],
+            "to_account_id": entry["to_account_id"],
+            "amount": entry["amount"],
+            "description": entry["description"],
+        }
+        for journal_id, entry in zip(journal_ids, entries)
+    ])
+    if postings:
+        db.execute(bump_versions(owners[account_id] for account_id in postings))
+    return results
+
+def settle_batch(db: Session, user_id: int, items: list[TransferRequest], mode: str) -> dict:
+    """
+    Applies every chunk inside the caller's transaction. Does not commit.
+    In atomic mode the first rejected item raises and nothing is applied.
+    """
+    atomic = mode == "atomic"
+    results = []
+    for offset in range(0, len(items), BATCH_CHUNK_SIZE):
+        chunk = items[offset:offset + BATCH_CHUNK_SIZE]
+        results.extend(settle_chunk(db, user_id, chunk, offset, atomic))
+    accepted = sum(1 for r in results if r["status"] == "ok")
+    return {"mode": mode, "accepted": accepted, "rejected": len(results) - accepted, "results": results}
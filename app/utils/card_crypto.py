@@ -0,0 +1,57 @@
+"""
+Fernet encryption for sensitive card fields (card number, expiry date, CVV).
+Includes a batch decrypt path that spreads work across a thread pool.
+The Fernet instance and the pool are built on first use (or at app startup).
+"""
+
+# Imports
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from app.settings import get_settings, lazy
+from app.utils.metrics import crypto_seconds
+
+DECRYPT_WORKERS = max(1, get_settings().card_decrypt_workers)  # 0 would leave no worker to decrypt
+DECRYPT_BATCH_THRESHOLD = 64  # below this, thread hand-off costs more than it saves
+
+@lazy
+def get_fernet():
+    from cryptography.fernet import Fernet
+    key = get_settings().card_encryption_key
+    if not key:
+        raise RuntimeError("CARD_ENCRYPTION_KEY is not set")
+    return Fernet(key.encode())
+
+@lazy
+def get_decrypt_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=DECRYPT_WORKERS, thread_name_prefix="card-decrypt")
+
+# ------------------
+# Helpers
+# ------------------
+ENCRYPT_LABELS = ("fernet_encrypt",)
+DECRYPT_LABELS = ("fernet_decrypt",)
+
+def encrypt_value(value: str) -> str:
+    start = perf_counter()
+    token = get_fernet().encrypt(value.encode()).decode()
+    crypto_seconds.observe(ENCRYPT_LABELS, perf_counter() - start)
+    return token
+
+def decrypt_value(value: str) -> str:
+    start = perf_counter()
+    plain = get_fernet().decrypt(value.encode()).decode()
+    crypto_seconds.observe(DECRYPT_LABELS, perf_counter() - start)
+    return plain
+
+def decrypt_many(values: list[str]) -> list[str]:
+    """
+    Decrypts a batch, in order; large batches are split across the decrypt pool.
+    """
+    if len(values) < DECRYPT_BATCH_THRESHOLD:
+        return [decrypt_value(v) for v in values]
+    chunk = -(-len(values) // DECRYPT_WORKERS)
+    parts = get_decrypt_pool().map(
+        lambda start: [decrypt_value(v) for v in values[start:start + chunk]],
+        range(0, len(values), chunk)
+    )
+    return [plain for part in parts for plain in part]
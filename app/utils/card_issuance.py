@@ -0,0 +1,91 @@
+"""
+Issues card numbers: CSPRNG digits behind a BIN prefix with a Luhn check digit.
+Each PAN also gets a keyed HMAC fingerprint stored in a unique-indexed column,
+which gives O(1) duplicate detection and lookup without decrypting any card.
+Numbers are pre-generated in blocks, checked against the index with one query per block.
+"""
+
+# Imports
+import hashlib
+import hmac
+import secrets
+import threading
+from collections import deque
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Card
+from app.settings import get_settings, lazy
+
+# Issuance settings
+CARD_BIN = get_settings().card_bin
+CARD_NUMBER_LENGTH = get_settings().card_number_length
+CARD_BLOCK_SIZE = get_settings().card_block_size
+
+@lazy
+def get_fingerprint_key() -> bytes:
+    """
+    Separate key so fingerprints survive an encryption key rotation; derived if not set.
+    """
+    settings = get_settings()
+    return (
+        settings.card_fingerprint_key
+        or hmac.new((settings.card_encryption_key or "").encode(), b"card-fingerprint", hashlib.sha256).hexdigest()
+    ).encode()
+
+# -------------------------
+# Helpers
+# -------------------------
+def luhn_check_digit(partial: str) -> str:
+    """
+    Check digit that makes partial + digit pass the Luhn test.
+    """
+    total = 0
+    for i, ch in enumerate(reversed(partial)):
+        digit = int(ch)
+        if i % 2 == 0:  # doubled once the check digit is appended
+            digit = digit * 2 - 9 if digit > 4 else digit * 2
+        total += digit
+    return str((10 - total % 10) % 10)
+
+def is_luhn_valid(number: str) -> bool:
+    return number.isdigit() and luhn_check_digit(number[:-1]) == number[-1]
+
+def generate_card_number(bin_prefix: str = CARD_BIN, length: int = CARD_NUMBER_LENGTH) -> str:
+    body = bin_prefix + "".join(str(secrets.randbelow(10)) for _ in range(length - len(bin_prefix) - 1))
+    return body + luhn_check_digit(body)
+
+def card_fingerprint(card_number: str) -> str:
+    return hmac.new(get_fingerprint_key(), card_number.encode(), hashlib.sha256).hexdigest()
+
+# -------------------------
+# Pre-generated blocks
+# -------------------------
+class CardNumberBlock:
+    """
+    Hands out pre-checked card numbers; refills a whole block with one fingerprint query.
+    The unique index remains the final guard against numbers issued concurrently elsewhere.
+    """
+    def __init__(self, block_size: int = CARD_BLOCK_SIZE):
+        self.block_size = block_size
+        self.available = deque()
+        self.lock = threading.Lock()
+
+    async def refill(self, db: AsyncSession):
+        candidates = {}
+        while len(candidates) < self.block_size:
+            number = generate_card_number()
+            candidates[card_fingerprint(number)] = number
+        taken = set((await db.execute(
+            select(Card.card_fingerprint).where(Card.card_fingerprint.in_(candidates))
+        )).scalars())
+        with self.lock:
+            self.available.extend(n for f, n in candidates.items() if f not in taken)
+
+    async def next(self, db: AsyncSession) -> str:
+        while True:
+            with self.lock:
+                if self.available:
+                    return self.available.popleft()
+            await self.refill(db)
+
+card_numbers = CardNumberBlock()
@@ -0,0 +1,134 @@
+"""
+Conditional GET for the per-user account and card lists, which mobile clients poll.
+users.data_version is bumped in the same transaction as any change to the user's accounts
+or cards, and the lists carry it in a strong ETag. ORM writes to Account and Card rows bump
+it through mapper events; bulk and Core UPDATEs (balances) call bump_versions themselves. A request whose
+If-None-Match still matches gets 304 after one primary-key read, before the list is queried;
+otherwise rendered bodies are served from a bounded in-process cache keyed by (user, version).
+The counter lives in the database, so writes made by other workers, or by another user
+transferring into the account, invalidate it too.
+"""
+
+# Imports
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from fastapi import Request, Response
+from sqlalchemy import Update, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Account, Card, User
+from app.settings import get_settings
+from app.utils.serializers import RowSerializer
+
+# Cache settings
+ETAG_CACHE_SIZE = get_settings().etag_cache_size  # 0 disables the response cache
+CACHE_CONTROL = "private, no-cache"  # clients may keep a copy but must revalidate it
+
+# -------------------------
+# Helpers
+# -------------------------
+def bump_versions(user_ids: Iterable[int]) -> Update:
+    """
+    UPDATE that moves every given user's data_version on; execute it in the mutation's
+    transaction. Users are updated in ascending id order, like accounts.
+    """
+    return (
+        update(User)
+        .where(User.id.in_(sorted(set(user_ids))))
+        .values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    If-None-Match uses the weak comparison, so W/"x" matches "x"; * matches anything.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+class ResponseCache:
+    """
+    Bounded LRU of (resource, user_id) -> (etag, body). One entry per user and resource:
+    a newer version replaces the old body instead of sitting next to it.
+    """
+    def __init__(self, max_size: int = ETAG_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries: OrderedDict[tuple[str, int], tuple[str, bytes]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: tuple[str, int], etag: str) -> bytes | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple[str, int], etag: str, body: bytes):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (etag, body)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+response_cache = ResponseCache()
+
+# -------------------------
+# Versioned resources
+# -------------------------
+class VersionedList:
+    """
+    One per list route:
+        etag, response = await account_list.lookup(request, db, user.id)
+        if response is not None:
+            return response
+        ...query rows...
+        return account_list.render(user.id, etag, rows)
+    """
+    def __init__(self, name: str, serializer: RowSerializer):
+        self.name = name
+        self.serializer = serializer
+
+    def headers(self, etag: str) -> dict:
+        return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    async def lookup(self, request: Request, db: AsyncSession, user_id: int) -> tuple[str, Response | None]:
+        """
+        Reads the user's version and returns its ETag, with a 304 or a cached response
+        when no query is needed. The version is read before the list, so a body is never
+        older than the version it is cached under.
+        """
+        version = await db.scalar(select(User.data_version).where(User.id == user_id))
+        etag = f'"{self.name}-{user_id}-{version or 0}"'
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return etag, Response(status_code=304, headers=self.headers(etag))
+        body = response_cache.get((self.name, user_id), etag)
+        if body is not None:
+            return etag, Response(body, media_type="application/json", headers=self.headers(etag))
+        return etag, None
+
+    def render(self, user_id: int, etag: str, rows) -> Response:
+        body = self.serializer.dumps(rows)
+        response_cache.put((self.name, user_id), etag, body)
+        return Response(body, media_type="application/json", headers=self.headers(etag))
+
+# Opening an account, issuing a card and (de)activating one go through the ORM
+@event.listens_for(Account, "after_insert")
+@event.listens_for(Account, "after_update")
+@event.listens_for(Account, "after_delete")
+@event.listens_for(Card, "after_insert")
+@event.listens_for(Card, "after_update")
+@event.listens_for(Card, "after_delete")
+def bump_owner_version(mapper, connection, target):
+    connection.execute(bump_versions([target.user_id]))
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""
+Idempotency-Key support for money-moving endpoints, so clients can retry and hedge safely.
+The key is claimed and the response stored in the same transaction as the money movement:
+either both commit or neither does. Completed responses are served from a bounded LRU in
+front of the indexed table; a concurrent duplicate in this process awaits the in-flight
+result, and one in another worker blocks on the unique index and then replays the stored row.
+Rejected requests (4xx) change nothing and are not stored, so a retry simply runs again.
+Expired keys are deleted in batches by a background task (see main.lifespan).
+"""
+
+# Imports
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from fastapi import Depends, Header, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database.create_database import get_async_session_factory
+from app.models import IdempotencyKey
+from app.routes.auth_helpers import get_current_user
+from app.settings import get_settings
+from app.utils.token_cache import UserSnapshot
+from app.utils.transfer_engine import run_in_transaction_async
+
+logger = logging.getLogger(__name__)
+
+# Idempotency settings
+IDEMPOTENCY_TTL_SECONDS = get_settings().idempotency_ttl_seconds
+IDEMPOTENCY_CACHE_SIZE = get_settings().idempotency_cache_size
+IDEMPOTENCY_COMPACT_INTERVAL = get_settings().idempotency_compact_interval
+IDEMPOTENCY_COMPACT_BATCH = 1000
+REPLAY_HEADER = "Idempotent-Replayed"
+
+@dataclass(frozen=True, slots=True)
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    body: dict
+    expires_at: datetime
+
+    @classmethod
+    def from_row(cls, row: IdempotencyKey) -> "StoredResponse":
+        return cls(row.request_hash, row.status_code, json.loads(row.response_body), row.expires_at)
+
+@dataclass(frozen=True, slots=True)
+class IdempotentRequest:
+    """
+    What the store needs from the route: who is asking, their key (None when not sent),
+    a hash of the request, and the response to mark replays on.
+    """
+    user_id: int
+    key: str | None
+    request_hash: str
+    response: Response
+
+# -------------------------
+# Helpers
+# -------------------------
+def request_hash(method: str, path: str, query: list[tuple[str, str]], body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method, path, json.dumps(sorted(query))):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+def record_response(db: Session, user_id: int, key: str, request_hash: str, expires_at: datetime, fn, *args) -> dict:
+    """
+    Claims the key, runs fn and stores its response in the caller's transaction. Does not commit.
+    The INSERT comes first, so a duplicate holding the key makes this wait (Postgres) or fail fast.
+    """
+    record = IdempotencyKey(user_id=user_id, key=key, request_hash=request_hash, status_code=200, expires_at=expires_at)
+    db.add(record)
+    db.flush()
+    body = jsonable_encoder(fn(db, *args))
+    record.response_body = json.dumps(body)
+    return body
+
+def delete_key(db: Session, key_id: int):
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == key_id))
+
+def delete_expired(db: Session, now: datetime, limit: int = IDEMPOTENCY_COMPACT_BATCH) -> int:
+    """
+    Deletes up to limit expired keys (range scan on ix_idempotency_keys_expires_at). Does not commit.
+    """
+    expired = select(IdempotencyKey.id).where(IdempotencyKey.expires_at < now).limit(limit)
+    result = db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+# -------------------------
+# Store
+# -------------------------
+class IdempotencyStore:
+    """
+    Bounded LRU of (user_id, key) -> StoredResponse over the idempotency_keys table,
+    plus the in-flight requests of this process.
+    """
+    def __init__(self, max_size: int = IDEMPOTENCY_CACHE_SIZE, ttl: int = IDEMPOTENCY_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[tuple[int, str], StoredResponse] = OrderedDict()
+        self.in_flight: dict[tuple[int, str], tuple[str, asyncio.Future]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, cache_key: tuple[int, str]) -> StoredResponse | None:
+        with self.lock:
+            stored = self.entries.get(cache_key)
+            if stored is None:
+                return None
+            if stored.expires_at <= datetime.utcnow():
+                del self.entries[cache_key]
+                return None
+            self.entries.move_to_end(cache_key)
+            return stored
+
+    def put(self, cache_key: tuple[int, str], stored: StoredResponse):
+        with self.lock:
+            self.entries[cache_key] = stored
+            self.entries.move_to_end(cache_key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    async def run(self, db: AsyncSession, request: IdempotentRequest, fn, *args):
+        """
+        Runs fn(session, *args) in a transaction at most once per key and returns its response body.
+        Without a key this is plain run_in_transaction_async.
+        """
+        if request.key is None:
+            return await run_in_transaction_async(db, fn, *args)
+
+        cache_key = (request.user_id, request.key)
+        stored = self.get(cache_key)
+        if stored is None:
+            flight = self.in_flight.get(cache_key)
+            if flight is not None:
+                check_hash(request, flight[0])
+                stored = await asyncio.shield(flight[1])
+            else:
+                stored, fresh = await self.execute(db, request, cache_key, fn, *args)
+                if fresh:
+                    return stored.body
+        check_hash(request, stored.request_hash)
+        request.response.status_code = stored.status_code
+        request.response.headers[REPLAY_HEADER] = "true"
+        return stored.body
+
+    async def execute(self, db: AsyncSession, request: IdempotentRequest, cache_key, fn, *args) -> tuple[StoredResponse, bool]:
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())  # no "never retrieved" warnings
+        self.in_flight[cache_key] = (request.request_hash, future)
+        try:
+            stored, fresh = await self.claim(db, request, fn, *args)
+            self.put(cache_key, stored)
+            future.set_result(stored)
+            return stored, fresh
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            del self.in_flight[cache_key]
+            if not future.done():
+                future.cancel()
+
+    async def claim(self, db: AsyncSession, request: IdempotentRequest, fn, *args) -> tuple[StoredResponse, bool]:
+        """
+        Returns (response, True) after running fn, or (stored response, False) when another
+        request already committed this key.
+        """
+        for _ in range(2):
+            expires_at = datetime.utcnow() + timedelta(seconds=self.ttl)
+            try:
+                body = await run_in_transaction_async(
+                    db, record_response, request.user_id, request.key, request.request_hash, expires_at, fn, *args
+                )
+                return StoredResponse(request.request_hash, 200, body, expires_at), True
+            except IntegrityError:
+                row = await db.scalar(
+                    select(IdempotencyKey).where(IdempotencyKey.user_id == request.user_id, IdempotencyKey.key == request.key)
+                )
+                if row is None:
+                    raise
+                if row.expires_at > datetime.utcnow():
+                    return StoredResponse.from_row(row), False
+                # Expired but not compacted yet: free the key and claim it again
+                await run_in_transaction_async(db, delete_key, row.id)
+        raise HTTPException(status_code=409, detail="Idempotency-Key is in use, please retry")
+
+def check_hash(request: IdempotentRequest, stored_hash: str):
+    if stored_hash != request.request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+
+idempotency_store = IdempotencyStore()
+
+# -------------------------
+# FastAPI integration
+# -------------------------
+async def idempotent_request(
+    request: Request,
+    response: Response,
+    current_user: UserSnapshot = Depends(get_current_user),
+    idempotency_key: str | None = Header(None, min_length=1, max_length=255)
+) -> IdempotentRequest:
+    """
+    Dependency for routes that pass their work through idempotency_store.run.
+    """
+    if idempotency_key is None:
+        return IdempotentRequest(current_user.id, None, "", response)
+    body = await request.body()
+    digest = request_hash(request.method, request.url.path, request.query_params.multi_items(), body)
+    return IdempotentRequest(current_user.id, idempotency_key, digest, response)
+
+async def compact_expired(db: AsyncSession) -> int:
+    total = 0
+    while True:
+        deleted = await run_in_transaction_async(db, delete_expired, datetime.utcnow(), IDEMPOTENCY_COMPACT_BATCH)
+        total += deleted
+        if deleted < IDEMPOTENCY_COMPACT_BATCH:
+            return total
+
+async def compact_idempotency_keys():
+    """
+    Background job (see main.lifespan): deletes expired keys in short batched transactions.
+    """
+    async with get_async_session_factory()() as db:
+        deleted = await compact_expired(db)
+    if deleted:
+        logger.info("Compacted %d expired idempotency keys", deleted)
\ No newline at end of file
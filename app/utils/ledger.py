@@ -0,0 +1,65 @@
+"""
+Double-entry ledger: each money movement is one journal entry plus one posting per account it
+touches. A posting's seq and running balance come from the same guarded
+UPDATE ... RETURNING that moved the account balance (accounts.posting_seq counts the postings),
+so postings are append-only and gap-free per account. An account's history is then one range
+scan on its (account_id, seq) key, and its balance as of t is the last posting at or before t.
+"""
+
+# Imports
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import Select, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import JournalEntry, Posting
+
+# -------------------------
+# Writes
+# -------------------------
+def post_entries(db: Session, entries: list[dict], legs: list[list[tuple]]) -> list[int]:
+    """
+    Writes journal entries (JournalEntry column values) and, for each, its postings given as
+    (account_id, seq, amount, balance) legs. One INSERT per table. Returns the journal ids.
+    Does not commit.
+    """
+    if not entries:
+        return []
+    now = datetime.utcnow()
+    journal_ids = db.scalars(
+        insert(JournalEntry).returning(JournalEntry.id, sort_by_parameter_order=True),
+        [{"timestamp": now, **entry} for entry in entries]
+    ).all()
+    db.execute(insert(Posting), [
+        {"account_id": account_id, "seq": seq, "journal_id": journal_id, "amount": amount, "balance": balance, "timestamp": now}
+        for journal_id, entry_legs in zip(journal_ids, legs)
+        for account_id, seq, amount, balance in entry_legs
+    ])
+    return journal_ids
+
+def post_entry(db: Session, legs: list[tuple], **entry) -> int:
+    """
+    Single-movement form of post_entries. Returns the journal id. Does not commit.
+    """
+    return post_entries(db, [entry], [legs])[0]
+
+# -------------------------
+# Reads
+# -------------------------
+def posting_at(account_id: int, as_of: datetime) -> Select:
+    """
+    The account's last posting at or before as_of: one seek on ix_postings_account_timestamp.
+    """
+    return (
+        select(Posting.balance)
+        .where(Posting.account_id == account_id, Posting.timestamp <= as_of)
+        .order_by(Posting.timestamp.desc(), Posting.seq.desc())
+        .limit(1)
+    )
+
+async def balance_at(db: AsyncSession, account_id: int, as_of: datetime) -> Decimal:
+    """
+    Balance after every posting dated at or before as_of (naive UTC). One query.
+    """
+    balance = await db.scalar(posting_at(account_id, as_of))
+    return balance if balance is not None else Decimal("0.00")
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Prometheus-style metrics without external dependencies, served as text on /metrics.
+Tracks per-route latency and in-flight requests (ASGI middleware), DB query count/time
+per request (cursor events), pool checkout waits, and time spent in Fernet and password hashing.
+Series are plain lists and dicts mutated without locks: increments rely on the GIL,
+so a rare lost update under thread contention is accepted in exchange for zero lock overhead.
+The same per-request counter enforces route query budgets (see query_budget).
+"""
+
+# Imports
+import logging
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from fastapi import Request
+from sqlalchemy import event
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Query budget enforcement: "off", "log" (default), or "raise" (tests)
+QUERY_BUDGET_MODE = get_settings().query_budget_mode
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+CRYPTO_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005, 0.05, 0.25, 0.5, 1.0)
+
+# -------------------------
+# Metric types
+# -------------------------
+def format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{str(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.series: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in list(self.series.items()):
+            yield f"{self.name}{format_labels(self.labelnames, labels)} {value}"
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.series[labels] = self.series.get(labels, 0) - amount
+
+class Histogram:
+    """
+    One list per label set: a count per bucket (the last one is +Inf), then the running sum.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames, self.buckets = name, help, labelnames, buckets
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        counts = self.series.get(labels)
+        if counts is None:
+            counts = self.series.setdefault(labels, [0] * (len(self.buckets) + 2))
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self):
+        for labels, counts in list(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labelnames, labels)} {counts[-1]}"
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+# -------------------------
+# Metrics
+# -------------------------
+registry = Registry()
+http_requests = registry.register(Counter(
+    "http_requests_total", "Requests by route template, method and status.", ("route", "method", "status")))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency including the response body.", ("route", "method")))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requests currently being served."))
+http_db_queries = registry.register(Counter(
+    "http_db_queries_total", "DB statements executed while serving each route.", ("route",)))
+http_db_seconds = registry.register(Counter(
+    "http_db_seconds_total", "DB statement time spent while serving each route.", ("route",)))
+db_query_seconds = registry.register(Histogram(
+    "db_query_duration_seconds", "Statement execution time per engine.", ("engine",), QUERY_BUCKETS))
+db_pool_wait_seconds = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", ("engine",), QUERY_BUCKETS))
+db_pool_checked_out = registry.register(Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool.", ("engine",)))
+crypto_seconds = registry.register(Histogram(
+    "crypto_duration_seconds", "Time spent in Fernet and password hashing (hashing includes pool queueing).",
+    ("operation",), CRYPTO_BUCKETS))
+
+# -------------------------
+# Request context
+# -------------------------
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "budget", "route")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.budget = None
+        self.route = None
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no response wrapping), so streaming bodies are timed to the last byte.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        http_in_flight.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - start
+            http_in_flight.dec()
+            current_request.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            http_latency.observe((path, scope["method"]), elapsed)
+            http_requests.inc((path, scope["method"], status[0]))
+            if stats.queries:
+                http_db_queries.inc((path,), stats.queries)
+                http_db_seconds.inc((path,), stats.db_seconds)
+
+# -------------------------
+# Engine instrumentation
+# -------------------------
+def instrument_engine(target, name: str):
+    """
+    Times statements and pool checkouts for a sync or async engine.
+    """
+    sync_engine = getattr(target, "sync_engine", target)
+    labels = (name,)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_query(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def end_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = perf_counter() - conn.info.pop("query_start", perf_counter())
+        db_query_seconds.observe(labels, elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            if stats.budget is not None and stats.queries > stats.budget:
+                over_budget(stats, statement)
+
+    pool = sync_engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        start = perf_counter()
+        try:
+            return connect()
+        finally:
+            db_pool_wait_seconds.observe(labels, perf_counter() - start)
+
+    pool.connect = timed_connect
+    event.listen(pool, "checkout", lambda *args: db_pool_checked_out.inc(labels))
+    event.listen(pool, "checkin", lambda *args: db_pool_checked_out.dec(labels))
+
+# -------------------------
+# Query budgets
+# -------------------------
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+def over_budget(stats: RequestStats, statement: str):
+    message = f"{stats.route} ran {stats.queries} queries (budget {stats.budget}); latest: {statement[:200]}"
+    if QUERY_BUDGET_MODE == "raise":
+        raise QueryBudgetExceeded(message)
+    if QUERY_BUDGET_MODE == "log" and stats.queries == stats.budget + 1:  # once per request
+        logger.warning("Query budget exceeded: %s", message)
+
+def query_budget(limit: int, name: str | None = None):
+    """
+    Route dependency capping the statements one request may run, authentication included:
+        @router.get("/", dependencies=[Depends(query_budget(2))])
+    Needs MetricsMiddleware and an instrumented engine; otherwise it does nothing.
+    """
+    async def set_budget(request: Request):
+        stats = current_request.get()
+        if stats is not None and QUERY_BUDGET_MODE != "off":
+            stats.budget = limit
+            stats.route = name or getattr(request.scope.get("route"), "path", request.url.path)
+    return set_budget
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""
+Fixed-point money handling.
+Amounts are stored as integer cents and surfaced in Python as Decimal,
+so balances never accumulate floating-point rounding drift.
+"""
+
+# Imports
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal("0.01")
+
+# -------------------------
+# Helpers
+# -------------------------
+def to_cents(value) -> int:
+    """
+    Converts a Decimal, int, float, or numeric string amount to integer cents.
+    """
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int((value * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+def from_cents(cents) -> Decimal:
+    return (Decimal(int(cents)) * CENT).quantize(CENT)
+
+# -------------------------
+# Column type
+# -------------------------
+class Money(TypeDecorator):
+    """
+    BIGINT column holding cents; reads and writes Decimal values.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_cents(value)
@@ -0,0 +1,166 @@
+"""
+Transactional outbox: every money movement writes one outbox_events row in the same commit
+as its ledger rows, so downstream consumers learn about it without scanning transactions.
+Rows get their feed position (seq) from the relay, which numbers committed rows under the
+"sequence" cursor lock. seq therefore follows commit order with no gaps, so a consumer that
+resumes after seq n never misses a row that committed late behind a higher id.
+"""
+
+# Imports
+import asyncio
+import json
+import threading
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import Select, event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import OutboxCursor, OutboxEvent
+from app.settings import get_settings
+from app.utils.money import from_cents, to_cents
+
+# Outbox settings
+OUTBOX_BATCH_SIZE = get_settings().outbox_batch_size
+SEQUENCE_CURSOR = "sequence"
+
+# -------------------------
+# Wake-ups
+# -------------------------
+def release(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+class Signal:
+    """
+    Wakes coroutines on any event loop from any thread. version counts notifications,
+    so a waiter that passes the version it last saw never misses one in between.
+    """
+    def __init__(self):
+        self.version = 0
+        self.waiters = set()
+        self.lock = threading.Lock()
+
+    def notify(self):
+        with self.lock:
+            self.version += 1
+            waiters, self.waiters = self.waiters, set()
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(release, future)
+            except RuntimeError:  # loop already closed
+                pass
+
+    async def wait(self, seen: int, timeout: float) -> int:
+        """
+        Returns once version moves past seen or timeout seconds pass; returns the current version.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self.lock:
+            if self.version != seen:
+                return self.version
+            self.waiters.add((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self.lock:
+                self.waiters.discard((loop, future))
+        return self.version
+
+# A commit wrote outbox rows (wakes the relay); the relay numbered rows (wakes feed long-polls)
+outbox_written = Signal()
+events_sequenced = Signal()
+
+@event.listens_for(Session, "after_commit")
+def notify_relay(session: Session):
+    if session.info.pop("outbox_written", False):
+        outbox_written.notify()
+
+@event.listens_for(Session, "after_rollback")
+def forget_outbox_rows(session: Session):
+    session.info.pop("outbox_written", None)
+
+# -------------------------
+# Writing events
+# -------------------------
+def encode_value(value):
+    # Money as an exact string with two decimals, e.g. "30.00"
+    if isinstance(value, Decimal):
+        return str(from_cents(to_cents(value)))
+    return str(value)
+
+def encode_payload(payload: dict) -> str:
+    return json.dumps(payload, default=encode_value, separators=(",", ":"))
+
+def record_event(db: Session, event_type: str, **payload):
+    """
+    Adds one outbox row to the caller's transaction (flushed with the ledger rows). Does not commit.
+    """
+    db.add(OutboxEvent(event_type=event_type, payload=encode_payload(payload)))
+    db.info["outbox_written"] = True
+
+def record_events(db: Session, event_type: str, payloads: list[dict]):
+    """
+    Bulk form of record_event: one INSERT for every payload. Does not commit.
+    """
+    if payloads:
+        db.execute(insert(OutboxEvent), [
+            {"event_type": event_type, "payload": encode_payload(payload), "created_at": datetime.utcnow()}
+            for payload in payloads
+        ])
+        db.info["outbox_written"] = True
+
+# -------------------------
+# Sequencing and reading
+# -------------------------
+def sequence_events(db: Session, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Numbers the next batch of committed, unnumbered outbox rows under the sequence cursor lock.
+    Returns how many were numbered. Does not commit.
+    """
+    counter = db.scalar(select(OutboxCursor).where(OutboxCursor.name == SEQUENCE_CURSOR).with_for_update())
+    if counter is None:
+        counter = OutboxCursor(name=SEQUENCE_CURSOR, seq=0)
+        db.add(counter)
+        db.flush()
+
+    ids = db.scalars(
+        select(OutboxEvent.id).where(OutboxEvent.seq.is_(None)).order_by(OutboxEvent.id).limit(batch_size)
+    ).all()
+    if not ids:
+        return 0
+    db.execute(update(OutboxEvent), [{"id": event_id, "seq": counter.seq + n} for n, event_id in enumerate(ids, start=1)])
+    counter.seq += len(ids)
+    return len(ids)
+
+def advance_cursor(db: Session, name: str, seq: int):
+    """
+    Records that a consumer has everything up to seq; never moves a cursor backwards. Does not commit.
+    """
+    changed = db.execute(
+        update(OutboxCursor).where(OutboxCursor.name == name, OutboxCursor.seq < seq)
+        .values(seq=seq, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not changed and db.get(OutboxCursor, name) is None:
+        db.add(OutboxCursor(name=name, seq=seq))
+
+def events_after(after: int, limit: int) -> Select:
+    return (
+        select(OutboxEvent.seq, OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.created_at, OutboxEvent.payload)
+        .where(OutboxEvent.seq > after)
+        .order_by(OutboxEvent.seq)
+        .limit(limit)
+    )
+
+async def fetch_events(db: AsyncSession, after: int, limit: int) -> list[dict]:
+    """
+    Numbered events after the given seq, oldest first, as plain dicts (the feed and sink format).
+    """
+    rows = await db.execute(events_after(after, limit))
+    return [
+        {"seq": seq, "id": event_id, "type": event_type, "created_at": created_at.isoformat(), "payload": json.loads(payload)}
+        for seq, event_id, event_type, created_at, payload in rows
+    ]
\ No newline at end of file
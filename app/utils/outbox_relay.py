@@ -0,0 +1,123 @@
+"""
+Background relay for the transactional outbox (see main.lifespan). Each run numbers newly
+committed outbox rows (which wakes /events long-polls) and then drains the numbered rows
+past the sink's cursor into the configured sink, one batch at a time.
+Delivery is at least once: the cursor only moves after the sink accepts a batch, so a crash
+in between (or two workers relaying at once) repeats events. Consumers dedupe on seq.
+"""
+
+# Imports
+import asyncio
+import json
+import logging
+from pathlib import Path
+from sqlalchemy import select
+from app.database.create_database import get_async_session_factory
+from app.models import OutboxCursor
+from app.settings import get_settings, lazy
+from app.utils.outbox import OUTBOX_BATCH_SIZE, advance_cursor, events_sequenced, fetch_events, sequence_events
+from app.utils.transfer_engine import run_in_transaction_async
+
+logger = logging.getLogger(__name__)
+
+# Relay settings
+OUTBOX_SINK = get_settings().outbox_sink
+OUTBOX_RELAY_INTERVAL = get_settings().outbox_relay_interval  # fallback when no commit wakes the relay
+OUTBOX_HTTP_TIMEOUT = get_settings().outbox_http_timeout
+
+# -------------------------
+# Sinks
+# -------------------------
+class FileSink:
+    """
+    Appends each event as one JSON line.
+    """
+    def __init__(self, path: str):
+        self.name = f"file:{path}"
+        self.path = Path(path)
+
+    def write(self, events: list[dict]):
+        with self.path.open("a", encoding="utf-8") as f:
+            f.writelines(json.dumps(e, separators=(",", ":")) + "\n" for e in events)
+
+    async def publish(self, events: list[dict]):
+        await asyncio.to_thread(self.write, events)
+
+class QueueSink:
+    """
+    In-process asyncio queue for consumers running inside the app; a full queue holds the relay back.
+    """
+    def __init__(self, maxsize: int = 10000):
+        self.name = "queue"
+        self.queue = asyncio.Queue(maxsize)
+
+    async def publish(self, events: list[dict]):
+        for e in events:
+            await self.queue.put(e)
+
+class HttpSink:
+    """
+    POSTs each batch as {"events": [...]}; any non-2xx response is retried on the next run.
+    """
+    def __init__(self, url: str, timeout: float = OUTBOX_HTTP_TIMEOUT):
+        self.name = url
+        self.url = url
+        self.timeout = timeout
+
+    async def publish(self, events: list[dict]):
+        import httpx
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.post(self.url, json={"events": events})
+            response.raise_for_status()
+
+def make_sink(spec: str):
+    """
+    Builds a sink from OUTBOX_SINK: "none", "queue", "file:<path>" or an http(s):// URL.
+    """
+    if spec in ("", "none"):
+        return None
+    if spec == "queue":
+        return QueueSink()
+    if spec.startswith("file:"):
+        return FileSink(spec[len("file:"):])
+    if spec.startswith(("http://", "https://")):
+        return HttpSink(spec)
+    raise ValueError(f"Unknown OUTBOX_SINK: {spec!r}")
+
+@lazy
+def get_outbox_sink():
+    return make_sink(OUTBOX_SINK)
+
+# -------------------------
+# Relay
+# -------------------------
+async def relay_outbox(sink=None):
+    """
+    Background job: numbers every committed outbox row, then delivers what the sink hasn't seen.
+    """
+    sink = sink or get_outbox_sink()
+    async with get_async_session_factory()() as db:
+        while True:
+            numbered = await run_in_transaction_async(db, sequence_events)
+            if numbered:
+                events_sequenced.notify()
+            if numbered < OUTBOX_BATCH_SIZE:
+                break
+        if sink is None:
+            return
+
+        cursor_name = f"sink:{sink.name}"
+        delivered = 0
+        while True:
+            after = await db.scalar(select(OutboxCursor.seq).where(OutboxCursor.name == cursor_name)) or 0
+            events = await fetch_events(db, after, OUTBOX_BATCH_SIZE)
+            await db.rollback()  # no transaction held open while the sink works
+            if not events:
+                break
+            await sink.publish(events)
+            await run_in_transaction_async(db, advance_cursor, cursor_name, events[-1]["seq"])
+            delivered += len(events)
+            if len(events) < OUTBOX_BATCH_SIZE:
+                break
+    if delivered:
+        logger.info("Relayed %d outbox events to %s", delivered, sink.name)
\ No newline at end of file
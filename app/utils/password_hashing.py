@@ -0,0 +1,104 @@
+"""
+Password hashing and verification on a dedicated, size-limited process pool.
+Keeps pbkdf2's deliberate CPU burn off the event loop and out of the GIL, sheds load
+with 503 + Retry-After when the pool's queue is full, and upgrades hashes on login
+when PASSWORD_HASH_ROUNDS changes. The CryptContext is built on first use in each process.
+"""
+
+# Imports
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from fastapi import HTTPException
+from app.settings import get_settings, lazy
+from app.utils.metrics import crypto_seconds
+
+# Hashing settings (tune rounds per environment; lower in tests, higher in production)
+PASSWORD_HASH_ROUNDS = get_settings().password_hash_rounds
+PASSWORD_HASH_WORKERS = get_settings().password_hash_workers
+PASSWORD_HASH_MAX_QUEUE = get_settings().password_hash_max_queue
+PASSWORD_HASH_RETRY_AFTER = get_settings().password_hash_retry_after
+
+@lazy
+def get_pwd_context():
+    from passlib.context import CryptContext
+    # Pinning min/max rounds to the target makes any other rounds count "needs update"
+    return CryptContext(
+        schemes=["pbkdf2_sha256"],
+        deprecated="auto",
+        pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+        pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+        pbkdf2_sha256__max_rounds=PASSWORD_HASH_ROUNDS,
+    )
+
+# -------------------------
+# Worker functions (run in the pool's processes)
+# -------------------------
+def hash_in_worker(password: str) -> str:
+    return get_pwd_context().hash(password)
+
+def verify_in_worker(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    try:
+        return get_pwd_context().verify_and_update(password, hashed_password)
+    except ValueError:  # unrecognised hash format
+        return False, None
+
+# -------------------------
+# Pool
+# -------------------------
+class HashingPool:
+    """
+    Lazily started process pool with an in-flight cap enforced on the event loop.
+    """
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.executor = None
+
+    def start(self):
+        if self.executor is None:
+            # spawn: forking a process that already runs threads (aiosqlite, uvicorn) is unsafe
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def run(self, fn, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication is busy, please retry",
+                headers={"Retry-After": PASSWORD_HASH_RETRY_AFTER}
+            )
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.start(), fn, *args)
+        finally:
+            self.in_flight -= 1
+
+hashing_pool = HashingPool()
+
+# -------------------------
+# Public API
+# -------------------------
+async def hash_password(password: str) -> str:
+    start = perf_counter()
+    try:
+        return await hashing_pool.run(hash_in_worker, password)
+    finally:
+        crypto_seconds.observe(("password_hash",), perf_counter() - start)
+
+async def verify_password(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Returns (valid, new_hash); new_hash is set when the stored hash uses outdated settings.
+    """
+    start = perf_counter()
+    try:
+        return await hashing_pool.run(verify_in_worker, password, hashed_password)
+    finally:
+        crypto_seconds.observe(("password_verify",), perf_counter() - start)
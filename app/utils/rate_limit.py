@@ -0,0 +1,215 @@
+"""
+Admission control in front of every route: token buckets per user (the verified JWT sub) and
+per client IP for three route classes (auth, writes, reads), plus a cap on in-flight writes.
+Rejections are answered by the middleware itself (429, or 503 at the write cap, both with
+Retry-After) before routing, authentication or any DB session, so overload sheds cheaply
+instead of queueing in the threadpool or the SQLite writer.
+Buckets live in a bounded in-process LRU, or in Redis (RATE_LIMIT_URL) to share them between workers.
+"""
+
+# Imports
+import math
+import time
+from collections import OrderedDict
+from starlette.responses import JSONResponse
+from app.settings import get_settings
+from app.utils.metrics import Counter, registry
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+EXEMPT_PATHS = {"/metrics"}
+
+def parse_rate(spec: str) -> tuple[float, float] | None:
+    """
+    "20/50" -> 20 tokens per second with bursts of up to 50; "off" (or 0) disables the bucket.
+    """
+    rate, _, burst = spec.partition("/")
+    if spec.lower() == "off" or float(rate) <= 0:
+        return None
+    return float(rate), float(burst or rate)
+
+def rate_limits() -> dict:
+    settings = get_settings()
+    return {
+        "auth": parse_rate(settings.rate_limit_auth),
+        "write": parse_rate(settings.rate_limit_write),
+        "read": parse_rate(settings.rate_limit_read),
+    }
+
+requests_shed = registry.register(Counter(
+    "http_requests_shed_total", "Requests rejected by admission control before routing.", ("route_class", "reason")))
+
+# -------------------------
+# Helpers
+# -------------------------
+def route_class(method: str, path: str) -> str | None:
+    """
+    Classifies a request from its method and raw path (it runs before routing); None is exempt.
+    """
+    if path in EXEMPT_PATHS:
+        return None
+    if path == "/auth" or path.startswith("/auth/"):
+        return "auth"
+    return "read" if method in SAFE_METHODS else "write"
+
+def token_subject(headers: list[tuple[bytes, bytes]]) -> str | None:
+    """
+    The sub of a valid bearer token. The signature is checked (one HMAC, no DB), so a
+    forged subject cannot drain someone else's bucket; a bad token counts against the IP only.
+    """
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            break
+    else:
+        return None
+    secret_key = get_settings().jwt_secret_key
+    if scheme.lower() != "bearer" or not token or not secret_key:
+        return None
+    from jose import jwt
+    from jose.exceptions import JOSEError
+    try:
+        return jwt.decode(token, secret_key, algorithms=["HS256"]).get("sub")
+    except JOSEError:
+        return None
+
+# -------------------------
+# Backends
+# -------------------------
+class TokenBuckets:
+    """
+    Bounded LRU of bucket key -> (tokens, updated_at). Only touched from the event loop,
+    so no lock; an evicted bucket was idle longest and simply starts full again.
+    """
+    def __init__(self, max_size: int | None = None):
+        self.max_size = get_settings().rate_limit_size if max_size is None else max_size
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, limits: list[tuple[str, float, float]], now: float) -> float:
+        """
+        Takes one token from every (key, rate, burst) bucket, or from none of them.
+        Returns 0 when admitted, otherwise the seconds until the emptiest bucket has a token.
+        """
+        levels = []
+        wait = 0.0
+        for key, rate, burst in limits:
+            bucket = self.buckets.get(key)
+            tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * rate)
+            levels.append(tokens)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / rate)
+        if wait:
+            return wait
+        for (key, _, _), tokens in zip(limits, levels):
+            self.buckets[key] = (tokens - 1, now)
+            self.buckets.move_to_end(key)
+        while len(self.buckets) > self.max_size:
+            self.buckets.popitem(last=False)
+        return 0.0
+
+    def clear(self):
+        self.buckets.clear()
+
+class RedisTokenBuckets:
+    """
+    Shared buckets for multi-worker deployments, updated atomically by one Lua script per
+    request. Requires the optional redis package. Keys expire once their bucket would be full.
+    """
+    prefix = "rate-limit"
+    script = """
+        local now = tonumber(ARGV[1])
+        local levels, wait = {}, 0
+        for i, key in ipairs(KEYS) do
+            local rate, burst = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+            local state = redis.call('HMGET', key, 't', 'ts')
+            local tokens = tonumber(state[1]) or burst
+            tokens = math.min(burst, tokens + math.max(0, now - (tonumber(state[2]) or now)) * rate)
+            levels[i] = tokens
+            if tokens < 1 then wait = math.max(wait, (1 - tokens) / rate) end
+        end
+        if wait == 0 then
+            for i, key in ipairs(KEYS) do
+                redis.call('HSET', key, 't', levels[i] - 1, 'ts', now)
+                redis.call('PEXPIRE', key, math.ceil(tonumber(ARGV[2 * i + 1]) / tonumber(ARGV[2 * i]) * 1000))
+            end
+        end
+        return tostring(wait)
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_URL is set but the 'redis' package is not installed") from e
+        self.client = redis.Redis.from_url(url)
+        self.take_script = self.client.register_script(self.script)
+
+    def take(self, limits: list[tuple[str, float, float]], now: float) -> float:
+        keys = [f"{self.prefix}:{key}" for key, _, _ in limits]
+        args = [now] + [value for _, rate, burst in limits for value in (rate, burst)]
+        return float(self.take_script(keys=keys, args=args))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f"{self.prefix}:*"))
+        if keys:
+            self.client.delete(*keys)
+
+# -------------------------
+# Middleware
+# -------------------------
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware. Each request takes a token from its class's user bucket (when it
+    carries a valid token) and IP bucket, all or nothing; writes also need a free slot
+    under max_writes. Auth requests are left to the password hashing pool's own queue cap.
+    Options left out come from the RATE_LIMIT_* settings; RATE_LIMIT_ENABLED=false passes everything through.
+    """
+    def __init__(self, app, limits: dict | None = None, ip_factor: float | None = None,
+                 max_writes: int | None = None, store=None, clock=time.time):
+        settings = get_settings()
+        self.app = app
+        self.enabled = settings.rate_limit_enabled
+        self.limits = rate_limits() if limits is None else limits
+        # A client IP may front many users (NAT, office proxies), so its buckets are this many times larger
+        self.ip_factor = settings.rate_limit_ip_factor if ip_factor is None else ip_factor
+        self.max_writes = settings.rate_limit_max_writes if max_writes is None else max_writes
+        # RATE_LIMIT_URL, e.g. redis://localhost:6379/1
+        self.store = store or (RedisTokenBuckets(settings.rate_limit_url) if settings.rate_limit_url else TokenBuckets())
+        self.clock = clock
+        self.writes_in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            return await self.app(scope, receive, send)
+        kind = route_class(scope["method"], scope["path"])
+        if kind is None:
+            return await self.app(scope, receive, send)
+
+        limit = self.limits.get(kind)
+        if limit is not None:
+            rate, burst = limit
+            client = scope.get("client")
+            buckets = [(f"{kind}:ip:{client[0] if client else 'unknown'}", rate * self.ip_factor, burst * self.ip_factor)]
+            subject = token_subject(scope["headers"])
+            if subject is not None:
+                buckets.append((f"{kind}:user:{subject}", rate, burst))
+            wait = self.store.take(buckets, self.clock())
+            if wait:
+                requests_shed.inc((kind, "rate"))
+                return await self.reject(scope, receive, send, 429, "Too many requests", wait)
+
+        if kind != "write" or not self.max_writes:
+            return await self.app(scope, receive, send)
+        if self.writes_in_flight >= self.max_writes:
+            requests_shed.inc((kind, "concurrency"))
+            return await self.reject(scope, receive, send, 503, "Too many concurrent writes, please retry", 1)
+        self.writes_in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.writes_in_flight -= 1
+
+    @staticmethod
+    async def reject(scope, receive, send, status: int, detail: str, retry_after: float):
+        response = JSONResponse({"detail": detail}, status_code=status,
+                                headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+        await response(scope, receive, send)
\ No newline at end of file
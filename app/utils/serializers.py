@@ -0,0 +1,90 @@
+"""
+Fast JSON path for list responses. A route that returns its rows through FastAPI validates
+every row into its response_model, serializes it back out and runs jsonable_encoder over
+the result before json.dumps. Rows read from our own tables are already trusted, so the
+list routes instead return a FastJSONResponse built by a RowSerializer, compiled once per
+schema: it copies the schema's fields straight out of each ORM object, Core row or
+constructed model and hands plain dicts to orjson. The response_model stays on the route
+for the OpenAPI schema. Measure it with python -m benchmarks.serialization.
+"""
+
+# Imports
+from decimal import Decimal
+from operator import itemgetter
+from typing import Any, get_args
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Row
+from app.schemas import AccountOut, CardOut, TransactionOut
+
+# -------------------------
+# Helpers
+# -------------------------
+def encode_default(value: Any):
+    """
+    orjson fallback for types it does not serialize natively; Amount fields go out as floats.
+    """
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def is_decimal(annotation) -> bool:
+    """
+    True for Decimal, Amount (Annotated) and Optional[Amount].
+    """
+    return annotation is Decimal or any(is_decimal(arg) for arg in get_args(annotation))
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson rendering that also accepts Decimal. The app's default response class, so routes
+    that still return models skip json.dumps; RowSerializer output skips everything else too.
+    """
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=encode_default, option=orjson.OPT_NON_STR_KEYS)
+
+# -------------------------
+# Serializers
+# -------------------------
+class RowSerializer:
+    """
+    Turns trusted rows into the JSON shape of schema without building models.
+    Decimal fields (Amount) are converted to floats here, as their serializer would.
+    """
+    def __init__(self, schema: type[BaseModel]):
+        self.schema = schema
+        self.fields = tuple(schema.model_fields)
+        self.amounts = tuple(
+            name for name, field in schema.model_fields.items()
+            if is_decimal(field.annotation)
+        )
+
+    def values(self, row) -> dict:
+        # ORM objects and constructed models keep their loaded values in __dict__
+        source = row.__dict__
+        try:
+            return {name: source[name] for name in self.fields}
+        except KeyError:  # expired or deferred ORM attribute: let the instrumented getter load it
+            return {name: getattr(row, name) for name in self.fields}
+
+    def items(self, rows: list) -> list[dict]:
+        fields = self.fields
+        if rows and isinstance(rows[0], Row):
+            # Core rows of one result share their columns, so read them by position
+            columns = itemgetter(*(rows[0]._fields.index(name) for name in fields))
+            items = [dict(zip(fields, columns(row))) for row in rows]
+        else:
+            values = self.values
+            items = [values(row) for row in rows]
+        for name in self.amounts:
+            for item in items:
+                if item[name] is not None:
+                    item[name] = float(item[name])
+        return items
+
+    def dumps(self, rows) -> bytes:
+        return orjson.dumps(self.items(rows))
+
+account_serializer = RowSerializer(AccountOut)
+card_serializer = RowSerializer(CardOut)
+transaction_serializer = RowSerializer(TransactionOut)
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Serializes SQLite write transactions onto one dedicated writer thread that group-commits.
+Queued units of work run back to back inside a single BEGIN IMMEDIATE transaction,
+each in its own savepoint so a rejected unit does not undo its neighbours,
+and the whole group pays for one commit (one WAL fsync at most).
+Only enabled under SQLITE_PROFILE=production.
+"""
+
+# Imports
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.database.create_database import get_engine, sqlite_profile_enabled
+from app.settings import get_settings, lazy
+
+# Writer settings
+SQLITE_WRITER_BATCH = get_settings().sqlite_writer_batch
+SQLITE_WRITER_WINDOW = get_settings().sqlite_writer_window  # seconds to wait for more work
+
+class SQLiteWriter:
+    """
+    Single writer thread fed by a queue of (fn, args, future); fn receives a sync Session.
+    """
+    def __init__(self, bind: Engine, batch_size: int = SQLITE_WRITER_BATCH, window: float = SQLITE_WRITER_WINDOW):
+        self.bind = bind
+        self.batch_size = batch_size
+        self.window = window
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.loop, name="sqlite-writer", daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        with self.lock:
+            if self.thread is not None:
+                self.jobs.put(None)
+                self.thread.join()
+                self.thread = None
+
+    def submit(self, fn, *args) -> Future:
+        self.start()
+        future = Future()
+        self.jobs.put((fn, args, future))
+        return future
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    # -------------------------
+    # Writer thread
+    # -------------------------
+    def next_group(self) -> list | None:
+        """
+        Blocks for one job, then gathers whatever else arrives within the window.
+        """
+        first = self.jobs.get()
+        if first is None:
+            return None
+        group = [first]
+        deadline = time.monotonic() + self.window
+        while len(group) < self.batch_size:
+            try:
+                job = self.jobs.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if job is None:
+                self.jobs.put(None)  # finish this group, then stop
+                break
+            group.append(job)
+        return group
+
+    def commit_group(self, group: list):
+        done = []
+        with Session(self.bind, autoflush=False, expire_on_commit=False) as db:
+            try:
+                # Take the write lock up front; pysqlite would otherwise defer BEGIN past the first SAVEPOINT
+                db.execute(text("BEGIN IMMEDIATE"))
+                for fn, args, future in group:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with db.begin_nested():
+                            result = fn(db, *args)
+                    except Exception as exc:
+                        future.set_exception(exc)
+                    else:
+                        done.append((future, result))
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                for future, _ in done:
+                    future.set_exception(exc)
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+        for future, result in done:
+            future.set_result(result)
+
+    def loop(self):
+        while True:
+            group = self.next_group()
+            if group is None:
+                return
+            self.commit_group(group)
+
+@lazy
+def get_sqlite_writer() -> SQLiteWriter | None:
+    return SQLiteWriter(get_engine()) if sqlite_profile_enabled(get_settings().database_url) else None
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Builds account statement queries over the postings table.
+An account's postings are one range scan on the clustered (account_id, seq) key, joined to their
+journal entries by primary key, and pages are fetched with keyset pagination on seq.
+Full statements are streamed from a server-side cursor as CSV or NDJSON.
+"""
+
+# Imports
+import base64
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from sqlalchemy import Select, String, case, cast, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from app.models import JournalEntry, Posting
+
+STATEMENT_FIELDS = [
+    "id", "timestamp", "transaction_type", "amount", "from_account_id", "to_account_id", "description", "balance"
+]
+STREAM_CHUNK_SIZE = 1000
+
+# -------------------------
+# Cursors
+# -------------------------
+def encode_cursor(seq: int) -> str:
+    return base64.urlsafe_b64encode(f"seq:{seq}".encode()).decode()
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        prefix, seq = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if prefix != "seq":
+            raise ValueError(prefix)
+        return int(seq)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def to_utc_naive(value: datetime | None) -> datetime | None:
+    """
+    Timestamps are stored as naive UTC; aware filter values are converted to match.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+# -------------------------
+# Queries
+# -------------------------
+# Transfers without a description read from the account's side, as "Transfer to/from account N"
+statement_description = func.coalesce(JournalEntry.description, case(
+    (JournalEntry.transaction_type != "transfer", None),
+    (Posting.amount < 0, literal("Transfer to account ") + cast(JournalEntry.to_account_id, String)),
+    else_=literal("Transfer from account ") + cast(JournalEntry.from_account_id, String),
+))
+
+def account_postings(
+    account_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    cursor: int | None = None,
+    limit: int | None = None,
+    newest_first: bool = True
+) -> Select:
+    """
+    Returns a select of the account's statement rows between start (inclusive) and end (exclusive),
+    resuming after the seq cursor when given. Rows carry the journal entry's id, type, accounts
+    and description, and the posting's signed amount, running balance and seq.
+    """
+    conditions = [Posting.account_id == account_id]
+    if start is not None:
+        conditions.append(Posting.timestamp >= to_utc_naive(start))
+    if end is not None:
+        conditions.append(Posting.timestamp < to_utc_naive(end))
+    if cursor is not None:
+        conditions.append(Posting.seq < cursor if newest_first else Posting.seq > cursor)
+    stmt = (
+        select(
+            JournalEntry.id, Posting.timestamp, JournalEntry.transaction_type, Posting.amount,
+            JournalEntry.from_account_id, JournalEntry.to_account_id,
+            statement_description.label("description"), Posting.balance, Posting.seq
+        )
+        .join(JournalEntry, JournalEntry.id == Posting.journal_id)
+        .where(*conditions)
+        .order_by(Posting.seq.desc() if newest_first else Posting.seq)
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+# -------------------------
+# Streaming export
+# -------------------------
+def format_csv(rows, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(STATEMENT_FIELDS)
+    for row in rows:
+        writer.writerow([
+            row.id, row.timestamp.isoformat(), row.transaction_type, row.amount,
+            row.from_account_id, row.to_account_id, row.description, row.balance
+        ])
+    return buffer.getvalue()
+
+def format_ndjson(rows, header: bool) -> str:
+    # Amounts as exact decimal strings, the same digits the CSV carries
+    return "".join(
+        json.dumps({
+            "id": row.id,
+            "timestamp": row.timestamp.isoformat(),
+            "transaction_type": row.transaction_type,
+            "amount": str(row.amount),
+            "from_account_id": row.from_account_id,
+            "to_account_id": row.to_account_id,
+            "description": row.description,
+            "balance": str(row.balance),
+        }) + "\n"
+        for row in rows
+    )
+
+STATEMENT_FORMATS = {
+    "csv": ("text/csv", format_csv),
+    "ndjson": ("application/x-ndjson", format_ndjson),
+}
+
+async def stream_statement(bind: AsyncEngine, account_id: int, fmt: str, start=None, end=None):
+    """
+    Yields the account's full statement, oldest first, one encoded chunk at a time.
+    Opens its own session because the request's session is released before the body is sent.
+    yield_per keeps at most STREAM_CHUNK_SIZE rows alive, so memory stays flat whatever the history length.
+    """
+    _, formatter = STATEMENT_FORMATS[fmt]
+    stmt = account_postings(account_id, start, end, newest_first=False).execution_options(yield_per=STREAM_CHUNK_SIZE)
+    async with AsyncSession(bind) as db:
+        result = await db.stream(stmt)
+        header = True
+        async for rows in result.partitions():
+            yield formatter(rows, header)
+            header = False
+        if header:
+            yield formatter([], header)
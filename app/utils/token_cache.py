@@ -0,0 +1,139 @@
+"""
+Caches verified access tokens so authenticated requests skip jwt.decode and the user lookup.
+Entries live until the token's exp (bounded LRU in-process), are dropped when the user row
+changes, and can optionally be shared between workers through Redis (TOKEN_CACHE_URL).
+"""
+
+# Imports
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy import event
+from app.models import User
+from app.settings import get_settings
+
+# Cache settings
+TOKEN_CACHE_SIZE = get_settings().token_cache_size
+TOKEN_CACHE_URL = get_settings().token_cache_url  # e.g. redis://localhost:6379/0
+# With a shared backend, local entries are kept briefly so invalidations reach every worker quickly
+TOKEN_CACHE_LOCAL_TTL = get_settings().token_cache_local_ttl
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """
+    The parts of the authenticated user that routes need; no session attached.
+    """
+    id: int
+    email: str
+
+# -------------------------
+# Helpers
+# -------------------------
+def token_key(token: str) -> str:
+    """
+    Hash of the whole token: keying on the signature alone would let a forged
+    payload that reuses a cached signature skip verification.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+# -------------------------
+# Backends
+# -------------------------
+class RedisTokenStore:
+    """
+    Shared store for multi-worker deployments. Requires the optional redis package.
+    """
+    prefix = "token-cache"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("TOKEN_CACHE_URL is set but the 'redis' package is not installed") from e
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> UserSnapshot | None:
+        value = self.client.get(f"{self.prefix}:{key}")
+        if value is None:
+            return None
+        user_id, email = value.decode().split("|", 1)
+        return UserSnapshot(id=int(user_id), email=email)
+
+    def put(self, key: str, user: UserSnapshot, ttl: float):
+        user_key = f"{self.prefix}:user:{user.id}"
+        pipe = self.client.pipeline()
+        pipe.set(f"{self.prefix}:{key}", f"{user.id}|{user.email}", ex=max(int(ttl), 1))
+        pipe.sadd(user_key, key)
+        pipe.expire(user_key, max(int(ttl), 1))
+        pipe.execute()
+
+    def invalidate_user(self, user_id: int):
+        user_key = f"{self.prefix}:user:{user_id}"
+        keys = [f"{self.prefix}:{k.decode()}" for k in self.client.smembers(user_key)]
+        self.client.delete(user_key, *keys)
+
+class TokenCache:
+    """
+    Bounded LRU of token hash -> (expires_at, UserSnapshot), optionally backed by a shared store.
+    """
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE, shared=None):
+        self.max_size = max_size
+        self.shared = shared
+        self.entries: OrderedDict[str, tuple[float, UserSnapshot]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, token: str) -> UserSnapshot | None:
+        key = token_key(token)
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self.entries.move_to_end(key)
+                    return entry[1]
+                del self.entries[key]
+        if self.shared is not None:
+            user = self.shared.get(key)
+            if user is not None:
+                self._store(key, user, now + TOKEN_CACHE_LOCAL_TTL)
+            return user
+        return None
+
+    def put(self, token: str, user: UserSnapshot, expires_at: float):
+        key = token_key(token)
+        ttl = expires_at - time.time()
+        if ttl <= 0:
+            return
+        if self.shared is not None:
+            self.shared.put(key, user, ttl)
+            expires_at = min(expires_at, time.time() + TOKEN_CACHE_LOCAL_TTL)
+        self._store(key, user, expires_at)
+
+    def _store(self, key: str, user: UserSnapshot, expires_at: float):
+        with self.lock:
+            self.entries[key] = (expires_at, user)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int):
+        with self.lock:
+            stale = [k for k, (_, user) in self.entries.items() if user.id == user_id]
+            for k in stale:
+                del self.entries[k]
+        if self.shared is not None:
+            self.shared.invalidate_user(user_id)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+token_cache = TokenCache(shared=RedisTokenStore(TOKEN_CACHE_URL) if TOKEN_CACHE_URL else None)
+
+# Any change to a user row (email, password, deletion) drops that user's cached tokens
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_cached_user(mapper, connection, target):
+    token_cache.invalidate_user(target.id)
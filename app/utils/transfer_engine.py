@@ -0,0 +1,217 @@
+"""
+Moves money into, out of, and between accounts without lost updates or lock-order deadlocks.
+Accounts are always touched in ascending id order, balances are changed with
+guarded UPDATE statements, and serialization failures are retried with backoff.
+Under the SQLite production profile, async callers are group-committed by the writer thread.
+"""
+
+# Imports
+import asyncio
+import random
+import time
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import Account
+from app.settings import get_settings
+from app.utils.etags import bump_versions
+from app.utils.ledger import post_entry
+from app.utils.outbox import record_event
+from app.utils.sqlite_writer import get_sqlite_writer
+
+# Retry settings
+TRANSFER_MAX_RETRIES = get_settings().transfer_max_retries
+TRANSFER_RETRY_BASE_DELAY = get_settings().transfer_retry_base_delay
+
+# Postgres SQLSTATEs for serialization failure and deadlock
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
+# -------------------------
+# Helpers
+# -------------------------
+def is_retryable(exc: Exception) -> bool:
+    """
+    True for errors that a fresh attempt can resolve (lock contention, deadlock victim).
+    """
+    if isinstance(exc, OperationalError) and "database is locked" in str(exc.orig):
+        return True
+    if isinstance(exc, DBAPIError):
+        sqlstate = getattr(exc.orig, "sqlstate", None) or getattr(exc.orig, "pgcode", None)
+        return sqlstate in RETRYABLE_SQLSTATES
+    return False
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter so retrying writers spread out.
+    """
+    return random.uniform(0, TRANSFER_RETRY_BASE_DELAY * (2 ** attempt))
+
+def validate_transfer(from_account_id: int, to_account_id: int, amount: Decimal):
+    if amount <= 0:
+        raise HTTPException(status_code=400, detail="Transfer amount must be positive")
+    if from_account_id == to_account_id:
+        raise HTTPException(status_code=400, detail="Cannot transfer to the same account")
+
+def diagnose_failure(db: Session, user_id: int, from_account_id: int, to_account_id: int) -> HTTPException:
+    """
+    Explains why a guarded UPDATE matched no row, in the order the API reports errors.
+    """
+    source = db.scalar(select(Account.id).where(Account.id == from_account_id, Account.user_id == user_id))
+    if source is None:
+        return HTTPException(status_code=404, detail="Source account not found")
+    destination = db.scalar(select(Account.id).where(Account.id == to_account_id))
+    if destination is None:
+        return HTTPException(status_code=404, detail="Destination account not found")
+    return HTTPException(status_code=400, detail="Insufficient balance")
+
+# -------------------------
+# Engine
+# -------------------------
+def apply_transfer(
+    db: Session,
+    user_id: int,
+    from_account_id: int,
+    to_account_id: int,
+    amount: Decimal,
+    description: str | None = None
+) -> Decimal:
+    """
+    Runs one transfer attempt inside the caller's transaction and returns the new source balance.
+    Does not commit; raises HTTPException when the transfer is rejected (the runner rolls back).
+    """
+    ordered_ids = sorted((from_account_id, to_account_id))
+
+    # Databases with row locks: take both locks up front, lowest id first
+    if db.get_bind().dialect.name != "sqlite":
+        db.execute(select(Account.id).where(Account.id.in_(ordered_ids)).order_by(Account.id).with_for_update())
+
+    legs, owners = [], set()
+    for account_id in ordered_ids:
+        if account_id == from_account_id:
+            stmt = (
+                update(Account)
+                .where(Account.id == from_account_id, Account.user_id == user_id, Account.balance >= amount)
+                .values(balance=Account.balance - amount, posting_seq=Account.posting_seq + 1)
+                .returning(Account.balance, Account.posting_seq, Account.user_id)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            stmt = (
+                update(Account)
+                .where(Account.id == to_account_id)
+                .values(balance=Account.balance + amount, posting_seq=Account.posting_seq + 1)
+                .returning(Account.balance, Account.posting_seq, Account.user_id)
+                .execution_options(synchronize_session=False)
+            )
+        row = db.execute(stmt).first()
+        if row is None:
+            raise diagnose_failure(db, user_id, from_account_id, to_account_id)
+        balance, seq, owner_id = row
+        owners.add(owner_id)
+        legs.append((account_id, seq, -amount if account_id == from_account_id else amount, balance))
+
+    # One journal entry, a debit posting and a credit posting
+    journal_id = post_entry(
+        db, legs, transaction_type="transfer", from_account_id=from_account_id,
+        to_account_id=to_account_id, amount=amount, description=description
+    )
+    record_event(
+        db, "transfer", journal_id=journal_id, user_id=user_id, from_account_id=from_account_id,
+        to_account_id=to_account_id, amount=amount, description=description
+    )
+    # The destination may belong to someone else, whose account list changed too
+    db.execute(bump_versions(owners))
+    return next(balance for account_id, _, _, balance in legs if account_id == from_account_id)
+
+def apply_balance_change(db: Session, user_id: int, account_id: int, delta: Decimal, transaction_type: str) -> Decimal:
+    """
+    Deposits (delta > 0) or withdraws (delta < 0) with one guarded UPDATE ... RETURNING
+    and records the journal entry, its posting and the outbox event in the same transaction.
+    Does not commit.
+    """
+    stmt = update(Account).where(Account.id == account_id, Account.user_id == user_id)
+    if delta < 0:
+        stmt = stmt.where(Account.balance >= -delta)
+    stmt = (
+        stmt.values(balance=Account.balance + delta, posting_seq=Account.posting_seq + 1)
+        .returning(Account.balance, Account.posting_seq)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(stmt).first()
+    if row is None:
+        exists = db.scalar(select(Account.id).where(Account.id == account_id, Account.user_id == user_id))
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Account not found")
+        raise HTTPException(status_code=400, detail="Insufficient funds")
+
+    balance, seq = row
+    journal_id = post_entry(
+        db, [(account_id, seq, delta, balance)], transaction_type=transaction_type,
+        from_account_id=account_id if delta < 0 else None,
+        to_account_id=account_id if delta > 0 else None,
+        amount=abs(delta)
+    )
+    record_event(db, transaction_type, journal_id=journal_id, user_id=user_id, account_id=account_id, amount=abs(delta))
+    db.execute(bump_versions([user_id]))
+    return balance
+
+def run_in_transaction(db: Session, fn, *args):
+    """
+    Runs fn(db, *args) and commits, retrying serialization failures.
+    Any failure (including a rejected HTTPException) rolls the transaction back.
+    """
+    for attempt in range(TRANSFER_MAX_RETRIES + 1):
+        try:
+            result = fn(db, *args)
+            db.commit()
+            return result
+        except (OperationalError, DBAPIError) as exc:
+            db.rollback()
+            if not is_retryable(exc) or attempt == TRANSFER_MAX_RETRIES:
+                raise
+            time.sleep(backoff_delay(attempt))
+        except Exception:
+            db.rollback()
+            raise
+
+async def run_in_transaction_async(db: AsyncSession, fn, *args):
+    """
+    Async counterpart of run_in_transaction; fn still receives a sync Session
+    and backoff does not block the event loop. With the SQLite writer enabled,
+    fn runs on the writer thread's session instead of db.
+    """
+    sqlite_writer = get_sqlite_writer()
+    for attempt in range(TRANSFER_MAX_RETRIES + 1):
+        try:
+            if sqlite_writer is not None:
+                return await sqlite_writer.run(fn, *args)
+            result = await db.run_sync(fn, *args)
+            await db.commit()
+            return result
+        except (OperationalError, DBAPIError) as exc:
+            if sqlite_writer is None:
+                await db.rollback()
+            if not is_retryable(exc) or attempt == TRANSFER_MAX_RETRIES:
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+        except Exception:
+            if sqlite_writer is None:
+                await db.rollback()
+            raise
+
+def transfer_funds(
+    db: Session,
+    user_id: int,
+    from_account_id: int,
+    to_account_id: int,
+    amount: Decimal,
+    description: str | None = None
+) -> Decimal:
+    """
+    Commits a transfer from a sync session.
+    """
+    validate_transfer(from_account_id, to_account_id, amount)
+    return run_in_transaction(db, apply_transfer, user_id, from_account_id, to_account_id, amount, description)
\ No newline at end of file
@@ -0,0 +1,287 @@
+"""
+Reproducible load benchmark for the API: seeds a dataset, drives login, accounts,
+deposit/withdraw, transfer and cards with a weighted mix at a fixed concurrency,
+and reports p50/p95/p99 latency and throughput per scenario.
+Runs in-process (ASGI transport, no network) or against a real HTTP server,
+saves JSON results, and exits 1 when a run regresses past a baseline.
+    python -m benchmarks.run --users 1000 --concurrency 32 --requests 5000 --save-baseline benchmarks/baselines/local.json
+    python -m benchmarks.run --users 1000 --concurrency 32 --requests 5000 --baseline benchmarks/baselines/local.json
+    python -m benchmarks.run --serve --workers 4 --baseline benchmarks/baselines/http.json
+"""
+
+# Imports
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+import httpx
+import numpy as np
+
+DEFAULT_MIX = "login=1,accounts=4,deposit=2,withdraw=1,transfer=2,cards=2"
+SERVER_START_TIMEOUT = 30
+
+@dataclass
+class BenchUser:
+    email: str
+    headers: dict = field(default_factory=dict)
+    account_ids: list = field(default_factory=list)
+
+# -------------------------
+# Scenarios
+# -------------------------
+async def login(client: httpx.AsyncClient, user: BenchUser, rng: random.Random, users: list):
+    return await client.post("/auth/login", json={"email": user.email, "password": "password"})
+
+async def list_accounts(client, user, rng, users):
+    return await client.get("/accounts/", headers=user.headers)
+
+async def deposit(client, user, rng, users):
+    return await client.post(f"/accounts/{user.account_ids[0]}/deposit", params={"amount": "1.00"}, headers=user.headers)
+
+async def withdraw(client, user, rng, users):
+    return await client.post(f"/accounts/{user.account_ids[0]}/withdraw", params={"amount": "1.00"}, headers=user.headers)
+
+async def transfer(client, user, rng, users):
+    target = rng.choice(users).account_ids[-1]
+    if target == user.account_ids[0]:
+        target = user.account_ids[-1] if len(user.account_ids) > 1 else rng.choice(users).account_ids[0]
+    return await client.post("/accounts/transfer", headers=user.headers, json={
+        "from_account_id": user.account_ids[0], "to_account_id": target, "amount": 1.00
+    })
+
+async def list_cards(client, user, rng, users):
+    return await client.get("/cards/", headers=user.headers)
+
+SCENARIOS = {
+    "login": login,
+    "accounts": list_accounts,
+    "deposit": deposit,
+    "withdraw": withdraw,
+    "transfer": transfer,
+    "cards": list_cards,
+}
+
+# -------------------------
+# Helpers
+# -------------------------
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name.strip()}' (choose from {', '.join(SCENARIOS)})")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+def summarize(samples: dict[str, list[tuple[float, int]]], elapsed: float) -> dict:
+    """
+    Per-scenario and overall count, throughput, status breakdown and latency percentiles (ms).
+    5xx responses and transport failures (status 0) count as errors; 4xx as rejected.
+    """
+    def stats(rows):
+        latencies = np.array([latency for latency, _ in rows]) * 1000
+        statuses = [status for _, status in rows]
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if rows else (0.0, 0.0, 0.0)
+        return {
+            "count": len(rows),
+            "rps": round(len(rows) / elapsed, 2) if elapsed else 0.0,
+            "errors": sum(1 for s in statuses if s == 0 or s >= 500),
+            "rejected": sum(1 for s in statuses if 400 <= s < 500),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+        }
+    scenarios = {name: stats(rows) for name, rows in sorted(samples.items())}
+    return {"elapsed_s": round(elapsed, 3), "total": stats([r for rows in samples.values() for r in rows]), "scenarios": scenarios}
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Regressions: p95/p99 slower, or throughput lower, than the baseline by more than threshold (a fraction).
+    """
+    regressions = []
+    pairs = [("total", current["total"], baseline["total"])] + [
+        (name, stats, baseline["scenarios"][name])
+        for name, stats in current["scenarios"].items() if name in baseline.get("scenarios", {})
+    ]
+    for name, now, before in pairs:
+        for metric in ("p95_ms", "p99_ms"):
+            if before[metric] and now[metric] > before[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {before[metric]} -> {now[metric]}")
+        if before["rps"] and now["rps"] < before["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {before['rps']} -> {now['rps']}")
+        if now["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {now['errors']}")
+    return regressions
+
+def print_report(result: dict):
+    print(f"{'scenario':>10} {'count':>8} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'4xx':>6} {'err':>5}")
+    for name, s in list(result["scenarios"].items()) + [("TOTAL", result["total"])]:
+        print(f"{name:>10} {s['count']:>8} {s['rps']:>9} {s['p50_ms']:>9} {s['p95_ms']:>9} {s['p99_ms']:>9} {s['rejected']:>6} {s['errors']:>5}")
+
+# -------------------------
+# Load generator
+# -------------------------
+async def prepare_users(client: httpx.AsyncClient, count: int, total_users: int, concurrency: int, rng: random.Random) -> list[BenchUser]:
+    """
+    Logs in a sample of seeded users and loads their account ids (not measured).
+    """
+    emails = [f"user{i}@example.com" for i in rng.sample(range(1, total_users + 1), min(count, total_users))]
+    gate = asyncio.Semaphore(concurrency)
+
+    async def prepare(email):
+        async with gate:
+            token = (await client.post("/auth/login", json={"email": email, "password": "password"})).json()["access_token"]
+            user = BenchUser(email=email, headers={"Authorization": f"Bearer {token}"})
+            user.account_ids = [a["id"] for a in (await client.get("/accounts/", headers=user.headers)).json()]
+            return user
+
+    users = await asyncio.gather(*(prepare(e) for e in emails))
+    return [u for u in users if u.account_ids]
+
+async def drive(client: httpx.AsyncClient, users: list[BenchUser], mix: dict, concurrency: int,
+                requests: int, duration: float | None, seed: int) -> tuple[dict, float]:
+    names, weights = list(mix), list(mix.values())
+    samples = {name: [] for name in names}
+    issued = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    async def worker(index):
+        nonlocal issued
+        rng = random.Random(seed * 1000 + index)
+        while (deadline is None and issued < requests) or (deadline is not None and time.perf_counter() < deadline):
+            issued += 1
+            name = rng.choices(names, weights)[0]
+            user = rng.choice(users)
+            began = time.perf_counter()
+            try:
+                status = (await SCENARIOS[name](client, user, rng, users)).status_code
+            except httpx.HTTPError:
+                status = 0
+            samples[name].append((time.perf_counter() - began, status))
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return samples, time.perf_counter() - start
+
+async def run_benchmark(args, base_url: str | None) -> dict:
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    lifespan = AsyncExitStack()
+    if base_url is None:
+        from app.main import app
+        # Same startup/shutdown as under uvicorn; shutdown releases pooled aiosqlite
+        # threads and hashing workers so the process can exit
+        await lifespan.enter_async_context(app.router.lifespan_context(app))
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+    else:
+        client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+    try:
+        users = await prepare_users(client, args.sample_users, int(args.users), args.concurrency, rng)
+        if args.warmup:
+            await drive(client, users, mix, args.concurrency, args.warmup, None, args.seed + 1)
+        samples, elapsed = await drive(client, users, mix, args.concurrency, args.requests, args.duration, args.seed)
+    finally:
+        await client.aclose()
+        await lifespan.aclose()
+    return summarize(samples, elapsed)
+
+# -------------------------
+# Server management
+# -------------------------
+def start_server(port: int, workers: int, env: dict) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Server did not start in time")
+
+# -------------------------
+# CLI
+# -------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Seed a dataset and benchmark the API.")
+    parser.add_argument("--database", default="sqlite:///./bench.db", help="Benchmark database (dropped and reseeded)")
+    parser.add_argument("--no-seed", action="store_true", help="Reuse the existing benchmark database")
+    parser.add_argument("--users", type=float, default=1000)
+    parser.add_argument("--accounts-per-user", type=int, default=2)
+    parser.add_argument("--tx-per-account", type=int, default=20)
+    parser.add_argument("--sample-users", type=int, default=100, help="Users logged in and driven by the benchmark")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. accounts=4,transfer=1")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="Measure for this many seconds instead")
+    parser.add_argument("--warmup", type=int, default=200, help="Unmeasured requests before the run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--target", default=None, help="Base URL of a running server (default: in-process ASGI)")
+    parser.add_argument("--serve", action="store_true", help="Start uvicorn on --port and benchmark it over HTTP")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --serve")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--baseline", default=None, help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", default=None, help="Write results JSON as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed regression as a fraction")
+    args = parser.parse_args(argv)
+
+    if args.database.rstrip("/").endswith("bank.db") and not args.database.endswith("bench.db"):
+        parser.error("refusing to reseed the application database; point --database at a benchmark copy")
+
+    # The app loads its settings once, on first use, so set them before anything imports app.*
+    os.environ["DATABASE_URL"] = args.database
+    # One client IP drives every simulated user; measure the API, not admission control
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    if not args.no_seed:
+        from app.database.seed_database import seed_database
+        counts = seed_database(users=int(args.users), accounts_per_user=args.accounts_per_user,
+                               tx_per_account=args.tx_per_account)
+        print(f"Seeded {sum(v for k, v in counts.items() if k != 'seconds'):,} rows in {counts['seconds']:.1f}s")
+
+    server = start_server(args.port, args.workers, dict(os.environ)) if args.serve else None
+    base_url = f"http://127.0.0.1:{args.port}" if server else args.target
+    try:
+        result = asyncio.run(run_benchmark(args, base_url))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    result["meta"] = {
+        "target": base_url or "asgi",
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        "users": int(args.users),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    print_report(result)
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(result, indent=2))
+
+    if args.baseline:
+        regressions = compare(result, json.loads(Path(args.baseline).read_text()), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
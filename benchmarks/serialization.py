@@ -0,0 +1,127 @@
+"""
+Microbenchmark for list response serialization: the cost per item of turning 10k account,
+card and statement rows into a JSON body, through FastAPI's response_model path
+(validate, serialize, jsonable_encoder, json.dumps) and through the RowSerializer + orjson
+path the list routes use. Rows are real: ORM objects and Core rows read from an in-memory
+SQLite database, and the constructed CardOut models cards_to_schema returns.
+    python -m benchmarks.serialization --rows 10000 --repeat 5
+"""
+
+# Imports
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from app.models import Base, User, Account, Card, JournalEntry, Posting
+from app.routes.cards import cards_to_schema
+from app.schemas import AccountOut, CardOut, TransactionOut
+from app.utils.serializers import account_serializer, card_serializer, transaction_serializer
+from app.utils.statements import account_postings
+
+# -------------------------
+# Data
+# -------------------------
+def load_rows(rows: int) -> dict:
+    """
+    Seeds an in-memory database and reads rows back the way the routes do.
+    Returns {name: (schema, serializer, rows)}.
+    """
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    start = datetime(2025, 1, 1, 9, 30, 15, 250000)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"id": 1, "name": "Bench", "email": "bench@example.com", "hashed_password": "x"}])
+        conn.execute(Account.__table__.insert(), [
+            {"id": i, "user_id": 1, "account_type": "checking", "balance": Decimal("1234.56"), "created_at": start}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(Card.__table__.insert(), [
+            {"id": i, "account_id": i, "user_id": 1, "card_number": f"enc-{i}", "expiry_date": "enc", "cvv": "enc",
+             "card_last4": f"{i % 10000:04d}", "expiry_display": "11/29", "is_active": i % 3 != 0}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(JournalEntry.__table__.insert(), [
+            {"id": i, "transaction_type": "deposit", "to_account_id": 1, "amount": Decimal("12.34"),
+             "description": None if i % 2 else "Payroll", "timestamp": start + timedelta(minutes=i)}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(Posting.__table__.insert(), [
+            {"account_id": 1, "seq": i, "journal_id": i, "amount": Decimal("12.34"),
+             "balance": Decimal("12.34") * i, "timestamp": start + timedelta(minutes=i)}
+            for i in range(1, rows + 1)
+        ])
+
+    with Session(engine) as db:
+        accounts = db.scalars(select(Account).order_by(Account.id)).all()
+        cards = cards_to_schema(db.scalars(select(Card).order_by(Card.id)).all())
+        postings = db.execute(account_postings(1, limit=rows)).all()
+    engine.dispose()
+    return {
+        "accounts": (AccountOut, account_serializer, accounts),
+        "cards": (CardOut, card_serializer, cards),
+        "transactions": (TransactionOut, transaction_serializer, postings),
+    }
+
+# -------------------------
+# Paths
+# -------------------------
+def response_model_body(schema, rows) -> bytes:
+    """
+    What FastAPI does with rows returned from a route declaring response_model=list[schema].
+    """
+    field = create_model_field(name="Response", type_=list[schema], mode="serialization")
+    content = asyncio.run(serialize_response(field=field, response_content=rows))
+    return JSONResponse(content).body
+
+def fast_body(serializer, rows) -> bytes:
+    return serializer.dumps(rows)
+
+def best_time(fn, *args, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def measure_serialization(rows: int = 10000, repeat: int = 5) -> dict:
+    """
+    Per-item microseconds for both paths per schema; also checks that both produce the same JSON.
+    """
+    results = {}
+    for name, (schema, serializer, data) in load_rows(rows).items():
+        if json.loads(response_model_body(schema, data)) != json.loads(fast_body(serializer, data)):
+            raise AssertionError(f"{name}: fast path output differs from the response_model path")
+        slow = best_time(response_model_body, schema, data, repeat=repeat)
+        fast = best_time(fast_body, serializer, data, repeat=repeat)
+        results[name] = {
+            "rows": len(data),
+            "response_model_us": round(slow / len(data) * 1e6, 3),
+            "fast_us": round(fast / len(data) * 1e6, 3),
+            "speedup": round(slow / fast, 1),
+        }
+    return results
+
+# -------------------------
+# CLI
+# -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-item cost of list response serialization.")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5, help="Best of this many runs")
+    args = parser.parse_args(argv)
+
+    results = measure_serialization(args.rows, args.repeat)
+    print(f"{'list':>13} {'rows':>7} {'response_model us/item':>23} {'fast us/item':>13} {'speedup':>8}")
+    for name, r in results.items():
+        print(f"{name:>13} {r['rows']:>7} {r['response_model_us']:>23} {r['fast_us']:>13} {r['speedup']:>7}x")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Shared fixtures: test secrets, and a throwaway SQLite database wired into the app's async session dependencies.
+"""
+
+# Imports
+import dataclasses
+from typing import NamedTuple
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app.main import app
+from app.models import Base, User
+from app.database.create_database import get_async_db
+from app.database.read_routing import get_async_read_db
+from app.routes.auth_helpers import get_current_user
+from app.settings import get_settings
+from app.utils import metrics
+from app.utils.etags import response_cache
+from app.utils.token_cache import UserSnapshot
+
+# One card key per run: get_fernet keeps the first key it is built with
+TEST_CARD_ENCRYPTION_KEY = Fernet.generate_key().decode()
+
+class AppDatabase(NamedTuple):
+    engine: Engine
+    async_engine: AsyncEngine
+    sessions: async_sessionmaker
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture(autouse=True)
+def test_secrets(monkeypatch):
+    """
+    Every test signs tokens with a known key and has a card key, so the suite needs neither
+    JWT_SECRET_KEY nor CARD_ENCRYPTION_KEY in the environment.
+    """
+    settings = get_settings()
+    monkeypatch.setattr(get_settings, "value", dataclasses.replace(
+        settings, jwt_secret_key="test-secret",
+        card_encryption_key=settings.card_encryption_key or TEST_CARD_ENCRYPTION_KEY
+    ))
+
+@pytest.fixture
+def app_database(tmp_path, monkeypatch):
+    """
+    app_database(rows) creates the schema in a fresh file, inserts rows (ORM objects) and
+    points the app's primary and read sessions at it, authenticated as the first seeded user
+    if there is one. Routes that exceed their query budget fail the request, and the response
+    cache starts empty since every database numbers its data versions from scratch.
+    """
+    engines = []
+
+    def build(rows: list) -> AppDatabase:
+        path = tmp_path / f"app-{len(engines)}.db"
+        engine = create_engine(f"sqlite:///{path}")
+        engines.append(engine)
+        Base.metadata.create_all(bind=engine)
+        users = [UserSnapshot(id=row.id, email=row.email) for row in rows if isinstance(row, User)]
+        with Session(engine) as db:
+            db.add_all(rows)
+            db.commit()
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+        sessions = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        metrics.instrument_engine(async_engine, "test")
+        response_cache.clear()
+        monkeypatch.setattr(metrics, "QUERY_BUDGET_MODE", "raise")
+
+        async def override_get_db():
+            async with sessions() as db:
+                yield db
+
+        monkeypatch.setitem(app.dependency_overrides, get_async_db, override_get_db)
+        monkeypatch.setitem(app.dependency_overrides, get_async_read_db, override_get_db)
+        if users:
+            monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: users[0])
+        return AppDatabase(engine, async_engine, sessions)
+
+    yield build
+    response_cache.clear()
+    for engine in engines:
+        engine.dispose()
\ No newline at end of file
@@ -3,44 +3,28 @@ Unit and integration testing for account information.
 """
 
 # Imports
+import json
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
 from app.main import app
-from app.models import Base, User
-from app.database.create_database import get_db
-from app.routes.auth_helpers import get_current_user
-
-# Use a file-based DB for tests (or a shared in-memory connection)
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test_bank.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base.metadata.create_all(bind=engine)
-
-# Override dependencies
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def override_get_current_user():
-    db = TestingSessionLocal()
-    user = db.query(User).filter(User.id == 1).first()
-    if not user:
-        user = User(id=1, name="Test User", email="test@example.com", hashed_password="fakehashed")
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-    return user
-
-app.dependency_overrides[get_db] = override_get_db
-app.dependency_overrides[get_current_user] = override_get_current_user
+from app.models import User, Account, Card, JournalEntry, Posting
+from app.utils import metrics
 
 client = TestClient(app)
 
+# -----------------------
+# Fixtures
+# -----------------------
+@pytest.fixture(autouse=True)
+def database(app_database):
+    engine, _, _ = app_database([
+        User(id=1, name="Test User", email="test@example.com", hashed_password="fakehashed"),
+        Account(id=1, user_id=1, account_type="checking", balance=0),
+    ])
+    return engine
+
 # -----------------------
 # Tests
 # -----------------------
@@ -105,4 +89,105 @@ def test_transfer():
     transfer_resp = client.post("/accounts/transfer", json=transfer_payload)
     assert transfer_resp.status_code == 200
     data = transfer_resp.json()
-    assert data["new_balance"] == 350  # 500 - 150
\ No newline at end of file
+    assert data["new_balance"] == 350  # 500 - 150
+
+def test_withdraw_insufficient_funds():
+    resp = client.post("/accounts/", json={"account_type": "checking", "initial_balance": 100})
+    account_id = resp.json()["id"]
+    withdraw_resp = client.post(f"/accounts/{account_id}/withdraw", params={"amount": 150})
+    assert withdraw_resp.status_code == 400
+    deposit_resp = client.post(f"/accounts/{account_id}/deposit", params={"amount": -50})
+    assert deposit_resp.status_code == 400
+
+
+def test_deposit_withdraw_write_ledger(database):
+    resp = client.post("/accounts/", json={"account_type": "checking", "initial_balance": 0})
+    account_id = resp.json()["id"]
+    client.post(f"/accounts/{account_id}/deposit", params={"amount": 80})
+    client.post(f"/accounts/{account_id}/withdraw", params={"amount": 30})
+    db = Session(database)
+    rows = db.query(JournalEntry.transaction_type, Posting.seq, Posting.amount, Posting.balance).join(
+        JournalEntry, JournalEntry.id == Posting.journal_id
+    ).filter(Posting.account_id == account_id).order_by(Posting.seq).all()
+    db.close()
+    assert [tuple(r) for r in rows] == [("deposit", 1, 80, 80), ("withdrawal", 2, -30, 50)]
+
+
+def test_transaction_history_pages():
+    resp = client.post("/accounts/", json={"account_type": "checking", "initial_balance": 0})
+    account_id = resp.json()["id"]
+    for amount in range(1, 6):
+        client.post(f"/accounts/{account_id}/deposit", params={"amount": amount})
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get(f"/accounts/{account_id}/transactions", params=params).json()
+        seen.extend(item["amount"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [5, 4, 3, 2, 1]
+
+    future = client.get(f"/accounts/{account_id}/transactions", params={"start": "2999-01-01T00:00:00"})
+    assert future.json() == {"items": [], "next_cursor": None}
+    assert client.get("/accounts/999999/transactions").status_code == 404
+
+
+def test_statement_export():
+    resp = client.post("/accounts/", json={"account_type": "checking", "initial_balance": 10})
+    account_id = resp.json()["id"]
+    client.post(f"/accounts/{account_id}/withdraw", params={"amount": 2.5})
+
+    csv_resp = client.get(f"/accounts/{account_id}/statement.csv")
+    assert csv_resp.status_code == 200
+    assert csv_resp.headers["content-type"].startswith("text/csv")
+    lines = csv_resp.text.strip().splitlines()
+    assert lines[0].startswith("id,timestamp,transaction_type,amount")
+    assert [line.split(",")[3] for line in lines[1:]] == ["10.00", "-2.50"]
+
+    ndjson_resp = client.get(f"/accounts/{account_id}/statement.ndjson")
+    rows = [json.loads(line) for line in ndjson_resp.text.splitlines()]
+    assert [(r["amount"], r["balance"]) for r in rows] == [("10.00", "10.00"), ("-2.50", "7.50")]
+    assert client.get(f"/accounts/{account_id}/statement.xml").status_code == 404
+
+
+def test_relationships_do_not_lazy_load(database):
+    db = Session(database)
+    account = db.query(Account).first()
+    with pytest.raises(InvalidRequestError):
+        account.cards
+    db.close()
+
+
+def test_account_overview_fixed_query_count(database):
+    client.post("/accounts/1/deposit", params={"amount": 5})
+
+    def overview_queries():
+        before = metrics.http_db_queries.series.get(("/accounts/overview",), 0)
+        response = client.get("/accounts/overview")
+        assert response.status_code == 200
+        return response.json(), metrics.http_db_queries.series[("/accounts/overview",)] - before
+
+    _, baseline_queries = overview_queries()
+
+    # Many more accounts, each with a card
+    db = Session(database)
+    for i in range(8):
+        account = Account(user_id=1, account_type="savings", balance=10)
+        db.add(account)
+        db.flush()
+        db.add(Card(
+            account_id=account.id, user_id=1, card_number=f"enc-overview-{account.id}", expiry_date="enc",
+            cvv="enc", card_last4=f"{i:04d}", expiry_display="12/30", card_fingerprint=f"overview-{account.id}"
+        ))
+    db.commit()
+    db.close()
+
+    data, queries = overview_queries()
+    assert queries == baseline_queries <= 3
+    assert len(data["accounts"]) >= 8
+    assert data["total_balance"] == pytest.approx(sum(a["balance"] for a in data["accounts"]))
+    with_cards = [a for a in data["accounts"] if a["cards"]]
+    assert with_cards[-1]["cards"][0]["card_number"].endswith("0007")
+    assert any(a["last_activity"] for a in data["accounts"])
\ No newline at end of file
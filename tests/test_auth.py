@@ -0,0 +1,60 @@
+"""
+Unit and integration testing for signup, login, and password hashing.
+"""
+
+# Imports
+import asyncio
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models import User
+from app.utils.password_hashing import HashingPool, hash_in_worker, PASSWORD_HASH_ROUNDS
+
+client = TestClient(app)
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture(autouse=True)
+def database(app_database):
+    engine, _, _ = app_database([])
+    return engine
+
+# ------------------
+# Tests
+# ------------------
+def test_signup_and_login():
+    payload = {"name": "Carol", "email": "carol@example.com", "password": "carolpassword"}
+    response = client.post("/auth/signup", json=payload)
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+    assert client.post("/auth/signup", json=payload).status_code == 400
+
+    login = client.post("/auth/login", json={"email": "carol@example.com", "password": "carolpassword"})
+    assert login.status_code == 200
+    wrong = client.post("/auth/login", json={"email": "carol@example.com", "password": "nope"})
+    assert wrong.status_code == 401
+
+def test_login_upgrades_outdated_hash(database):
+    old_context = CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__default_rounds=1000)
+    db = Session(database)
+    db.add(User(name="Dave", email="dave@example.com", hashed_password=old_context.hash("davepassword")))
+    db.commit()
+
+    response = client.post("/auth/login", json={"email": "dave@example.com", "password": "davepassword"})
+    assert response.status_code == 200
+    db.expire_all()
+    upgraded = db.query(User).filter(User.email == "dave@example.com").first().hashed_password
+    db.close()
+    assert f"${PASSWORD_HASH_ROUNDS}$" in upgraded
+
+def test_saturated_pool_sheds_load():
+    pool = HashingPool(workers=1, max_queue=0)
+    pool.in_flight = 1
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(pool.run(hash_in_worker, "secret"))
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"]
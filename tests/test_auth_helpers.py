@@ -0,0 +1,113 @@
+"""
+Unit testing for token verification and the token cache.
+"""
+
+# Imports
+import asyncio
+import dataclasses
+import time
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.models import Base, User
+from app.routes.auth import create_access_token
+from app.routes.auth_helpers import get_current_user, get_secret_key, ALGORITHM
+from app.settings import get_settings
+from app.utils.token_cache import TokenCache, UserSnapshot, token_cache
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture
+def databases(tmp_path):
+    url = tmp_path / "auth.db"
+    engine = create_engine(f"sqlite:///{url}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}", poolclass=NullPool)
+    yield sessionmaker(bind=engine), async_sessionmaker(async_engine, class_=AsyncSession)
+    engine.dispose()
+    token_cache.clear()
+
+def make_token(email, minutes=30):
+    expire = datetime.utcnow() + timedelta(minutes=minutes)
+    return jwt.encode({"sub": email, "exp": expire}, get_secret_key(), algorithm=ALGORITHM)
+
+def resolve(session_factory, token):
+    async def run():
+        async with session_factory() as db:
+            return await get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+    return asyncio.run(run())
+
+# ------------------
+# Tests
+# ------------------
+def test_cache_expiry_and_bound():
+    cache = TokenCache(max_size=2)
+    alice = UserSnapshot(id=1, email="alice@example.com")
+    cache.put("expired", alice, time.time() - 1)
+    assert cache.get("expired") is None
+    for token in ("a", "b", "c"):
+        cache.put(token, alice, time.time() + 60)
+    assert cache.get("a") is None
+    assert cache.get("c") == alice
+    cache.invalidate_user(1)
+    assert cache.get("c") is None
+
+def test_second_lookup_skips_database(databases):
+    sync_factory, async_factory = databases
+    db = sync_factory()
+    db.add(User(id=7, name="Cache User", email="cache@example.com", hashed_password="fakehashed"))
+    db.commit()
+
+    token = make_token("cache@example.com")
+    assert resolve(async_factory, token) == UserSnapshot(id=7, email="cache@example.com")
+
+    # Cached: resolves even with no database session
+    async def cached():
+        return await get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), None)
+    assert asyncio.run(cached()).id == 7
+
+    # Updating the user drops its cached tokens
+    db.get(User, 7).name = "Renamed"
+    db.commit()
+    db.close()
+    assert token_cache.get(token) is None
+
+def test_tampered_token_is_not_served_from_cache(databases):
+    sync_factory, async_factory = databases
+    db = sync_factory()
+    db.add(User(id=8, name="Victim", email="victim@example.com", hashed_password="fakehashed"))
+    db.commit()
+    db.close()
+
+    token = make_token("victim@example.com")
+    resolve(async_factory, token)
+    header, payload, signature = token.split(".")
+    forged = ".".join([header, payload + "x", signature])
+    with pytest.raises(HTTPException) as exc:
+        resolve(async_factory, forged)
+    assert exc.value.status_code == 401
+
+def test_missing_credentials_are_rejected(databases):
+    _, async_factory = databases
+    async def run():
+        async with async_factory() as db:
+            return await get_current_user(None, db)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run())
+    assert exc.value.status_code == 401
+
+def test_unset_secret_fails_on_first_use(databases, monkeypatch):
+    _, async_factory = databases
+    token = make_token("nobody@example.com")
+    monkeypatch.setattr(get_settings, "value", dataclasses.replace(get_settings(), jwt_secret_key=None))
+    with pytest.raises(RuntimeError, match="JWT_SECRET_KEY is not set"):
+        create_access_token({"sub": "nobody@example.com"})
+    with pytest.raises(RuntimeError, match="JWT_SECRET_KEY is not set"):
+        resolve(async_factory, token)
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Unit testing for the daily balance snapshots kept from the postings.
+"""
+
+# Imports
+import asyncio
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models import User, Account, JournalEntry, Posting
+from app.database.snapshot_balances import snapshot_balances
+from app.utils.balance_snapshots import closing_balances, refresh_daily_balances
+from app.utils.ledger import balance_at
+
+START = datetime(2025, 3, 1, 9, 30)
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture
+def database(app_database):
+    engine, _, sessions = app_database([
+        User(id=1, name="History User", email="history@example.com", hashed_password="fakehashed"),
+        User(id=2, name="Other User", email="other@example.com", hashed_password="fakehashed"),
+        Account(id=1, user_id=1, account_type="checking", balance=0),
+        Account(id=2, user_id=2, account_type="checking", balance=0),
+    ])
+    return engine, sessions
+
+
+def add_ledger(engine, rows):
+    """
+    rows: (timestamp, amount) for account 1, as transfers with account 2. Postings are
+    numbered in the order given, so a back-dated row still gets the next seq.
+    """
+    with Session(engine) as db:
+        last = {
+            account_id: db.execute(
+                select(Posting.seq, Posting.balance).where(Posting.account_id == account_id).order_by(Posting.seq.desc()).limit(1)
+            ).first() or (0, Decimal("0"))
+            for account_id in (1, 2)
+        }
+        for timestamp, amount in rows:
+            amount = Decimal(amount)
+            source, target = (2, 1) if amount > 0 else (1, 2)
+            entry = JournalEntry(transaction_type="transfer", from_account_id=source, to_account_id=target,
+                                 amount=abs(amount), timestamp=timestamp)
+            db.add(entry)
+            db.flush()
+            for account_id, signed in ((1, amount), (2, -amount)):
+                seq, balance = last[account_id]
+                last[account_id] = (seq + 1, balance + signed)
+                db.add(Posting(account_id=account_id, seq=seq + 1, journal_id=entry.id, amount=signed,
+                               balance=balance + signed, timestamp=timestamp))
+        db.commit()
+
+
+def snapshots(engine, account_id):
+    with Session(engine) as db:
+        return db.execute(closing_balances(account_id, date(2025, 1, 1), date(2026, 1, 1))).all()
+
+
+def closing_at(sessions, day):
+    async def query():
+        async with sessions() as db:
+            return await balance_at(db, 1, datetime.combine(day, time.max))
+    return asyncio.run(query())
+
+
+def history(days=30, seed=3):
+    rng = random.Random(seed)
+    rows = []
+    for day in range(days):
+        for _ in range(rng.randint(0, 3)):
+            rows.append((START + timedelta(days=day, minutes=rng.randint(0, 600)), f"{rng.randint(-50, 100)}.25"))
+    return rows
+
+# ------------------
+# Tests
+# ------------------
+
+def test_snapshots_hold_daily_closing_balances(database):
+    engine, _ = database
+    add_ledger(engine, [(START, "100.00"), (START + timedelta(hours=3), "-30.00"), (START + timedelta(days=2), "5.50")])
+    assert snapshot_balances(engine, batch_size=2, settle_seconds=0) == 3
+
+    assert snapshots(engine, 1) == [(date(2025, 3, 1), Decimal("70.00")), (date(2025, 3, 3), Decimal("75.50"))]
+    assert snapshots(engine, 2) == [(date(2025, 3, 1), Decimal("-70.00")), (date(2025, 3, 3), Decimal("-75.50"))]
+    with Session(engine) as db:
+        window = db.execute(closing_balances(1, date(2025, 3, 2), date(2025, 3, 4))).all()
+    assert window == [(date(2025, 3, 3), Decimal("75.50"))]
+
+
+def test_snapshots_match_the_running_balance(database):
+    engine, sessions = database
+    rows = history()
+    add_ledger(engine, rows)
+    snapshot_balances(engine, batch_size=7, settle_seconds=0)
+
+    # A late entry and a back-dated one: only the days they touch are re-read
+    late = [(START + timedelta(days=31), "12.00"), (START + timedelta(days=4, hours=1), "-3.00")]
+    add_ledger(engine, late)
+    snapshot_balances(engine, settle_seconds=0)
+    days = sorted({timestamp.date() for timestamp, _ in rows + late})
+    folded = snapshots(engine, 1)
+    assert [day for day, _ in folded] == days
+    for day, closing in folded:
+        assert closing == closing_at(sessions, day)
+
+
+def test_unsettled_entries_hold_the_watermark(database):
+    engine, _ = database
+    now = datetime.utcnow()
+    add_ledger(engine, [(now - timedelta(minutes=5), "10.00"), (now, "20.00"), (now - timedelta(minutes=10), "1.00")])
+    with Session(engine) as db:
+        # Stops at the first recent entry even though a later id is old enough
+        assert refresh_daily_balances(db, settle_seconds=60) == 1
+        db.commit()
+        assert refresh_daily_balances(db, settle_seconds=60) == 0
+        assert refresh_daily_balances(db, settle_seconds=0) == 2
+        assert refresh_daily_balances(db, settle_seconds=0) == 0
+
+
+def test_daily_balances_route_reads_the_snapshots(database):
+    engine, _ = database
+    add_ledger(engine, [(START, "100.00"), (START + timedelta(days=2), "-30.00"), (START + timedelta(days=5), "5.50")])
+    client = TestClient(app)
+    window = {"start": "2025-03-02", "end": "2025-03-07"}
+    assert client.get("/accounts/1/balances/daily", params=window).json()["days"] == []
+
+    snapshot_balances(engine, settle_seconds=0)
+    response = client.get("/accounts/1/balances/daily", params=window)
+    assert response.status_code == 200
+    assert response.json() == {
+        "account_id": 1,
+        "opening_balance": 100,
+        "days": [{"day": "2025-03-03", "closing_balance": 70}, {"day": "2025-03-06", "closing_balance": 75.5}]
+    }
+    assert client.get("/accounts/2/balances/daily", params=window).status_code == 404
+    assert client.get("/accounts/1/balances/daily", params={"start": "2025-03-07", "end": "2025-03-02"}).status_code == 400
\ No newline at end of file
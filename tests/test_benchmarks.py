@@ -0,0 +1,37 @@
+"""
+Unit testing for the benchmark suite's statistics and regression gate.
+"""
+
+# Imports
+import pytest
+from benchmarks.run import compare, parse_mix, summarize
+
+# -----------------------
+# Tests
+# -----------------------
+
+def test_parse_mix():
+    assert parse_mix("accounts=4,transfer") == {"accounts": 4.0, "transfer": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("accounts=1,unknown=2")
+
+
+def test_summarize_percentiles_and_statuses():
+    samples = {"accounts": [(i / 1000, 200) for i in range(1, 101)], "withdraw": [(0.01, 400), (0.02, 500)]}
+    result = summarize(samples, elapsed=2.0)
+    accounts = result["scenarios"]["accounts"]
+    assert accounts["count"] == 100 and accounts["rps"] == 50.0
+    assert accounts["p50_ms"] == pytest.approx(50.5)
+    assert accounts["p99_ms"] == pytest.approx(99.01)
+    assert result["scenarios"]["withdraw"]["rejected"] == 1
+    assert result["total"]["errors"] == 1
+
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = summarize({"accounts": [(0.010, 200)] * 100}, elapsed=1.0)
+    assert compare(summarize({"accounts": [(0.011, 200)] * 100}, elapsed=1.05), baseline, 0.15) == []
+
+    slower = compare(summarize({"accounts": [(0.020, 200)] * 100}, elapsed=1.0), baseline, 0.15)
+    assert any("p95_ms" in line for line in slower)
+    fewer = compare(summarize({"accounts": [(0.010, 200)] * 100}, elapsed=2.0), baseline, 0.15)
+    assert any("rps" in line for line in fewer)
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Unit testing for card number issuance and fingerprints.
+"""
+
+# Imports
+import asyncio
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.models import Base, User, Account, Card
+from app.utils import card_issuance
+from app.utils.card_issuance import (
+    CardNumberBlock, card_fingerprint, generate_card_number, is_luhn_valid, luhn_check_digit, CARD_BIN
+)
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture
+def databases(tmp_path):
+    url = tmp_path / "cards.db"
+    engine = create_engine(f"sqlite:///{url}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, name="Card User", email="card@example.com", hashed_password="fakehashed"))
+    db.add(Account(id=1, user_id=1, account_type="checking", balance=0))
+    db.commit()
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}", poolclass=NullPool)
+    yield db, async_sessionmaker(async_engine, class_=AsyncSession)
+    db.close()
+    engine.dispose()
+
+def make_card(number):
+    return Card(account_id=1, user_id=1, card_number=f"enc-{number}", expiry_date="enc", cvv="enc",
+                card_fingerprint=card_fingerprint(number))
+
+# ------------------
+# Tests
+# ------------------
+def test_luhn():
+    assert luhn_check_digit("7992739871") == "3"
+    assert is_luhn_valid("4111111111111111")
+    assert not is_luhn_valid("4111111111111112")
+
+def test_generated_numbers():
+    numbers = {generate_card_number() for _ in range(500)}
+    assert len(numbers) == 500
+    assert all(len(n) == 16 and n.startswith(CARD_BIN) and is_luhn_valid(n) for n in numbers)
+
+def test_fingerprint_unique_index(databases):
+    db, _ = databases
+    db.add(make_card("4000001234567899"))
+    db.commit()
+    db.add(make_card("4000001234567899"))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+
+def test_block_skips_issued_numbers(databases, monkeypatch):
+    db, async_factory = databases
+    db.add(make_card("4000000000000002"))
+    db.commit()
+    sequence = iter(["4000000000000002", "4000000000000010", "4000000000000028"])
+    monkeypatch.setattr(card_issuance, "generate_card_number", lambda: next(sequence))
+
+    async def issue():
+        async with async_factory() as session:
+            block = CardNumberBlock(block_size=3)
+            return [await block.next(session), await block.next(session)]
+    assert asyncio.run(issue()) == ["4000000000000010", "4000000000000028"]
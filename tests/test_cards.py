@@ -5,41 +5,12 @@ Unit and integration testing for card information.
 # Imports
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session
 from app.main import app
-from app.models import Base, User, Account
-from app.database.create_database import get_db
-from app.routes.auth_helpers import get_current_user
-
-# ------------------
-# Test DB setup
-# ------------------
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test_bank.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base.metadata.create_all(bind=engine)
-
-# Override dependencies
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def override_get_current_user():
-    db = TestingSessionLocal()
-    user = db.query(User).filter(User.id == 1).first()
-    if not user:
-        user = User(id=1, name="Test User", email="test@example.com", hashed_password="fakehashed")
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-    return user
-
-app.dependency_overrides[get_db] = override_get_db
-app.dependency_overrides[get_current_user] = override_get_current_user
+from app.models import User, Account, Card
+from app.utils.card_crypto import encrypt_value, decrypt_many
+from app.utils.card_issuance import card_fingerprint
+from app.database.backfill_card_projection import backfill_card_projection
 
 client = TestClient(app)
 
@@ -47,12 +18,18 @@ client = TestClient(app)
 # Fixtures
 # ------------------
 @pytest.fixture
-def create_test_account():
-    db = TestingSessionLocal()
-    account = Account(user_id=1, account_type="checking", balance=500)
-    db.add(account)
-    db.commit()
-    db.refresh(account)
+def database(app_database):
+    engine, _, _ = app_database([
+        User(id=1, name="Test User", email="test@example.com", hashed_password="fakehashed")
+    ])
+    return engine
+
+@pytest.fixture
+def create_test_account(database):
+    with Session(database, expire_on_commit=False) as db:
+        account = Account(user_id=1, account_type="checking", balance=500)
+        db.add(account)
+        db.commit()
     return account
 
 # ------------------
@@ -100,4 +77,65 @@ def test_activate_deactivate_card(create_test_account):
     # Activate
     response = client.patch(f"/cards/{card_id}/activate")
     assert response.status_code == 200
-    assert response.json()["is_active"] is True
\ No newline at end of file
+    assert response.json()["is_active"] is True
+
+
+def test_list_cards_needs_no_decryption(create_test_account, monkeypatch):
+    client.post("/cards/", json={
+        "account_id": create_test_account.id,
+        "expiry_date": "11/29",
+        "cvv": "123"
+    })
+
+    def fail(values):
+        raise AssertionError("list_cards should not decrypt projected cards")
+    monkeypatch.setattr("app.routes.cards.decrypt_many", fail)
+    response = client.get("/cards/")
+    assert response.status_code == 200
+    assert any(c["expiry_date"] == "11/29" for c in response.json())
+
+def test_legacy_cards_are_backfilled(create_test_account, database):
+    db = Session(database)
+    legacy = Card(
+        account_id=create_test_account.id,
+        user_id=1,
+        card_number=encrypt_value("4000123412349876"),
+        expiry_date=encrypt_value("02/28"),
+        cvv=encrypt_value("999")
+    )
+    db.add(legacy)
+    db.commit()
+
+    listed = {c["id"]: c for c in client.get("/cards/").json()}
+    assert listed[legacy.id]["card_number"] == "**** **** **** 9876"
+
+    assert backfill_card_projection(db) >= 1
+    db.refresh(legacy)
+    assert (legacy.card_last4, legacy.expiry_display) == ("9876", "02/28")
+    db.close()
+
+def test_decrypt_many_keeps_order():
+    values = [str(i).zfill(16) for i in range(200)]
+    assert decrypt_many([encrypt_value(v) for v in values]) == values
+
+def test_lookup_card_by_number(create_test_account, database):
+    db = Session(database)
+    card = Card(
+        account_id=create_test_account.id,
+        user_id=1,
+        card_number=encrypt_value("4000009876543210"),
+        expiry_date=encrypt_value("03/29"),
+        cvv=encrypt_value("321"),
+        card_last4="3210",
+        expiry_display="03/29",
+        card_fingerprint=card_fingerprint("4000009876543210")
+    )
+    db.add(card)
+    db.commit()
+    card_id = card.id
+    db.close()
+
+    response = client.post("/cards/lookup", json={"card_number": "4000 0098 7654 3210"})
+    assert response.status_code == 200
+    assert response.json()["id"] == card_id
+    assert client.post("/cards/lookup", json={"card_number": "4000009876543228"}).status_code == 404
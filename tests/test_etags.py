@@ -0,0 +1,100 @@
+"""
+Unit and integration testing for ETags, 304 responses and the versioned list cache.
+"""
+
+# Imports
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models import User, Account
+from app.utils.etags import etag_matches
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture
+def database(app_database):
+    engine, async_engine, _ = app_database([
+        User(id=1, name="Polling User", email="poll@example.com", hashed_password="fakehashed"),
+        User(id=2, name="Other User", email="other@example.com", hashed_password="fakehashed"),
+        Account(id=1, user_id=1, account_type="checking", balance=100),
+        Account(id=2, user_id=2, account_type="checking", balance=0),
+    ])
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+    return engine, statements
+
+
+def version(engine, user_id):
+    with Session(engine) as db:
+        return db.scalar(select(User.data_version).where(User.id == user_id))
+
+# ------------------
+# Tests
+# ------------------
+
+def test_etag_matching():
+    assert etag_matches('"accounts-1-3"', '"accounts-1-3"')
+    assert etag_matches('"cards-1-2", W/"accounts-1-3"', '"accounts-1-3"')
+    assert etag_matches("*", '"accounts-1-3"')
+    assert not etag_matches('"accounts-1-2"', '"accounts-1-3"') and not etag_matches(None, '"accounts-1-3"')
+
+
+def test_accounts_304_and_cache_skip_the_list_query(database):
+    engine, statements = database
+    client = TestClient(app)
+    first = client.get("/accounts/")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.json()[0]["balance"] == 100
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    statements.clear()
+    unchanged = client.get("/accounts/", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304 and unchanged.content == b"" and unchanged.headers["ETag"] == etag
+    cached = client.get("/accounts/")
+    assert cached.content == first.content
+    assert not any("FROM accounts" in sql for sql in statements)  # only the version was read
+
+    # A deposit bumps the version: the old ETag no longer matches
+    client.post("/accounts/1/deposit?amount=5")
+    changed = client.get("/accounts/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()[0]["balance"] == 105
+    assert changed.headers["ETag"] != etag
+
+
+def test_mutations_bump_versions(database):
+    engine, _ = database
+    client = TestClient(app)
+    mine, theirs = version(engine, 1), version(engine, 2)  # the fixture's accounts already bumped them
+
+    client.post("/accounts/", json={"account_type": "savings", "initial_balance": 10})
+    assert version(engine, 1) == mine + 1
+    client.post("/accounts/1/withdraw?amount=1")
+    assert version(engine, 1) == mine + 2
+    # Rejected movements change nothing
+    assert client.post("/accounts/1/withdraw?amount=1000").status_code == 400
+    assert version(engine, 1) == mine + 2
+
+    # The recipient's list changed too
+    client.post("/transactions/transfer", json={"from_account_id": 1, "to_account_id": 2, "amount": 3})
+    assert (version(engine, 1), version(engine, 2)) == (mine + 3, theirs + 1)
+    client.post("/transactions/batch?mode=per_item", json=[{"from_account_id": 1, "to_account_id": 2, "amount": 1}])
+    assert (version(engine, 1), version(engine, 2)) == (mine + 4, theirs + 2)
+
+
+def test_card_list_etag_follows_card_changes(database):
+    engine, _ = database
+    client = TestClient(app)
+    etag = client.get("/cards/").headers["ETag"]
+
+    card = client.post("/cards/", json={"account_id": 1, "expiry_date": "11/29", "cvv": "123"}).json()
+    listed = client.get("/cards/", headers={"If-None-Match": etag})
+    assert listed.status_code == 200 and [c["id"] for c in listed.json()] == [card["id"]]
+
+    etag = listed.headers["ETag"]
+    assert client.get("/cards/", headers={"If-None-Match": etag}).status_code == 304
+    client.patch(f"/cards/{card['id']}/deactivate")
+    deactivated = client.get("/cards/", headers={"If-None-Match": etag})
+    assert deactivated.status_code == 200 and deactivated.json()[0]["is_active"] is False
\ No newline at end of file
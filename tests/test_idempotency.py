@@ -0,0 +1,121 @@
+"""
+Unit and integration testing for Idempotency-Key handling on money-moving endpoints.
+"""
+
+# Imports
+import asyncio
+from datetime import datetime, timedelta
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models import User, Account, JournalEntry, Posting, IdempotencyKey
+from app.utils.idempotency import REPLAY_HEADER, compact_expired, idempotency_store
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture
+def database(app_database):
+    engine, _, sessions = app_database([
+        User(id=1, name="Retry User", email="retry@example.com", hashed_password="fakehashed"),
+        Account(id=1, user_id=1, account_type="checking", balance=100),
+        Account(id=2, user_id=1, account_type="savings", balance=0),
+    ])
+    idempotency_store.clear()
+    return engine, sessions
+
+
+def balances(engine):
+    with Session(engine) as db:
+        return dict(db.execute(select(Account.id, Account.balance)).all())
+
+
+def count(engine, model):
+    with Session(engine) as db:
+        return db.scalar(select(func.count()).select_from(model))
+
+# ------------------
+# Tests
+# ------------------
+
+def test_retry_replays_stored_response(database):
+    engine, _ = database
+    client = TestClient(app)
+    body = {"from_account_id": 1, "to_account_id": 2, "amount": 30}
+    headers = {"Idempotency-Key": "transfer-1"}
+
+    first = client.post("/transactions/transfer", json=body, headers=headers)
+    assert first.status_code == 200 and REPLAY_HEADER not in first.headers
+    second = client.post("/transactions/transfer", json=body, headers=headers)
+    assert second.headers[REPLAY_HEADER] == "true" and second.json() == first.json()
+
+    # Another worker (empty LRU) replays from the table via the unique index
+    idempotency_store.clear()
+    third = client.post("/transactions/transfer", json=body, headers=headers)
+    assert third.headers[REPLAY_HEADER] == "true" and third.json() == first.json()
+
+    assert balances(engine) == {1: 70, 2: 30}
+    assert count(engine, JournalEntry) == 1 and count(engine, Posting) == 2  # one entry, a debit and a credit
+
+
+def test_key_reused_for_different_request(database):
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "deposit-1"}
+    assert client.post("/accounts/1/deposit?amount=10", headers=headers).status_code == 200
+    assert client.post("/accounts/1/deposit?amount=20", headers=headers).status_code == 422
+    assert client.post("/accounts/1/withdraw?amount=10", headers=headers).status_code == 422
+
+
+def test_rejected_request_is_not_stored(database):
+    engine, _ = database
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "withdraw-1"}
+    assert client.post("/accounts/1/withdraw?amount=500", headers=headers).status_code == 400
+    assert count(engine, IdempotencyKey) == 0
+    assert client.post("/accounts/1/deposit?amount=500", headers={"Idempotency-Key": "deposit-2"}).status_code == 200
+    assert client.post("/accounts/1/withdraw?amount=500", headers=headers).status_code == 200
+    assert balances(engine)[1] == 100
+
+
+def test_concurrent_duplicates_wait_for_in_flight_result(database):
+    engine, _ = database
+
+    async def hedge():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(
+                client.post("/accounts/1/withdraw?amount=25", headers={"Idempotency-Key": "hedged"})
+                for _ in range(5)
+            ))
+
+    responses = asyncio.run(hedge())
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.text for r in responses}) == 1
+    assert sum(REPLAY_HEADER in r.headers for r in responses) == 4
+    assert balances(engine)[1] == 75
+
+
+def test_expired_keys_are_compacted_and_reusable(database):
+    engine, sessions = database
+    expired = datetime.utcnow() - timedelta(seconds=1)
+    with Session(engine) as db:
+        db.add_all([
+            IdempotencyKey(user_id=1, key=f"old-{i}", request_hash="x", response_body="{}", expires_at=expired)
+            for i in range(3)
+        ])
+        db.commit()
+
+    # An expired key can be claimed again before compaction gets to it
+    client = TestClient(app)
+    response = client.post("/accounts/1/deposit?amount=5", headers={"Idempotency-Key": "old-0"})
+    assert response.status_code == 200 and REPLAY_HEADER not in response.headers
+
+    async def compact():
+        async with sessions() as db:
+            return await compact_expired(db)
+
+    assert asyncio.run(compact()) == 2
+    assert count(engine, IdempotencyKey) == 1
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Unit testing for the built-in metrics middleware, registry and engine instrumentation.
+"""
+
+# Imports
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app.main import app
+from app.utils.card_crypto import decrypt_value, encrypt_value
+from app.utils import metrics
+from app.utils.metrics import (
+    Histogram, MetricsMiddleware, QueryBudgetExceeded, crypto_seconds, http_db_queries, http_requests,
+    instrument_engine, query_budget
+)
+
+# -----------------------
+# Tests
+# -----------------------
+
+def test_histogram_exposition():
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(("/x",), value)
+    lines = list(histogram.samples())
+    assert 'demo_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/x",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{route="/x"} 4' in lines
+    assert 'demo_seconds_sum{route="/x"} 4.05' in lines
+
+
+def test_metrics_endpoint_labels_route_templates():
+    client = TestClient(app)
+    client.get("/")
+    client.get("/no-such-page")
+    body = client.get("/metrics").text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_requests_total{route="/",method="GET",status="200"}' in body
+    assert 'route="unmatched"' in body
+    assert "http_requests_in_flight" in body
+
+
+def test_db_queries_counted_per_request(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'metrics.db'}", poolclass=NullPool)
+    instrument_engine(engine, "test")
+    demo = FastAPI()
+    demo.add_middleware(MetricsMiddleware)
+
+    @demo.get("/items/{item_id}")
+    async def item(item_id: int):
+        async with engine.connect() as conn:
+            for _ in range(3):
+                await conn.execute(text("SELECT 1"))
+        return {}
+
+    before = http_db_queries.series.get(("/items/{item_id}",), 0)
+    client = TestClient(demo)
+    client.get("/items/1")
+    client.get("/items/2")
+    assert http_db_queries.series[("/items/{item_id}",)] - before == 6
+    assert http_requests.series[("/items/{item_id}", "GET", 200)] >= 2
+
+
+def test_query_budget_enforced(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'budget.db'}", poolclass=NullPool)
+    instrument_engine(engine, "budget")
+    demo = FastAPI()
+    demo.add_middleware(MetricsMiddleware)
+
+    @demo.get("/rows/{count}", dependencies=[Depends(query_budget(2))])
+    async def rows(count: int):
+        async with engine.connect() as conn:
+            for _ in range(count):
+                await conn.execute(text("SELECT 1"))
+        return {}
+
+    client = TestClient(demo)
+    monkeypatch.setattr(metrics, "QUERY_BUDGET_MODE", "raise")
+    assert client.get("/rows/2").status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match="/rows/{count} ran 3 queries"):
+        client.get("/rows/3")
+
+    monkeypatch.setattr(metrics, "QUERY_BUDGET_MODE", "log")
+    assert client.get("/rows/3").status_code == 200
+
+
+def test_fernet_time_recorded():
+    before = crypto_seconds.series.get(("fernet_decrypt",), [0] * 12)[:-1]
+    decrypt_value(encrypt_value("4000001234567899"))
+    after = crypto_seconds.series[("fernet_decrypt",)][:-1]
+    assert sum(after) == sum(before) + 1
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Unit testing for fixed-point money, the money migration, and the ledger reconciler.
+"""
+
+# Imports
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, User, Account, JournalEntry, Posting
+from app.utils.money import to_cents, from_cents
+from app.database.migrate_money import migrate_money, needs_migration
+from app.database.reconcile_ledger import reconcile
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'money.db'}")
+    yield engine
+    engine.dispose()
+
+# ------------------
+# Tests
+# ------------------
+def test_cents_round_trip():
+    assert to_cents(Decimal("10.05")) == 1005
+    assert to_cents(0.1) + to_cents(0.2) == to_cents(0.3)
+    assert from_cents(1005) == Decimal("10.05")
+
+def test_money_column_is_exact(engine):
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, name="Money User", email="money@example.com", hashed_password="fakehashed"))
+    db.add(Account(id=1, user_id=1, account_type="checking", balance=Decimal("0.10")))
+    db.commit()
+    for _ in range(10):
+        db.execute(text("UPDATE accounts SET balance = balance + 10 WHERE id = 1"))
+    db.commit()
+    assert db.get(Account, 1).balance == Decimal("1.10")
+    assert db.execute(text("SELECT balance FROM accounts")).scalar() == 110
+    db.close()
+
+def test_reconcile_detects_drift(engine):
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, name="Money User", email="money@example.com", hashed_password="fakehashed"))
+    db.add_all([
+        Account(id=1, user_id=1, account_type="checking", balance=Decimal("70.00")),
+        Account(id=2, user_id=1, account_type="savings", balance=Decimal("31.00")),
+        JournalEntry(id=1, to_account_id=1, amount=Decimal("100.00"), transaction_type="deposit"),
+        JournalEntry(id=2, from_account_id=1, to_account_id=2, amount=Decimal("30.00"), transaction_type="transfer"),
+    ])
+    db.flush()
+    now = datetime.utcnow()
+    db.add_all([
+        Posting(account_id=1, seq=1, journal_id=1, amount=Decimal("100.00"), balance=Decimal("100.00"), timestamp=now),
+        Posting(account_id=1, seq=2, journal_id=2, amount=Decimal("-30.00"), balance=Decimal("70.00"), timestamp=now),
+        Posting(account_id=2, seq=1, journal_id=2, amount=Decimal("30.00"), balance=Decimal("30.00"), timestamp=now),
+    ])
+    db.commit()
+    db.close()
+    mismatches, rows = reconcile(engine, chunk_size=2)
+    assert rows == 3
+    assert mismatches == [(2, 3100, 3000)]
+
+def test_migrate_float_columns(engine):
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE accounts (id INTEGER PRIMARY KEY, balance FLOAT)")
+        conn.exec_driver_sql("CREATE INDEX ix_accounts_balance ON accounts (balance)")
+        conn.exec_driver_sql(
+            "CREATE TABLE transactions (id INTEGER PRIMARY KEY, from_account_id INTEGER REFERENCES accounts (id), amount FLOAT NOT NULL)"
+        )
+        conn.exec_driver_sql("INSERT INTO accounts VALUES (1, 2500.1), (2, 0.07)")
+        conn.exec_driver_sql("INSERT INTO transactions VALUES (1, 1, -19.99)")
+    assert needs_migration(engine)
+    migrate_money(engine)
+    migrate_money(engine)  # second run is a no-op
+    assert not needs_migration(engine)
+    with engine.connect() as conn:
+        assert [r[0] for r in conn.exec_driver_sql("SELECT balance FROM accounts ORDER BY id")] == [250010, 7]
+        assert conn.exec_driver_sql("SELECT amount FROM transactions").scalar() == -1999
+        # Declared BIGINT like create_all, so SQLite stores integers rather than REAL cents
+        assert conn.exec_driver_sql("SELECT type FROM pragma_table_info('accounts') WHERE name = 'balance'").scalar() == "BIGINT"
+        assert conn.exec_driver_sql("SELECT DISTINCT typeof(balance) FROM accounts").scalar() == "integer"
+        assert conn.exec_driver_sql("SELECT typeof(amount) FROM transactions").scalar() == "integer"
+        assert conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalar() == "ix_accounts_balance"
+        assert conn.exec_driver_sql("SELECT \"table\" FROM pragma_foreign_key_list('transactions')").scalar() == "accounts"
+
+def test_migrate_files_converted_in_place(engine):
+    # The first version of the migration scaled values but left the columns FLOAT
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE accounts (id INTEGER PRIMARY KEY, balance FLOAT)")
+        conn.exec_driver_sql("INSERT INTO accounts VALUES (1, 35000.0)")
+        conn.exec_driver_sql("PRAGMA user_version = 1")
+    assert needs_migration(engine)
+    migrate_money(engine)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT balance, typeof(balance) FROM accounts").one() == (35000, "integer")
@@ -0,0 +1,138 @@
+"""
+Unit and integration testing for the transactional outbox, its relay and the /events feed.
+"""
+
+# Imports
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models import User, Account, OutboxEvent
+from app.database.create_database import get_async_session_factory
+from app.routes import events
+from app.utils.outbox_relay import FileSink, QueueSink, relay_outbox
+
+FEED_HEADERS = {"X-Feed-Token": "feed-secret"}
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture
+def database(app_database, monkeypatch):
+    engine, _, sessions = app_database([
+        User(id=1, name="Feed User", email="feed@example.com", hashed_password="fakehashed"),
+        Account(id=1, user_id=1, account_type="checking", balance=100),
+        Account(id=2, user_id=1, account_type="savings", balance=0),
+    ])
+    monkeypatch.setattr(get_async_session_factory, "value", sessions)
+    monkeypatch.setattr(events, "EVENTS_FEED_TOKEN", "feed-secret")
+    return engine
+
+
+def outbox_rows(engine):
+    with Session(engine) as db:
+        return db.execute(select(OutboxEvent.id, OutboxEvent.seq, OutboxEvent.event_type).order_by(OutboxEvent.id)).all()
+
+# ------------------
+# Tests
+# ------------------
+
+def test_money_movements_write_outbox_events(database):
+    client = TestClient(app)
+    assert client.post("/transactions/transfer", json={"from_account_id": 1, "to_account_id": 2, "amount": 30}).status_code == 200
+    assert client.post("/accounts/2/deposit?amount=5").status_code == 200
+    assert client.post("/accounts/1/withdraw?amount=10").status_code == 200
+    # Rejected movements write nothing
+    assert client.post("/accounts/1/withdraw?amount=1000").status_code == 400
+    batch = [{"from_account_id": 1, "to_account_id": 2, "amount": 1}, {"from_account_id": 1, "to_account_id": 2, "amount": 999}]
+    assert client.post("/transactions/batch?mode=per_item", json=batch).json()["accepted"] == 1
+    assert client.post("/accounts/", json={"account_type": "savings", "initial_balance": 12}).status_code == 200
+
+    rows = outbox_rows(database)
+    assert [r.event_type for r in rows] == ["transfer", "deposit", "withdrawal", "transfer", "deposit"]
+    assert all(r.seq is None for r in rows)
+    with Session(database) as db:
+        payload = json.loads(db.scalar(select(OutboxEvent.payload).order_by(OutboxEvent.id)))
+    assert payload == {
+        "journal_id": 1, "user_id": 1, "from_account_id": 1, "to_account_id": 2, "amount": "30.00", "description": None
+    }
+
+
+def test_relay_numbers_in_commit_order_and_delivers(database, tmp_path):
+    with Session(database) as db:
+        db.add_all([OutboxEvent(id=10, event_type="deposit", payload="{}"), OutboxEvent(id=11, event_type="deposit", payload="{}")])
+        db.commit()
+    sink = FileSink(str(tmp_path / "events.ndjson"))
+    asyncio.run(relay_outbox(sink))
+
+    # A row that commits late behind higher ids still gets the next seq, so ?after= never skips it
+    with Session(database) as db:
+        db.add(OutboxEvent(id=5, event_type="withdrawal", payload="{}"))
+        db.commit()
+    asyncio.run(relay_outbox(sink))
+    assert [(r.id, r.seq) for r in outbox_rows(database)] == [(5, 3), (10, 1), (11, 2)]
+
+    delivered = [json.loads(line) for line in (tmp_path / "events.ndjson").read_text().splitlines()]
+    assert [(e["seq"], e["id"]) for e in delivered] == [(1, 10), (2, 11), (3, 5)]
+
+
+def test_failed_delivery_is_retried(database):
+    class FlakySink(QueueSink):
+        failures = 1
+
+        async def publish(self, events):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("receiver down")
+            await super().publish(events)
+
+    client = TestClient(app)
+    client.post("/accounts/2/deposit?amount=5")
+    sink = FlakySink()
+    with pytest.raises(ConnectionError):
+        asyncio.run(relay_outbox(sink))
+
+    async def relay_twice():
+        await relay_outbox(sink)
+        await relay_outbox(sink)  # cursor moved: nothing is sent again
+        return sink.queue.qsize()
+
+    assert asyncio.run(relay_twice()) == 1
+
+
+def test_events_feed(database, monkeypatch):
+    client = TestClient(app)
+    assert client.get("/events").status_code == 401
+    monkeypatch.setattr(events, "EVENTS_FEED_TOKEN", None)
+    assert client.get("/events", headers=FEED_HEADERS).status_code == 404
+    monkeypatch.setattr(events, "EVENTS_FEED_TOKEN", "feed-secret")
+
+    client.post("/accounts/2/deposit?amount=5")
+    # Committed but not yet numbered by the relay: not on the feed
+    assert client.get("/events", headers=FEED_HEADERS).json() == {"items": [], "last_seq": 0}
+    asyncio.run(relay_outbox())
+    page = client.get("/events", params={"after": 0}, headers=FEED_HEADERS).json()
+    assert page["last_seq"] == 1 and page["items"][0]["payload"]["amount"] == "5.00"
+    assert client.get("/events", params={"after": 1}, headers=FEED_HEADERS).json()["items"] == []
+
+
+def test_events_feed_long_poll_wakes_on_relay(database):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.monotonic()
+            poll = asyncio.create_task(client.get("/events", params={"after": 0, "wait": 10}, headers=FEED_HEADERS))
+            await asyncio.sleep(0.2)
+            await client.post("/accounts/2/deposit?amount=7")
+            await relay_outbox()
+            response = await poll
+            return response.json(), time.monotonic() - start
+
+    page, elapsed = asyncio.run(scenario())
+    assert [e["type"] for e in page["items"]] == ["deposit"]
+    assert elapsed < 2
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+Unit and integration testing for the journal/postings ledger, balance-as-of queries, and the legacy migration.
+"""
+
+# Imports
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models import User, Account, JournalEntry, Posting
+from app.database.migrate_postings import migrate_postings
+from app.database.reconcile_ledger import reconcile
+from app.schemas import TransferRequest
+from app.utils.batch_transfers import settle_batch
+from app.utils.ledger import balance_at
+from app.utils.statements import account_postings
+from app.utils.transfer_engine import apply_balance_change, apply_transfer
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture
+def database(app_database):
+    engine, _, sessions = app_database([
+        User(id=1, name="Ledger User", email="ledger@example.com", hashed_password="fakehashed"),
+        User(id=2, name="Other User", email="other@example.com", hashed_password="fakehashed"),
+        Account(id=1, user_id=1, account_type="checking", balance=0),
+        Account(id=2, user_id=1, account_type="savings", balance=0),
+        Account(id=3, user_id=2, account_type="checking", balance=0),
+    ])
+    return engine, sessions
+
+
+def postings(engine, account_id):
+    with Session(engine) as db:
+        return db.execute(
+            select(Posting.seq, Posting.amount, Posting.balance).where(Posting.account_id == account_id).order_by(Posting.seq)
+        ).all()
+
+# ------------------
+# Tests
+# ------------------
+
+def test_postings_carry_seq_and_running_balance(database):
+    engine, _ = database
+    with Session(engine) as db:
+        apply_balance_change(db, 1, 1, Decimal("100"), "deposit")
+        apply_transfer(db, 1, 1, 2, Decimal("30"))
+        settle_batch(db, 1, [
+            TransferRequest(from_account_id=2, to_account_id=1, amount=Decimal("5")),
+            TransferRequest(from_account_id=1, to_account_id=3, amount=Decimal("20")),
+            TransferRequest(from_account_id=1, to_account_id=2, amount=Decimal("999")),  # rejected
+        ], "per_item")
+        db.commit()
+        assert db.scalar(select(func.count()).select_from(JournalEntry)) == 4
+        assert dict(db.execute(select(Account.id, Account.posting_seq)).all()) == {1: 4, 2: 2, 3: 1}
+
+    assert postings(engine, 1) == [(1, 100, 100), (2, -30, 70), (3, 5, 75), (4, -20, 55)]
+    assert postings(engine, 2) == [(1, 30, 30), (2, -5, 25)]
+    assert postings(engine, 3) == [(1, 20, 20)]
+    assert reconcile(engine)[0] == []
+
+
+def test_statement_pages_and_descriptions(database):
+    engine, _ = database
+    client = TestClient(app)
+    client.post("/accounts/1/deposit?amount=50")
+    client.post("/transactions/transfer", json={"from_account_id": 1, "to_account_id": 2, "amount": 20})
+    client.post("/transactions/transfer", json={"from_account_id": 2, "to_account_id": 1, "amount": 5, "description": "Refund"})
+
+    page = client.get("/accounts/1/transactions", params={"limit": 2}).json()
+    assert [(i["amount"], i["balance"], i["description"]) for i in page["items"]] == [
+        (5, 35, "Refund"), (-20, 30, "Transfer to account 2")
+    ]
+    rest = client.get("/accounts/1/transactions", params={"cursor": page["next_cursor"]}).json()
+    assert [(i["transaction_type"], i["balance"]) for i in rest["items"]] == [("deposit", 50)]
+    assert client.get("/accounts/2/transactions").json()["items"][-1]["description"] == "Transfer from account 1"
+    assert client.get("/accounts/1/transactions", params={"cursor": "bm90LWEtY3Vyc29y"}).status_code == 400
+
+    # One range scan on the clustered key, the journal joined by primary key
+    with engine.connect() as conn:
+        compiled = account_postings(1, limit=10).compile(engine, compile_kwargs={"literal_binds": True})
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+    assert "SEARCH postings USING PRIMARY KEY (account_id=?)" in plan
+    assert "SEARCH journal_entries USING INTEGER PRIMARY KEY" in plan and "TEMP B-TREE" not in plan
+
+
+def test_balance_as_of(database):
+    engine, sessions = database
+    start = datetime(2025, 3, 1, 9, 30)
+    amounts = [Decimal("100"), Decimal("-30"), Decimal("12.50"), Decimal("-2.25")]
+    with Session(engine) as db:
+        for n, amount in enumerate(amounts):
+            apply_balance_change(db, 1, 1, amount, "deposit" if amount > 0 else "withdrawal")
+            db.flush()
+            db.execute(Posting.__table__.update().where(Posting.seq == n + 1).values(timestamp=start + timedelta(days=n)))
+        db.commit()
+
+    async def as_of(moment):
+        async with sessions() as db:
+            return await balance_at(db, 1, moment)
+
+    for days, expected in [(-1, "0"), (0, "100"), (1.5, "70"), (3, "80.25"), (40, "80.25")]:
+        assert asyncio.run(as_of(start + timedelta(days=days))) == Decimal(expected)
+
+    client = TestClient(app)
+    response = client.get("/accounts/1/balance", params={"as_of": (start + timedelta(days=2)).isoformat()})
+    assert response.status_code == 200 and response.json()["balance"] == 82.5
+    assert client.get("/accounts/1/balance").json()["balance"] == 80.25
+    assert client.get("/accounts/3/balance").status_code == 404
+
+
+def test_migrate_legacy_transactions(database):
+    engine, _ = database
+    t = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("""
+            CREATE TABLE transactions (
+                id INTEGER PRIMARY KEY, from_account_id INTEGER, to_account_id INTEGER, amount BIGINT NOT NULL,
+                transaction_type VARCHAR NOT NULL, timestamp DATETIME, description VARCHAR
+            )
+        """)
+        conn.execute(text("INSERT INTO transactions VALUES (:id, :f, :to, :amount, :type, :ts, :d)"), [
+            {"id": 1, "f": None, "to": 1, "amount": 10000, "type": "deposit", "ts": t, "d": "Opening balance"},
+            {"id": 2, "f": 1, "to": 2, "amount": -3000, "type": "transfer", "ts": t + timedelta(hours=1), "d": "Transfer to account 2"},
+            {"id": 3, "f": 1, "to": 2, "amount": 3000, "type": "transfer", "ts": t + timedelta(hours=1), "d": "Transfer from account 1"},
+            # Seeded legs are written in blocks: debits first, their credits later
+            {"id": 4, "f": 1, "to": 2, "amount": -3000, "type": "transfer", "ts": t + timedelta(hours=2), "d": "Rent"},
+            {"id": 5, "f": None, "to": 2, "amount": 500, "type": "deposit", "ts": t + timedelta(hours=3), "d": None},
+            {"id": 6, "f": 1, "to": 2, "amount": 3000, "type": "transfer", "ts": t + timedelta(hours=2), "d": "Rent"},
+            {"id": 7, "f": 2, "to": None, "amount": -1000, "type": "withdrawal", "ts": t + timedelta(hours=4), "d": None},
+        ])
+        conn.exec_driver_sql("UPDATE accounts SET balance = 4000 WHERE id = 1")
+        conn.exec_driver_sql("UPDATE accounts SET balance = 5500 WHERE id = 2")
+
+    assert migrate_postings(engine, drop_legacy=True) == {"journal_entries": 5, "opening_balances": 0, "postings": 7}
+    with Session(engine) as db:
+        entries = db.execute(select(JournalEntry.id, JournalEntry.amount, JournalEntry.description).order_by(JournalEntry.id)).all()
+        assert entries == [(1, 100, "Opening balance"), (2, 30, None), (4, 30, "Rent"), (5, 5, None), (7, 10, None)]
+        assert db.execute(select(Posting.journal_id).where(Posting.account_id == 2).order_by(Posting.seq)).scalars().all() == [2, 4, 5, 7]
+        assert dict(db.execute(select(Account.id, Account.posting_seq)).all()) == {1: 3, 2: 4, 3: 0}
+    assert postings(engine, 1) == [(1, 100, 100), (2, -30, 70), (3, -30, 40)]
+    assert postings(engine, 2)[-1] == (4, -10, 55)
+    assert reconcile(engine)[0] == []
+    assert migrate_postings(engine) == {}  # legacy table gone: nothing left to do
+
+
+def test_migrate_balances_not_backed_by_the_ledger(database):
+    # Initial balances and early deposits only ever touched accounts.balance
+    engine, _ = database
+    t = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("""
+            CREATE TABLE transactions (
+                id INTEGER PRIMARY KEY, from_account_id INTEGER, to_account_id INTEGER, amount BIGINT NOT NULL,
+                transaction_type VARCHAR NOT NULL, timestamp DATETIME, description VARCHAR
+            )
+        """)
+        conn.execute(text("INSERT INTO transactions VALUES (:id, :f, :to, :amount, :type, :ts, :d)"), [
+            {"id": 1, "f": 1, "to": 2, "amount": -15000, "type": "transfer", "ts": t, "d": None},
+            {"id": 2, "f": 1, "to": 2, "amount": 15000, "type": "transfer", "ts": t, "d": None},
+        ])
+        conn.exec_driver_sql("UPDATE accounts SET balance = 35000 WHERE id = 1")
+        conn.exec_driver_sql("UPDATE accounts SET balance = 45000 WHERE id = 2")
+        conn.exec_driver_sql("UPDATE accounts SET balance = -2000 WHERE id = 3")
+
+    assert migrate_postings(engine) == {"journal_entries": 1, "opening_balances": 3, "postings": 5}
+    assert reconcile(engine)[0] == []
+    assert postings(engine, 1) == [(1, 500, 500), (2, -150, 350)]
+    assert postings(engine, 2) == [(1, 300, 300), (2, 150, 450)]
+    assert postings(engine, 3) == [(1, -20, -20)]
+    with Session(engine) as db:
+        openings = db.execute(
+            select(JournalEntry.id, JournalEntry.transaction_type, JournalEntry.from_account_id, JournalEntry.to_account_id)
+            .where(JournalEntry.description == "Opening balance").order_by(JournalEntry.id)
+        ).all()
+        assert openings == [(3, "deposit", None, 1), (4, "deposit", None, 2), (5, "withdrawal", 3, None)]
+        assert db.scalar(select(Posting.timestamp).where(Posting.account_id == 1, Posting.seq == 1)) < t
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Unit testing for admission control: per-user and per-IP token buckets and the in-flight write cap.
+"""
+
+# Imports
+import asyncio
+import dataclasses
+from datetime import datetime, timedelta
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+from app.main import app
+from app.routes.auth_helpers import ALGORITHM, get_secret_key
+from app.settings import get_settings
+from app.utils.rate_limit import RateLimitMiddleware, TokenBuckets, parse_rate, requests_shed, route_class
+
+# ------------------
+# Helpers
+# ------------------
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def bearer(email, key=None):
+    token = jwt.encode({"sub": email, "exp": datetime.utcnow() + timedelta(minutes=5)}, key or get_secret_key(), algorithm=ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
+
+def demo_app(calls, **options):
+    demo = FastAPI()
+    demo.add_middleware(RateLimitMiddleware, **options)
+
+    @demo.get("/accounts/")
+    async def accounts():
+        calls.append("read")
+        return {}
+
+    return demo
+
+# ------------------
+# Tests
+# ------------------
+
+def test_route_classes_and_settings():
+    assert route_class("POST", "/auth/login") == "auth"
+    assert route_class("POST", "/accounts/1/deposit") == "write"
+    assert route_class("DELETE", "/cards/3") == "write"
+    assert route_class("GET", "/accounts/1/transactions") == "read"
+    assert route_class("GET", "/metrics") is None
+    assert parse_rate("20/50") == (20.0, 50.0) and parse_rate("5") == (5.0, 5.0) and parse_rate("off") is None
+    assert any(m.cls is RateLimitMiddleware for m in app.user_middleware)
+
+
+def test_user_and_ip_buckets():
+    calls, clock = [], FakeClock()
+    client = TestClient(demo_app(calls, limits={"read": (1, 2)}, ip_factor=3, store=TokenBuckets(), clock=clock))
+    user_a, user_b = bearer("a@example.com"), bearer("b@example.com")
+
+    # A token with a bad signature only counts against the IP, not against user a
+    forged = bearer("a@example.com", key="not-the-secret")
+    assert [client.get("/accounts/", headers=forged).status_code for _ in range(2)] == [200, 200]
+    assert [client.get("/accounts/", headers=user_a).status_code for _ in range(2)] == [200, 200]
+
+    before = requests_shed.series.get(("read", "rate"), 0)
+    response = client.get("/accounts/", headers=user_a)
+    assert response.status_code == 429 and response.headers["Retry-After"] == "1"
+    assert requests_shed.series[("read", "rate")] == before + 1
+
+    # User b has a full bucket but shares the IP, which a rejection left with two tokens
+    assert [client.get("/accounts/", headers=user_b).status_code for _ in range(2)] == [200, 200]
+    assert client.get("/accounts/").status_code == 429
+    assert len(calls) == 6  # rejected requests never reached the route
+
+    clock.now += 1
+    assert client.get("/accounts/", headers=user_a).status_code == 200
+
+
+def test_write_cap_sheds_concurrent_writes():
+    release = asyncio.Event()
+    calls = []
+    demo = demo_app(calls, limits={}, max_writes=1, store=TokenBuckets())
+
+    @demo.post("/accounts/1/deposit")
+    async def deposit():
+        await release.wait()
+        return {"ok": True}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=demo)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/accounts/1/deposit"))
+            await asyncio.sleep(0.05)
+            shed = await client.post("/accounts/1/deposit")
+            read = await client.get("/accounts/")
+            release.set()
+            accepted = await first
+            after = await client.post("/accounts/1/deposit")
+            return shed, read, accepted, after
+
+    shed, read, accepted, after = asyncio.run(scenario())
+    assert shed.status_code == 503 and shed.headers["Retry-After"] == "1"
+    assert read.status_code == 200 and accepted.status_code == 200 and after.status_code == 200
+
+
+def test_settings_are_read_when_the_stack_is_built(monkeypatch):
+    calls = []
+    demo = demo_app(calls)
+    monkeypatch.setattr(get_settings, "value", dataclasses.replace(
+        get_settings(), rate_limit_enabled=False, rate_limit_read="1/1", rate_limit_ip_factor=1))
+    client = TestClient(demo)
+    assert [client.get("/accounts/").status_code for _ in range(3)] == [200, 200, 200]
+
+    monkeypatch.setattr(get_settings, "value", dataclasses.replace(get_settings(), rate_limit_enabled=True))
+    client = TestClient(demo_app(calls))
+    assert [client.get("/accounts/").status_code for _ in range(3)] == [200, 429, 429]
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Unit testing for replica read routing and read-your-writes pinning, using two SQLite files.
+"""
+
+# Imports
+import time
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from app.database import read_routing
+from app.database.read_routing import ReadYourWritesMiddleware, ReplicaRouter, get_async_read_db
+from app.models import Base, User, Account
+
+# ------------------
+# Fixtures
+# ------------------
+def make_database(path, balance):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, name="Replica User", email="replica@example.com", hashed_password="fakehashed"))
+    db.add(Account(id=1, user_id=1, account_type="checking", balance=balance))
+    db.commit()
+    db.close()
+    engine.dispose()
+    return create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # The replica lags behind the primary by one deposit
+    primary = make_database(tmp_path / "primary.db", 100)
+    replica = make_database(tmp_path / "replica.db", 90)
+    monkeypatch.setattr(read_routing.get_read_router, "value", ReplicaRouter(primary, [replica], pin_seconds=0.3))
+
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, enabled=True)
+
+    @app.get("/balance")
+    async def balance(db: AsyncSession = Depends(get_async_read_db)):
+        return {"balance": float(await db.scalar(select(Account.balance).where(Account.id == 1)))}
+
+    @app.post("/deposit")
+    async def deposit():
+        return {}
+
+    yield TestClient(app)
+
+
+def bearer(email):
+    return {"Authorization": f"Bearer {jwt.encode({'sub': email}, 'secret')}"}
+
+# ------------------
+# Tests
+# ------------------
+def test_reads_go_to_replica(client):
+    assert client.get("/balance", headers=bearer("replica@example.com")).json()["balance"] == 90
+    assert client.get("/balance").json()["balance"] == 90
+
+
+def test_own_write_pins_reads_to_primary(client):
+    assert client.post("/deposit", headers=bearer("replica@example.com")).status_code == 200
+    assert client.get("/balance", headers=bearer("replica@example.com")).json()["balance"] == 100
+    # Other users keep reading from the replica
+    assert client.get("/balance", headers=bearer("other@example.com")).json()["balance"] == 90
+
+    time.sleep(0.35)
+    assert client.get("/balance", headers=bearer("replica@example.com")).json()["balance"] == 90
+
+
+def test_router_without_replicas_uses_primary():
+    router = ReplicaRouter(primary="primary", replicas=[])
+    router.pin("someone")
+    assert router.engine_for("someone") == "primary"
+    assert router.pinned == {}
+
+
+def test_router_round_robin():
+    router = ReplicaRouter(primary="primary", replicas=["a", "b"], pin_seconds=10)
+    assert [router.engine_for("x") for _ in range(4)] == ["a", "b", "a", "b"]
+    router.pin("x")
+    assert router.engine_for("x") == "primary"
\ No newline at end of file
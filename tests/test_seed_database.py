@@ -0,0 +1,53 @@
+"""
+Unit testing for the synthetic data generator.
+"""
+
+# Imports
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+from app.database.reconcile_ledger import reconcile
+from app.database.seed_database import seed_database
+from app.models import User, Account, Posting, Card
+from app.utils.card_crypto import decrypt_value
+from app.utils.card_issuance import card_fingerprint, is_luhn_valid
+from app.utils.password_hashing import get_pwd_context
+
+# -----------------------
+# Tests
+# -----------------------
+
+def test_seed_counts_and_reconciles(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    counts = seed_database(engine, users=20, accounts_per_user=3, tx_per_account=10, chunk_size=64, workers=2)
+    assert counts["users"] == 20 and counts["accounts"] == 60 and counts["cards"] == 20
+
+    with Session(engine) as db:
+        assert db.scalar(select(func.count()).select_from(Posting)) == counts["postings"]
+        assert db.scalar(select(func.min(Account.balance))) >= 0
+    mismatches, rows = reconcile(engine, chunk_size=100)
+    assert mismatches == [] and rows == counts["postings"]
+
+
+def test_seed_cards_and_passwords(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    seed_database(engine, users=5, accounts_per_user=2, tx_per_account=3, workers=1)
+
+    with Session(engine) as db:
+        user = db.scalar(select(User).where(User.id == 1))
+        assert get_pwd_context().verify("password", user.hashed_password)
+        for card in db.scalars(select(Card)):
+            number = decrypt_value(card.card_number)
+            assert is_luhn_valid(number)
+            assert card.card_last4 == number[-4:]
+            assert card.card_fingerprint == card_fingerprint(number)
+            assert db.get(Account, card.account_id).user_id == card.user_id
+
+
+def test_seed_is_deterministic(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    seed_database(engine, users=4, accounts_per_user=2, tx_per_account=5, workers=1, seed=7)
+    with Session(engine) as db:
+        first = db.execute(select(Account.id, Account.balance).order_by(Account.id)).all()
+    seed_database(engine, users=4, accounts_per_user=2, tx_per_account=5, workers=1, seed=7)
+    with Session(engine) as db:
+        assert db.execute(select(Account.id, Account.balance).order_by(Account.id)).all() == first
\ No newline at end of file
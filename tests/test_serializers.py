@@ -0,0 +1,44 @@
+"""
+Unit testing for the fast list serializers, the orjson response class and the serialization microbenchmark.
+"""
+
+# Imports
+import json
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.models import Base, User, Account
+from app.utils.serializers import FastJSONResponse, account_serializer, transaction_serializer
+from benchmarks.serialization import measure_serialization
+
+# -----------------------
+# Tests
+# -----------------------
+
+def test_fast_json_response_renders_decimals_and_datetimes():
+    response = FastJSONResponse({"balance": Decimal("12.50"), "at": datetime(2025, 3, 1, 9, 30), 7: None})
+    assert json.loads(response.body) == {"balance": 12.5, "at": "2025-03-01T09:30:00", "7": None}
+
+
+def test_expired_orm_attributes_are_loaded(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'serializers.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(User(id=1, name="Row User", email="rows@example.com", hashed_password="fakehashed"))
+        db.flush()
+        account = Account(id=1, user_id=1, account_type="savings", balance=Decimal("10.25"), created_at=datetime(2025, 1, 1))
+        db.add(account)
+        db.commit()  # expires every attribute
+        item = account_serializer.items([account])[0]
+    assert item == {"id": 1, "user_id": 1, "account_type": "savings", "balance": 10.25, "created_at": datetime(2025, 1, 1)}
+    assert transaction_serializer.items([]) == []
+    engine.dispose()
+
+
+def test_fast_path_matches_response_model_and_is_cheaper():
+    # measure_serialization raises if the two paths produce different JSON
+    results = measure_serialization(rows=2000, repeat=3)
+    assert set(results) == {"accounts", "cards", "transactions"}
+    assert all(r["rows"] == 2000 for r in results.values())
+    assert results["accounts"]["speedup"] > 2 and results["transactions"]["speedup"] > 2
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Unit testing for the SQLite production profile and the group-commit writer.
+"""
+
+# Imports
+import asyncio
+from decimal import Decimal
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.database.create_database import apply_sqlite_profile
+from app.models import Base, User, Account, Posting
+from app.utils.sqlite_writer import SQLiteWriter
+from app.utils.transfer_engine import apply_transfer
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture
+def profiled_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'wal.db'}", connect_args={"check_same_thread": False})
+    apply_sqlite_profile(engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, name="Writer User", email="writer@example.com", hashed_password="fakehashed"))
+    db.add_all([Account(id=i, user_id=1, account_type="checking", balance=100) for i in range(1, 5)])
+    db.commit()
+    db.close()
+    yield engine
+    engine.dispose()
+
+# ------------------
+# Tests
+# ------------------
+def test_profile_pragmas(profiled_engine):
+    with profiled_engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() > 0
+
+
+def test_read_only_pool_rejects_writes(tmp_path, profiled_engine):
+    reader = create_engine(profiled_engine.url)
+    apply_sqlite_profile(reader, read_only=True)
+    with reader.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(Account)) == 4
+        with pytest.raises(OperationalError):
+            conn.execute(text("DELETE FROM accounts"))
+    reader.dispose()
+
+
+def test_group_commit_isolates_rejected_units(profiled_engine):
+    writer = SQLiteWriter(profiled_engine, window=0.05)
+
+    async def submit_all():
+        jobs = [writer.run(apply_transfer, 1, 1, 2, Decimal("10")) for _ in range(5)]
+        jobs.append(writer.run(apply_transfer, 1, 3, 4, Decimal("500")))  # insufficient balance
+        jobs.append(writer.run(apply_transfer, 1, 3, 4, Decimal("25")))
+        return await asyncio.gather(*jobs, return_exceptions=True)
+
+    results = asyncio.run(submit_all())
+    writer.stop()
+
+    assert results[:5] == [Decimal(b) for b in ("90", "80", "70", "60", "50")]
+    assert isinstance(results[5], HTTPException) and results[5].status_code == 400
+    assert results[6] == Decimal("75")
+    db = sessionmaker(bind=profiled_engine)()
+    balances = dict(db.execute(select(Account.id, Account.balance)).all())
+    assert balances == {1: 50, 2: 150, 3: 75, 4: 125}
+    assert db.scalar(select(func.count()).select_from(Posting)) == 12
+    db.close()
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Unit testing for application startup: import-time budget and lazy resource construction.
+"""
+
+# Imports
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+from app.database.create_database import get_async_engine, get_engine
+from app.main import app
+from app.utils.password_hashing import hashing_pool
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# app.* may add at most this fraction on top of importing the frameworks themselves
+IMPORT_BUDGET_RATIO = 0.25
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import fastapi, fastapi.security, sqlalchemy.orm, sqlalchemy.ext.asyncio, pydantic, email_validator
+frameworks = time.perf_counter() - start
+start = time.perf_counter()
+import app.main
+from app.database import create_database
+from app.utils import card_crypto, password_hashing
+print(json.dumps({
+    "frameworks": frameworks,
+    "app": time.perf_counter() - start,
+    "heavy_modules": [m for m in ("passlib", "jose", "cryptography.fernet", "aiosqlite") if m in sys.modules],
+    "built": [f.__name__ for f in (create_database.get_engine, create_database.get_async_engine,
+                                   card_crypto.get_fernet, password_hashing.get_pwd_context) if f.built],
+}))
+"""
+
+def probe_import() -> dict:
+    # No secrets in the environment: importing the app must not need them
+    env = {k: v for k, v in os.environ.items() if k not in ("CARD_ENCRYPTION_KEY", "JWT_SECRET_KEY", "ACCESS_TOKEN_EXPIRE")}
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+# -----------------------
+# Tests
+# -----------------------
+
+def test_import_builds_nothing():
+    result = probe_import()
+    assert result["heavy_modules"] == []
+    assert result["built"] == []
+
+
+def test_import_time_budget():
+    # Best of three, so a busy machine doesn't fail the budget
+    ratios = [r["app"] / r["frameworks"] for r in (probe_import() for _ in range(3))]
+    assert min(ratios) < IMPORT_BUDGET_RATIO
+
+
+def test_lifespan_builds_and_releases_resources():
+    with TestClient(app) as client:
+        assert get_engine.built and get_async_engine.built
+        assert client.get("/").status_code == 200
+        hashing_pool.start()
+    assert hashing_pool.executor is None
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Unit and integration testing for transfers and batch settlement.
+"""
+
+# Imports
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.main import app
+from app.models import User, Account
+
+client = TestClient(app)
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture
+def accounts(app_database):
+    engine, _, _ = app_database([
+        User(id=1, name="Test User", email="test@example.com", hashed_password="fakehashed"),
+        *(Account(id=i, user_id=1, account_type="checking", balance=500) for i in (1, 2, 3)),
+    ])
+    return engine, [1, 2, 3]
+
+def balance_of(engine, account_id):
+    with Session(engine) as db:
+        return db.scalar(select(Account.balance).where(Account.id == account_id))
+
+# ------------------
+# Tests
+# ------------------
+def test_transfer_insufficient_balance(accounts):
+    engine, (a, b, _) = accounts
+    response = client.post("/transactions/transfer", json={"from_account_id": a, "to_account_id": b, "amount": 1000})
+    assert response.status_code == 400
+    assert balance_of(engine, a) == 500
+
+def test_batch_atomic(accounts):
+    engine, (a, b, c) = accounts
+    payload = [
+        {"from_account_id": a, "to_account_id": b, "amount": 100},
+        {"from_account_id": b, "to_account_id": c, "amount": 50},
+        {"from_account_id": a, "to_account_id": c, "amount": 25},
+    ]
+    response = client.post("/transactions/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted"] == 3 and data["rejected"] == 0
+    assert data["results"][2]["new_balance"] == 375
+    assert (balance_of(engine, a), balance_of(engine, b), balance_of(engine, c)) == (375, 550, 575)
+
+def test_batch_atomic_rolls_back(accounts):
+    engine, (a, b, _) = accounts
+    payload = [
+        {"from_account_id": a, "to_account_id": b, "amount": 100},
+        {"from_account_id": a, "to_account_id": b, "amount": 1000},
+    ]
+    response = client.post("/transactions/batch", json=payload)
+    assert response.status_code == 400
+    assert "Item 1" in response.json()["detail"]
+    assert (balance_of(engine, a), balance_of(engine, b)) == (500, 500)
+
+def test_batch_per_item_ndjson(accounts):
+    engine, (a, b, _) = accounts
+    lines = [
+        {"from_account_id": a, "to_account_id": b, "amount": 400},
+        {"from_account_id": a, "to_account_id": b, "amount": 400},
+        {"from_account_id": a, "to_account_id": 999999, "amount": 1},
+    ]
+    response = client.post(
+        "/transactions/batch",
+        params={"mode": "per_item"},
+        content="\n".join(json.dumps(line) for line in lines),
+        headers={"content-type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["ok", "rejected", "rejected"]
+    assert data["results"][1]["detail"] == "Insufficient balance"
+    assert (balance_of(engine, a), balance_of(engine, b)) == (100, 900)
+
+def test_batch_rejects_malformed_bodies(accounts):
+    for content in (b"[{not json", b"\xff\xfe[]"):
+        response = client.post("/transactions/batch", content=content, headers={"content-type": "application/json"})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Malformed batch body"
\ No newline at end of file
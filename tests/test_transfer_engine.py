@@ -0,0 +1,171 @@
+"""
+Concurrency and correctness testing for the transfer engine.
+"""
+
+# Imports
+import random
+import threading
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, User, Account, JournalEntry, Posting
+from app.schemas import TransferRequest
+from app.utils.batch_transfers import settle_batch
+from app.utils.transfer_engine import transfer_funds, run_in_transaction, apply_balance_change
+
+# ------------------
+# Fixtures
+# ------------------
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'stress.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = factory()
+    db.add(User(id=1, name="Stress User", email="stress@example.com", hashed_password="fakehashed"))
+    db.add_all([Account(id=i, user_id=1, account_type="checking", balance=1000) for i in range(1, 11)])
+    db.commit()
+    db.close()
+    yield factory
+    engine.dispose()
+
+# ------------------
+# Tests
+# ------------------
+def test_transfer_rejections(session_factory):
+    db = session_factory()
+    with pytest.raises(HTTPException) as exc:
+        transfer_funds(db, user_id=1, from_account_id=1, to_account_id=2, amount=5000)
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException) as exc:
+        transfer_funds(db, user_id=1, from_account_id=1, to_account_id=999, amount=10)
+    assert exc.value.status_code == 404
+    with pytest.raises(HTTPException) as exc:
+        transfer_funds(db, user_id=2, from_account_id=1, to_account_id=2, amount=10)
+    assert exc.value.status_code == 404
+    assert db.scalar(select(Account.balance).where(Account.id == 1)) == 1000
+    db.close()
+
+
+def test_concurrent_transfers_conserve_money(session_factory):
+    threads, transfers_per_thread = 8, 40
+    errors = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        db = session_factory()
+        try:
+            for _ in range(transfers_per_thread):
+                from_id, to_id = rng.sample(range(1, 11), 2)
+                try:
+                    transfer_funds(db, 1, from_id, to_id, rng.randint(1, 400))
+                except HTTPException as exc:
+                    assert exc.status_code == 400  # only insufficient balance is expected
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            db.close()
+
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    assert not errors
+    db = session_factory()
+    assert db.scalar(select(func.sum(Account.balance))) == 10 * 1000
+    assert db.scalar(select(func.min(Account.balance))) >= 0
+    assert db.scalar(select(func.sum(Posting.amount))) == 0
+    db.close()
+
+
+def test_concurrent_withdrawals_never_overdraw(session_factory):
+    outcomes = []
+
+    def worker():
+        db = session_factory()
+        try:
+            run_in_transaction(db, apply_balance_change, 1, 1, -300, "withdrawal")
+            outcomes.append("ok")
+        except HTTPException as exc:
+            outcomes.append(exc.status_code)
+        finally:
+            db.close()
+
+    pool = [threading.Thread(target=worker) for _ in range(8)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    assert outcomes.count("ok") == 3
+    assert outcomes.count(400) == 5
+    db = session_factory()
+    assert db.scalar(select(Account.balance).where(Account.id == 1)) == 100
+    assert db.scalar(select(func.count(JournalEntry.id))) == 3
+    db.close()
+
+
+def test_concurrent_batches_never_overdraw(session_factory):
+    outcomes, errors = [], []
+    start = threading.Barrier(8)
+
+    def worker():
+        db = session_factory()
+        try:
+            start.wait()
+            item = TransferRequest(from_account_id=1, to_account_id=2, amount=600)
+            result = run_in_transaction(db, settle_batch, 1, [item], "per_item")
+            outcomes.append(result["accepted"])
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            db.close()
+
+    pool = [threading.Thread(target=worker) for _ in range(8)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    assert not errors
+    assert sorted(outcomes) == [0] * 7 + [1]
+    db = session_factory()
+    assert db.execute(select(Account.balance, Account.posting_seq).where(Account.id == 1)).one() == (400, 1)
+    assert db.scalars(select(Posting.seq).where(Posting.account_id == 2)).all() == [1]
+    db.close()
+
+
+def test_concurrent_batches_number_postings_without_gaps(session_factory):
+    errors = []
+    start = threading.Barrier(8)
+
+    def worker():
+        db = session_factory()
+        try:
+            start.wait()
+            items = [TransferRequest(from_account_id=3, to_account_id=4, amount=10) for _ in range(3)]
+            run_in_transaction(db, settle_batch, 1, items, "per_item")
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            db.close()
+
+    pool = [threading.Thread(target=worker) for _ in range(8)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    assert not errors
+    db = session_factory()
+    for account_id, balance in ((3, 760), (4, 1240)):
+        assert db.execute(select(Account.balance, Account.posting_seq).where(Account.id == account_id)).one() == (balance, 24)
+        rows = db.execute(select(Posting.seq, Posting.balance).where(Posting.account_id == account_id).order_by(Posting.seq)).all()
+        assert [seq for seq, _ in rows] == list(range(1, 25)) and rows[-1].balance == balance
+    db.close()
\ No newline at end of file